@@ -0,0 +1,171 @@
+"""
+Synthetic Thai social media corpus for the benchmarks.
+
+Every category is generated from a seed, so a run can be repeated exactly
+on another release or machine.
+"""
+import random
+from typing import Dict, List
+
+THAI_WORDS = [
+    "สวัสดี",
+    "ครับ",
+    "ค่ะ",
+    "วันนี้",
+    "อากาศ",
+    "ดีมาก",
+    "ไป",
+    "เที่ยว",
+    "กัน",
+    "ไหม",
+    "ร้าน",
+    "อาหาร",
+    "อร่อย",
+    "ราคา",
+    "ถูก",
+    "แพง",
+    "โปรโมชั่น",
+    "ลด",
+    "สินค้า",
+    "ส่งฟรี",
+    "รีวิว",
+    "แนะนำ",
+    "ชอบ",
+    "มากกกก",
+    "จริงๆ",
+    "นะคะ",
+    "เเล้ว",
+    "กํา",
+    "ฤาษี",
+    "๑๒๓",
+    "ผม",
+    "เธอ",
+    "ที่",
+    "และ",
+    "ของ",
+    "กับ",
+]
+LATIN_WORDS = [
+    "ok",
+    "lol",
+    "Sale",
+    "FREE",
+    "iPhone",
+    "live",
+    "NESCAFÉ",
+    "Cześć",
+    "hahaha",
+    "omg",
+    "thx",
+    "new",
+    "promo",
+    "shop",
+    "review",
+]
+EMOJIS = [
+    "😀",
+    "😂",
+    "😍",
+    "🥰",
+    "😭",
+    "👍",
+    "👍🏽",
+    "🙏",
+    "❤️",
+    "🔥",
+    "✨",
+    "🎉",
+    "🇹🇭",
+    "👨‍👩‍👧",
+    "3️⃣",
+    "😣😣😣",
+    "🌈",
+    "🌻",
+]
+LINKS = [
+    "https://www.example.com/path?q=1",
+    "http://shop.co.th/item/123",
+    "www.google.co.th",
+    "bit.ly/3abcDEF",
+    "facebook.com/page.name",
+]
+ENTITIES = [
+    "@wisesight",
+    "@user_123",
+    "mail.me@example.com",
+    "0812345678",
+    "02-123-4567",
+    "+66 81 234 5678",
+    "logo.png",
+    "index.php?id=3",
+    "#hashtag",
+    "#โปรโมชั่น",
+    "555555",
+    "ถถถถ",
+    "1,299.00",
+    "50%",
+]
+PUNCTUATION = [" ", " ", " ", " ", ", ", "!", "?", "...", "\n", " - ", "&amp;", ":)"]
+
+
+def _words(r: random.Random, pool: List[str], n: int) -> str:
+    return "".join(r.choice(pool) + r.choice(PUNCTUATION) for _ in range(n))
+
+
+def thai_chat(r: random.Random) -> str:
+    return _words(r, THAI_WORDS + LATIN_WORDS[:3], r.randint(3, 25))
+
+
+def emoji_heavy(r: random.Random) -> str:
+    return _words(r, THAI_WORDS + EMOJIS * 3, r.randint(5, 30))
+
+
+def url_heavy(r: random.Random) -> str:
+    return _words(r, THAI_WORDS + LATIN_WORDS + LINKS + ENTITIES, r.randint(5, 40))
+
+
+def long_html(r: random.Random) -> str:
+    paragraphs = []
+    for _ in range(r.randint(20, 60)):
+        body = _words(r, THAI_WORDS + LATIN_WORDS + LINKS + ENTITIES + EMOJIS, 40)
+        link = '<a href="{}">{}</a>'.format(r.choice(LINKS), r.choice(THAI_WORDS))
+        paragraphs.append("<p>{}&nbsp;{}<br /></p>".format(body, link))
+    return "<html><body>\n{}\n</body></html>".format("\n".join(paragraphs))
+
+
+# Long runs that make backtracking regexes retry from every position
+ADVERSARIAL_RUNS = [
+    "a.",
+    "ก.",
+    "0 ",
+    "5",
+    "\u0E16",
+    "ha ",
+    "a@",
+    "x" * 20 + ".",
+    "<3 ",
+]
+
+
+def adversarial(r: random.Random) -> str:
+    run = r.choice(ADVERSARIAL_RUNS) * r.randint(200, 2000)
+    return _words(r, THAI_WORDS, 3) + run + _words(r, THAI_WORDS, 3)
+
+
+CATEGORIES = {
+    "thai_chat": thai_chat,
+    "emoji_heavy": emoji_heavy,
+    "url_heavy": url_heavy,
+    "long_html": long_html,
+    "adversarial": adversarial,
+}
+
+
+def generate(docs: int = 1000, seed: int = 0) -> Dict[str, List[str]]:
+    """docs texts per category (a tenth of that for long_html and adversarial)."""
+    corpus = {}
+    for name, make in CATEGORIES.items():
+        r = random.Random("{}-{}".format(seed, name))
+        n = max(1, docs // 10) if name in ("long_html", "adversarial") else docs
+        corpus[name] = [make(r) for _ in range(n)]
+    return corpus
@@ -0,0 +1,190 @@
+"""
+Time every public preprocess function on the synthetic corpus.
+
+    python -m benchmarks.run -o bench.json
+    python -m benchmarks.run --compare old.json
+
+Reports, per function and corpus category, the best of --repeat runs in
+microseconds per document and nanoseconds per character, plus the peak
+memory allocated during one pass. Functions an older release does not have
+are listed as missing, so releases can be compared. The import time of
+th_preprocessor.preprocess is measured in fresh interpreters.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.corpus import generate
+
+FUNCTIONS = [
+    "normalize_at_mention",
+    "normalize_email",
+    "normalize_link",
+    "normalize_filename",
+    "normalize_date",
+    "normalize_phone",
+    "normalize_text_pairs",
+    "normalize_haha",
+    "normalize_num",
+    "normalize_accented_chars",
+    "normalize_special_chars",
+    "normalize_emoji",
+    "remove_emoji",
+    "remove_hashtags",
+    "remove_tag",
+    "remove_others_char",
+    "replace_dup_chars",
+    "replace_dup_emojis",
+    "insert_spaces",
+    "remove_dup_spaces",
+    "preprocess",
+]
+
+
+def measure_import(runs: int) -> Dict[str, float]:
+    code = (
+        "import time; t = time.perf_counter(); "
+        "import th_preprocessor.preprocess; print(time.perf_counter() - t)"
+    )
+    seconds = [
+        float(subprocess.check_output([sys.executable, "-c", code]))
+        for _ in range(runs)
+    ]
+    return {"median_seconds": statistics.median(seconds), "min_seconds": min(seconds)}
+
+
+def measure(
+    function: Callable[[str], str], texts: List[str], repeat: int, memory: bool
+) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        best = min(best, time.perf_counter() - start)
+    chars = sum(len(text) for text in texts)
+    result = {
+        "docs": len(texts),
+        "chars": chars,
+        "seconds": best,
+        "us_per_doc": best / len(texts) * 1e6,
+        "ns_per_char": best / max(chars, 1) * 1e9,
+    }
+    if memory:
+        tracemalloc.start()
+        for text in texts:
+            function(text)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def compare(old: dict, new: dict) -> None:
+    print(
+        "{:<28} {:<12} {:>10} {:>10} {:>7}".format(
+            "function", "category", "old us", "new us", "ratio"
+        )
+    )
+    for name, categories in new["functions"].items():
+        for category, result in categories.items():
+            try:
+                before = old["functions"][name][category]["us_per_doc"]
+            except KeyError:
+                continue
+            print(
+                "{:<28} {:<12} {:>10.1f} {:>10.1f} {:>7.2f}".format(
+                    name,
+                    category,
+                    before,
+                    result["us_per_doc"],
+                    result["us_per_doc"] / before,
+                )
+            )
+    for name in sorted(set(old.get("missing", [])) | set(new.get("missing", []))):
+        side = "old" if name in old.get("missing", []) else "new"
+        print("{:<28} missing in the {} report".format(name, side))
+    before = old["import"]["median_seconds"]
+    after = new["import"]["median_seconds"]
+    print(
+        "{:<41} {:>10.1f} {:>10.1f} {:>7.2f}".format(
+            "import (ms)", before * 1e3, after * 1e3, after / before
+        )
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run")
+    parser.add_argument("--docs", type=int, default=1000, help="texts per category")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument(
+        "-f",
+        "--function",
+        action="append",
+        dest="functions",
+        help="only benchmark these functions (can be repeated)",
+    )
+    args = parser.parse_args(argv)
+
+    import emoji
+
+    from th_preprocessor import preprocess as module
+
+    corpus = generate(args.docs, args.seed)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "emoji": emoji.__version__,
+            "docs": args.docs,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "import": measure_import(args.import_runs),
+        "functions": {},
+        "missing": [],
+    }
+    for name in args.functions or FUNCTIONS:
+        function = getattr(module, name, None)
+        if function is None:
+            # Not in this release: report it instead of failing the run
+            report["missing"].append(name)
+            sys.stderr.write("{:<28} missing\n".format(name))
+            continue
+        # First call builds lazily compiled tables; keep it out of the timing
+        function("warm up 😀")
+        report["functions"][name] = {
+            category: measure(function, texts, args.repeat, not args.no_memory)
+            for category, texts in corpus.items()
+        }
+        sys.stderr.write(
+            "{:<28} {}\n".format(
+                name,
+                "  ".join(
+                    "{} {:.1f}us".format(category, result["us_per_doc"])
+                    for category, result in report["functions"][name].items()
+                ),
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
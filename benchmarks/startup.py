@@ -0,0 +1,90 @@
+"""
+Time the cold start of a process with and without a bundle.
+
+    python -m benchmarks.startup
+
+A cold start is importing th_preprocessor.preprocess and the first
+preprocess() call, each in a fresh interpreter. The
+bundle is built into a temporary directory first. Exits with 1 when the
+bundle does not make the cold start faster.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Optional
+
+CODE = """
+import json, time
+start = time.perf_counter()
+import th_preprocessor.preprocess as module
+imported = time.perf_counter()
+module.preprocess("ทดสอบ 😀😀 http://www.example.com 081-234-5678")
+called = time.perf_counter()
+print(json.dumps([imported - start, called - imported]))
+"""
+
+PARTS = ("import", "first_call")
+
+
+def measure_startup(runs: int, cache_dir: Optional[str]) -> Dict[str, float]:
+    env = dict(os.environ)
+    env.pop("TH_PREPROCESSOR_CACHE_DIR", None)
+    if cache_dir:
+        env["TH_PREPROCESSOR_CACHE_DIR"] = cache_dir
+    samples = [
+        json.loads(subprocess.check_output([sys.executable, "-c", CODE], env=env))
+        for _ in range(runs)
+    ]
+    result = {
+        "{}_ms".format(part): statistics.median(sample[i] for sample in samples) * 1e3
+        for i, part in enumerate(PARTS)
+    }
+    result["total_ms"] = statistics.median(sum(sample) for sample in samples) * 1e3
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--runs", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        subprocess.check_call(
+            [sys.executable, "-m", "th_preprocessor.bundle", cache_dir],
+            stdout=subprocess.DEVNULL,
+        )
+        results = {
+            "without bundle": measure_startup(args.runs, None),
+            "with bundle": measure_startup(args.runs, cache_dir),
+        }
+    finally:
+        shutil.rmtree(cache_dir)
+
+    print(
+        "{:<16} {:>10} {:>12} {:>10}".format(
+            "median (ms)", "import", "first call", "total"
+        )
+    )
+    for name, result in results.items():
+        print(
+            "{:<16} {:>10.1f} {:>12.1f} {:>10.1f}".format(
+                name, result["import_ms"], result["first_call_ms"], result["total_ms"]
+            )
+        )
+    before = results["without bundle"]["total_ms"]
+    after = results["with bundle"]["total_ms"]
+    if after >= before:
+        print("The bundle did not make the cold start faster")
+        return 1
+    print("{:.1f}x faster with the bundle".format(before / after))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
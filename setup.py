@@ -1,11 +1,16 @@
+import re
+
 from setuptools import find_packages, setup
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+with open("th_preprocessor/__init__.py", "r") as fh:
+    version = re.search(r'__version__ = "(.*)"', fh.read()).group(1)
+
 setup(
     name="th-simple-preprocessor",
-    version="0.10.1",
+    version=version,
     author="WISESIGHT Product Development",
     author_email="tequila@wisesight.com",
     description="Simple Thai Preprocess Functions",
@@ -14,6 +19,9 @@ setup(
     url="https://github.com/wisesight/th-simple-preprocessor",
     install_requires=["emoji"],
     packages=find_packages(),
+    entry_points={
+        "console_scripts": ["th-preprocess=th_preprocessor.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
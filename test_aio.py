@@ -0,0 +1,194 @@
+import asyncio
+import concurrent.futures
+import io
+import json
+import os
+import signal
+import sys
+
+from nose.tools import assert_equal, assert_raises
+
+from th_preprocessor.aio import AsyncPreprocessor, apreprocess, apreprocess_stream
+from th_preprocessor.preprocess import Preprocessor, preprocess
+from th_preprocessor.server import parse_address, serve_stdio, start_http_server
+
+
+def fussy(text):
+    if text == "fail":
+        raise RuntimeError("cannot preprocess")
+    return preprocess(text)
+
+
+def worker_pid(text):
+    return str(os.getpid())
+
+
+async def raw_request(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body.decode("utf-8"))
+
+
+class Test_aio(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello 555555",
+            "",
+        ]
+
+    def test_apreprocess(self):
+        async def run():
+            results = await asyncio.gather(*(apreprocess(text) for text in self.texts))
+            streamed = [result async for result in apreprocess_stream(self.texts)]
+            return results, streamed
+
+        results, streamed = asyncio.run(run())
+        assert_equal(results, [preprocess(text) for text in self.texts])
+        assert_equal(streamed, results)
+
+    def test_threads_and_async_input(self):
+        preprocessor = Preprocessor(["lower", "normalize_link"])
+
+        async def texts():
+            for text in self.texts * 20:
+                await asyncio.sleep(0)
+                yield text
+
+        async def run():
+            async with AsyncPreprocessor(
+                preprocessor, workers=2, executor="thread", max_batch=8, max_pending=4
+            ) as pool:
+                return [result async for result in pool.map(texts())]
+
+        assert_equal(
+            asyncio.run(run()), [preprocessor(text) for text in self.texts * 20]
+        )
+
+    def test_cancel(self):
+        async def run():
+            async with AsyncPreprocessor(executor="thread", workers=1) as pool:
+                tasks = [asyncio.ensure_future(pool(text)) for text in self.texts]
+                tasks[1].cancel()
+                return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert isinstance(results[1], asyncio.CancelledError)
+        assert_equal(results[0], preprocess(self.texts[0]))
+        assert_equal(results[2], preprocess(self.texts[2]))
+
+    def test_map_error(self):
+        async def texts():
+            yield self.texts[0]
+            raise KeyError("broken input")
+
+        async def run():
+            async with AsyncPreprocessor(executor="thread") as pool:
+                return [result async for result in pool.map(texts())]
+
+        assert_raises(KeyError, asyncio.run, run())
+        assert_raises(ValueError, AsyncPreprocessor, executor="fiber")
+
+    def test_dead_worker(self):
+        async def run():
+            async with AsyncPreprocessor(worker_pid, workers=1) as pool:
+                pid = int(await asyncio.wait_for(pool("x"), 30))
+                os.kill(pid, signal.SIGKILL)
+                with assert_raises(concurrent.futures.BrokenExecutor):
+                    await asyncio.wait_for(pool("x"), 30)
+                # A new pool takes over
+                return pid, int(await asyncio.wait_for(pool("x"), 30))
+
+        pid, new_pid = asyncio.run(run())
+        assert new_pid != pid
+
+    def test_http_server(self):
+        async def request(port, method, body=b""):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            head = "{} / HTTP/1.1\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+            writer.write(head.format(method, len(body)).encode("ascii") + body)
+            response = await reader.read()
+            writer.close()
+            head, _, body = response.partition(b"\r\n\r\n")
+            return int(head.split()[1]), json.loads(body.decode("utf-8"))
+
+        async def run():
+            async with AsyncPreprocessor(executor="thread") as pool:
+                server = await start_http_server(pool, "127.0.0.1", 0)
+                port = server.sockets[0].getsockname()[1]
+                async with server:
+                    one = await request(
+                        port, "POST", json.dumps({"text": self.texts[0]}).encode()
+                    )
+                    many = await request(
+                        port, "POST", json.dumps({"texts": self.texts}).encode()
+                    )
+                    bad = await request(port, "POST", b"{")
+                    wrong_method = await request(port, "PUT")
+                return one, many, bad, wrong_method
+
+        one, many, bad, wrong_method = asyncio.run(run())
+        assert_equal(one, (200, {"text": preprocess(self.texts[0])}))
+        assert_equal(many, (200, {"texts": [preprocess(t) for t in self.texts]}))
+        assert_equal(bad[0], 400)
+        assert_equal(wrong_method[0], 405)
+        assert_equal(parse_address("8080"), ("127.0.0.1", 8080))
+        assert_equal(parse_address("0.0.0.0:80"), ("0.0.0.0", 80))
+
+    def test_http_server_errors(self):
+        def post(length, body):
+            head = "POST / HTTP/1.1\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+            return head.format(length).encode("ascii") + body
+
+        async def run():
+            async with AsyncPreprocessor(fussy, executor="thread") as pool:
+                server = await start_http_server(pool, "127.0.0.1", 0)
+                port = server.sockets[0].getsockname()[1]
+                body = json.dumps({"text": "fail"}).encode()
+                async with server:
+                    return [
+                        await raw_request(port, post("abc", b"")),
+                        await raw_request(port, post(-1, b"")),
+                        await raw_request(port, post(len(body), body)),
+                        await raw_request(port, b"GET /" + b"x" * 100000 + b"\r\n"),
+                    ]
+
+        responses = asyncio.run(run())
+        assert_equal([status for status, _ in responses], [400, 400, 500, 400])
+        for _, response in responses:
+            assert_equal(list(response), ["error"])
+
+    def test_stdio_server(self):
+        lines = [
+            json.dumps(self.texts[0]),
+            "{",
+            json.dumps({"text": self.texts[1]}),
+            json.dumps({"no text": 1}),
+            json.dumps(["a list"]),
+            json.dumps("fail"),
+            json.dumps(self.texts[2]),
+        ]
+
+        async def run():
+            async with AsyncPreprocessor(fussy, executor="thread") as pool:
+                await serve_stdio(pool)
+
+        stdin, stdout = sys.stdin, sys.stdout
+        sys.stdin = io.StringIO("\n".join(lines) + "\n")
+        sys.stdout = io.StringIO()
+        try:
+            asyncio.run(run())
+            answers = [json.loads(line) for line in sys.stdout.getvalue().splitlines()]
+        finally:
+            sys.stdin, sys.stdout = stdin, stdout
+        # One answer per line, in order, errors in place of the bad lines
+        assert_equal(len(answers), len(lines))
+        assert_equal(answers[0], preprocess(self.texts[0]))
+        assert_equal(answers[2], preprocess(self.texts[1]))
+        assert_equal(answers[6], preprocess(self.texts[2]))
+        for i in [1, 3, 4, 5]:
+            assert_equal(list(answers[i]), ["error"])
@@ -0,0 +1,126 @@
+from nose.tools import assert_equal
+
+from th_preprocessor.alignment import (
+    Entity,
+    preprocess_aligned,
+    preprocess_with_entities,
+)
+from th_preprocessor.preprocess import (
+    DATE_STAGES,
+    STAGES,
+    Pipeline,
+    Preprocessor,
+    preprocess,
+)
+
+
+class Test_alignment(object):
+    def __init__(self):
+        self.texts = [
+            "ติดต่อ  HTTP://WWW.Example.com นะคะ😀😀 โทร 081-234-5678",
+            "<div>Test HTML</div> &amp; @test1234 a@b.com hahaha 5555 ถถถถ",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello ๑๒๓",
+            "  İSTANBUL ΣΟΦΟΣ ẹ́x ﬁ ½ ใช่ป่าวววววว 👍🏽👍🏽👍🏽  \n\n\n  end  ",
+            "",
+        ]
+
+    def test_same_text_as_preprocess(self):
+        every_stage = Preprocessor(list(STAGES))
+        for text in self.texts:
+            assert_equal(preprocess_aligned(text)[0], preprocess(text))
+            assert_equal(preprocess_aligned(text, every_stage)[0], every_stage(text))
+            for name in STAGES:
+                preprocessor = Preprocessor([name])
+                assert_equal(
+                    preprocess_aligned(text, preprocessor)[0], preprocessor(text)
+                )
+
+    def test_alignment_is_monotonic(self):
+        for text in self.texts:
+            output, alignment = preprocess_aligned(text)
+            assert_equal(len(alignment), len(output))
+            assert_equal(list(alignment.starts), sorted(alignment.starts))
+            assert_equal(list(alignment.ends), sorted(alignment.ends))
+            for start, end in zip(alignment.starts, alignment.ends):
+                assert 0 <= start <= end <= len(text)
+
+    def test_project_spans(self):
+        text = self.texts[0]
+        output, alignment = preprocess_aligned(text)
+        assert_equal(output, "ติดต่อ WSLINK นะคะ 😀 😀 โทร WSPHONE")
+
+        start = output.index("WSLINK")
+        raw_start, raw_end = alignment.to_source(start, start + len("WSLINK"))
+        assert_equal(text[raw_start:raw_end], "HTTP://WWW.Example.com")
+
+        raw_start = text.index("นะคะ")
+        start, end = alignment.to_output(raw_start, raw_start + 4)
+        assert_equal(output[start:end], "นะคะ")
+        assert_equal(alignment.to_source(start, end), (raw_start, raw_start + 4))
+
+        raw_start = text.index("081")
+        start, end = alignment.to_output(raw_start, raw_start + 3)
+        assert_equal(output[start:end].strip(), "WSPHONE")
+
+        # Both spaces became the one left by remove_dup_spaces
+        raw_start = text.index("  ")
+        for i in range(2):
+            start, end = alignment.to_output(raw_start + i, raw_start + i + 1)
+            assert_equal(output[start:end], " ")
+
+        # Every character of a replacement, padding included, maps to the
+        # whole emoji
+        raw_start = text.index("😀")
+        start, end = alignment.to_output(raw_start, raw_start + 2)
+        assert_equal(output[start:end].strip(), "😀 😀")
+
+    def test_pipeline_options(self):
+        pipeline = Pipeline().with_options("normalize_link", place_holder=" URL ")
+        output, alignment = preprocess_aligned(self.texts[0], pipeline)
+        assert_equal(output, pipeline(self.texts[0]))
+        start = output.index("URL")
+        raw_start, raw_end = alignment.to_source(start, start + 3)
+        assert_equal(self.texts[0][raw_start:raw_end], "HTTP://WWW.Example.com")
+
+    def test_preprocess_with_entities(self):
+        text = (
+            "&lt;b&gt;ติดต่อ @Somchai HTTP://WWW.Example.com a@b.com "
+            "081-234-5678 a.PNG"
+        )
+        output, entities = preprocess_with_entities(text)
+        assert_equal(output, preprocess(text))
+        assert_equal(
+            [(entity.type, entity.text) for entity in entities],
+            [
+                ("mention", "@Somchai"),
+                ("link", "HTTP://WWW.Example.com"),
+                ("email", "a@b.com"),
+                ("phone", "081-234-5678"),
+                ("filename", "a.PNG"),
+            ],
+        )
+        for entity in entities:
+            assert_equal(text[entity.start : entity.end], entity.text)
+
+        for text in self.texts:
+            assert_equal(preprocess_with_entities(text)[0], preprocess(text))
+        assert_equal(preprocess_with_entities("ไม่มีอะไร"), ("ไม่มีอะไร", []))
+
+    def test_entities_custom_stages(self):
+        preprocessor = Preprocessor(["normalize_email", "lower"])
+        output, entities = preprocess_with_entities("Mail A@B.COM", preprocessor)
+        assert_equal(output, preprocessor("Mail A@B.COM"))
+        assert_equal(entities, [Entity("email", "A@B.COM", 5, 12)])
+        preprocessor = Preprocessor(["lower"])
+        assert_equal(preprocess_with_entities("A@B.COM", preprocessor), ("a@b.com", []))
+        preprocessor = Preprocessor(DATE_STAGES)
+        text = "นัด 3 ม.ค. 2562 โทร 081-234-5678"
+        output, entities = preprocess_with_entities(text, preprocessor)
+        assert_equal(output, preprocessor(text))
+        assert_equal(
+            entities,
+            [
+                Entity("date", "3 ม.ค. 2562", 4, 15),
+                Entity("phone", "081-234-5678", 20, 32),
+            ],
+        )
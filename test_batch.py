@@ -0,0 +1,33 @@
+from nose.tools import assert_equal
+
+from th_preprocessor.batch import SERIAL_THRESHOLD, preprocess_many
+from th_preprocessor.preprocess import Preprocessor, preprocess
+
+
+class Test_batch(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello 555555",
+        ]
+
+    def test_preprocess_many_serial(self):
+        expected_result = [preprocess(text) for text in self.texts]
+        assert_equal(preprocess_many(self.texts, workers=2), expected_result)
+
+    def test_preprocess_many_workers(self):
+        texts = self.texts * (SERIAL_THRESHOLD // len(self.texts) + 1)
+        expected_result = [preprocess(text) for text in texts]
+        assert_equal(preprocess_many(iter(texts), workers=2), expected_result)
+        assert_equal(preprocess_many(texts, workers=2, chunksize=7), expected_result)
+
+    def test_preprocess_many_preprocessor(self):
+        preprocessor = Preprocessor(["lower", "normalize_link"])
+        texts = self.texts * (SERIAL_THRESHOLD // len(self.texts) + 1)
+        expected_result = [preprocessor(text) for text in texts]
+        assert_equal(
+            preprocess_many(texts, workers=2, preprocessor=preprocessor),
+            expected_result,
+        )
@@ -0,0 +1,134 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from nose.tools import assert_equal, assert_raises
+
+from th_preprocessor import __version__, bundle
+from th_preprocessor.emoji_matcher import EmojiMatcher, get_emoji_matcher
+from th_preprocessor.preprocess import TextReplacer, _compile_replace_run, preprocess
+
+CHILD = """
+import json, sys
+from th_preprocessor import bundle
+from th_preprocessor.preprocess import preprocess
+texts = json.loads(sys.stdin.read())
+print(json.dumps({
+    "results": [preprocess(text) for text in texts],
+    "bundled": bundle.get_bundle() is not None,
+    "emoji_imported": "emoji" in sys.modules,
+}))
+"""
+
+
+class Test_bundle(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789 😀😀😀",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello 555555 ©ก'",
+            "กินข้าวแล้วครับ โทร 02-123-4567 ต่อ e12",
+        ]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_child(self, cache_dir):
+        env = dict(os.environ, TH_PREPROCESSOR_CACHE_DIR=cache_dir)
+        process = subprocess.run(
+            [sys.executable, "-c", CHILD],
+            input=json.dumps(self.texts),
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        child = json.loads(process.stdout)
+        child["stderr"] = process.stderr
+        return child
+
+    def build(self):
+        subprocess.run(
+            [sys.executable, "-m", "th_preprocessor.bundle", self.tmp_dir],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        return bundle.bundle_path(self.tmp_dir)
+
+    def test_entries_round_trip(self):
+        path = os.path.join(self.tmp_dir, "entries.bin")
+        replacer = TextReplacer([("ก", "x"), ("ab", "c"), ("cd", "e"), ("e", "f")])
+        emoji_trie = {"😀": {"": {}}, "\ud800": {"": {}}, "a": {"b": {"": {}}}}
+        bundle.write(
+            path,
+            {
+                "r": replacer._plan_runs(),
+                "e": emoji_trie,
+            },
+        )
+        loaded = bundle.Bundle(path)
+        assert_equal(len(loaded), 2)
+        assert_equal(loaded.stamp, bundle._stamp())
+        runs = [_compile_replace_run(kind, pairs) for kind, pairs in loaded["r"]]
+        for text in ["กab", "abcd ก", "กินข้าวแล้วครับ", "e"]:
+            expected = replacer(text)
+            for run in runs:
+                text = run(text)
+            assert_equal(text, expected)
+        assert_equal(loaded["e"], emoji_trie)
+
+    def test_emoji_trie_file(self):
+        path = os.path.join(self.tmp_dir, "emoji.json")
+        matcher = get_emoji_matcher()
+        matcher.save(path)
+        copy = EmojiMatcher.load(path)
+        assert_equal(copy.trie, matcher.trie)
+        for text in self.texts:
+            assert_equal(list(copy.finditer(text)), list(matcher.finditer(text)))
+
+        with open(path, "w") as f:
+            f.write("[]")
+        assert_raises(ValueError, EmojiMatcher.load, path)
+
+    def test_build_and_use(self):
+        path = self.build()
+        assert os.path.exists(path)
+        child = self.run_child(self.tmp_dir)
+        assert_equal(child["results"], [preprocess(text) for text in self.texts])
+        assert child["bundled"]
+        # The emoji matcher came from the bundle
+        assert not child["emoji_imported"]
+
+    def test_stale_or_broken_bundle_is_ignored(self):
+        path = self.build()
+        with open(path, "rb") as f:
+            data = f.read()
+        # Another th_preprocessor version
+        stamp = json.dumps(__version__).encode("ascii")
+        with open(path, "wb") as f:
+            f.write(data.replace(stamp, b'"' + b"0" * (len(stamp) - 2) + b'"', 1))
+        child = self.run_child(self.tmp_dir)
+        assert not child["bundled"]
+        assert "another th_preprocessor" in child["stderr"]
+        assert_equal(child["results"], [preprocess(text) for text in self.texts])
+
+        with open(path, "wb") as f:
+            f.write(data[: len(data) // 2])
+        child = self.run_child(self.tmp_dir)
+        assert "bundle" in child["stderr"]
+        assert_equal(child["results"], [preprocess(text) for text in self.texts])
+
+        with open(path, "wb") as f:
+            f.write(b"not a bundle")
+        child = self.run_child(self.tmp_dir)
+        assert not child["bundled"]
+        assert "unreadable bundle" in child["stderr"]
+        assert_equal(child["results"], [preprocess(text) for text in self.texts])
+
+    def test_build_needs_fresh_process(self):
+        assert_raises(RuntimeError, bundle.build, self.tmp_dir)
@@ -0,0 +1,147 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+from nose.tools import assert_equal
+
+from th_preprocessor import cache
+from th_preprocessor.batch import SERIAL_THRESHOLD, preprocess_many
+from th_preprocessor.cache import PreprocessCache
+from th_preprocessor.preprocess import DEFAULT_STAGES, Preprocessor, preprocess
+from th_preprocessor.profiling import StageProfiler
+
+
+class Test_cache(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello 555555",
+        ]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hits_and_misses(self):
+        cached = PreprocessCache()
+        for text in self.texts * 3:
+            assert_equal(cached(text), preprocess(text))
+        info = cached.cache_info()
+        assert_equal((info.hits, info.misses, info.entries), (6, 3, 3))
+        assert_equal(cached(""), "")
+        cached.cache_clear()
+        assert_equal(cached.cache_info(), (0, 0, 0, 0, 0))
+
+    def test_lru_eviction(self):
+        cached = PreprocessCache(max_entries=2)
+        for text in self.texts[:2] + self.texts[:1] + self.texts[2:]:
+            cached(text)
+        # texts[1] was the least recently used
+        assert_equal(list(cached._results), [self.texts[0], self.texts[2]])
+        assert_equal(cached.cache_info().evictions, 1)
+
+        cached = PreprocessCache(max_entries=None, max_bytes=1)
+        cached(self.texts[0])
+        assert_equal(cached.cache_info().entries, 0)
+
+    def test_custom_preprocessor_and_profiler(self):
+        preprocessor = Preprocessor(["lower", "normalize_link"])
+        cached = PreprocessCache(preprocessor)
+        profiler = StageProfiler()
+        for text in self.texts * 2:
+            assert_equal(cached(text, profiler), preprocessor(text))
+        assert_equal(profiler.stages["lower"]["calls"], len(self.texts))
+
+    def test_threads(self):
+        cached = PreprocessCache(max_entries=2)
+        results = []
+
+        def work():
+            results.extend(cached(text) for text in self.texts * 50)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        expected_result = [preprocess(text) for text in self.texts * 50] * 4
+        assert_equal(sorted(results), sorted(expected_result))
+        info = cached.cache_info()
+        assert_equal(info.hits + info.misses, len(results))
+
+    def test_file_shared_between_workers(self):
+        path = os.path.join(self.tmp_dir, "cache.sqlite")
+        texts = self.texts * (SERIAL_THRESHOLD // len(self.texts))
+        cached = PreprocessCache(max_entries=10, path=path)
+        results = preprocess_many(texts, workers=2, preprocessor=cached)
+        assert_equal(results, [preprocess(text) for text in texts])
+
+        other = PreprocessCache(path=path)
+        for text in self.texts:
+            assert_equal(other(text), preprocess(text))
+        assert_equal(other.cache_info().misses, 0)
+
+        other = PreprocessCache(Preprocessor(["lower"]), path=path)
+        assert_equal(other(self.texts[0]), self.texts[0].lower())
+        assert_equal(other.cache_info().misses, 1)
+
+    def test_file_keyed_by_version_and_stages(self):
+        path = os.path.join(self.tmp_dir, "cache.sqlite")
+        first = PreprocessCache(path=path)
+        first(self.texts[0])
+        first.flush()
+        same = PreprocessCache(Preprocessor(DEFAULT_STAGES), path=path)
+        same(self.texts[0])
+        assert_equal(same.cache_info().misses, 0)
+
+        # Results of another release are not reused
+        version = cache.__version__
+        cache.__version__ = "0.0.0"
+        try:
+            upgraded = PreprocessCache(path=path)
+            upgraded(self.texts[0])
+        finally:
+            cache.__version__ = version
+        assert_equal(upgraded.cache_info().misses, 1)
+
+    def test_file_written_in_batches(self):
+        path = os.path.join(self.tmp_dir, "cache.sqlite")
+
+        def saved():
+            with sqlite3.connect(path) as db:
+                return db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+        texts = ["text {}".format(i) for i in range(10)]
+        save_batch = cache.SAVE_BATCH
+        cache.SAVE_BATCH = 4
+        try:
+            cached = PreprocessCache(max_entries=2, path=path)
+            for text in texts:
+                assert_equal(cached(text), preprocess(text))
+            assert_equal(saved(), 8)
+            # Evicted from memory but not written yet
+            assert_equal(cached(texts[-2]), preprocess(texts[-2]))
+            assert_equal(cached.cache_info().misses, len(texts))
+            cached.flush()
+            assert_equal(saved(), 10)
+
+            # preprocess_many() writes the rest of a run without flush()
+            other = PreprocessCache(path=path)
+            more = texts + ["more {}".format(i) for i in range(5)]
+            assert_equal(
+                preprocess_many(more, workers=1, preprocessor=other),
+                [preprocess(text) for text in more],
+            )
+            assert_equal(other.cache_info().misses, 5)
+            assert_equal(saved(), 15)
+        finally:
+            cache.SAVE_BATCH = save_batch
+
+    def test_profiler_with_plain_function(self):
+        cached = PreprocessCache(str.upper)
+        profiler = StageProfiler()
+        assert_equal(cached("abc", profiler), "ABC")
+        assert_equal(profiler.stages["upper"]["calls"], 1)
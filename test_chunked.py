@@ -0,0 +1,114 @@
+import random
+
+from nose.tools import assert_equal, assert_raises
+
+from th_preprocessor.chunked import preprocess_chunks
+from th_preprocessor.preprocess import (
+    DATE_STAGES,
+    STAGES,
+    Pipeline,
+    Preprocessor,
+    preprocess,
+)
+
+
+class SizedPreprocessor(Preprocessor):
+    # Records the length of every text it preprocesses
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sizes = []
+
+    def __call__(self, text, profiler=None):
+        self.sizes.append(len(text))
+        return super().__call__(text, profiler)
+
+
+class Test_chunked(object):
+    def __init__(self):
+        self.parts = [
+            "สวัสดีครับ วันนี้อากาศดีมาก",
+            '<div class="post">Test HTML</div>',
+            "&lt;b&gt;ตัวหนา&lt;/b&gt;",
+            "ดูที่ http://www.youtube.com/watch?v=1 หรือ www.example.com",
+            "โทร 02 123 4567 ต่อ e12 หรือ +66 81 234 5678",
+            "ติดต่อ @Somchai หรือ somchai@example.com",
+            "ha ha ha hahaha ถถถถ 55555",
+            "ใช่ป่าววววว   righttttt 😀😀😀",
+            "ราคา 1,299.00 บาท\r\n\n\tลด 50%",
+            "'quoted' ''",
+            "นัด 3 มกราคม 2562 หรือ มกราคม พ.ศ. 2562 เวลา 04:00 นาฬิกา ครับ",
+        ]
+        self.document = "\n\n".join(self.parts * 20)
+
+    def test_same_as_preprocess(self):
+        expected = preprocess(self.document)
+        for window in [1, 7, 50, 400, 10**6]:
+            pieces = list(preprocess_chunks(self.document, window))
+            assert_equal("".join(pieces), expected)
+        assert len(list(preprocess_chunks(self.document, 400))) > 1
+
+    def test_pieces_of_any_size(self):
+        expected = preprocess(self.document)
+        r = random.Random(0)
+        cuts = sorted(r.sample(range(len(self.document)), 300))
+        pieces = [
+            self.document[start:end]
+            for start, end in zip([0] + cuts, cuts + [len(self.document)])
+        ]
+        assert_equal("".join(preprocess_chunks(iter(pieces), 100)), expected)
+        lines = self.document.splitlines(keepends=True)
+        assert_equal("".join(preprocess_chunks(lines, 100)), expected)
+
+    def test_straddling_matches(self):
+        # Every window ends inside the link, phone number, tag or "hahaha"
+        for text in [
+            "ก " * 10 + "www.example.com/path " + "ข " * 10,
+            "ก " * 10 + "02 123 4567 ต่อ e12 " + "ข " * 10,
+            "ก " * 10 + '<a title="one two three">' + "ข " * 10,
+            "ก " * 10 + "&lt;a title=one two three&gt;" + "ข " * 10,
+            "ก " * 10 + "ha ha ha ha ถถถ " + "ข " * 10,
+        ]:
+            for window in range(1, len(text) + 1):
+                assert_equal("".join(preprocess_chunks(text, window)), preprocess(text))
+
+    def test_window_size(self):
+        preprocessor = SizedPreprocessor()
+        text = "สวัสดีครับ วันนี้อากาศดีมาก ไปเที่ยวกันไหม ok thx\n" * 100
+        output = "".join(preprocess_chunks(text, 200, preprocessor))
+        assert_equal(output, preprocess(text))
+        # The windows, and "b\nb" once for the separator "\n" becomes
+        windows = [size for size in preprocessor.sizes if size != 3]
+        assert_equal(len(windows), len(preprocessor.sizes) - 1)
+        assert len(windows) > len(text) // 200
+        assert max(windows) <= 200
+        # Cut after a tag or a link, when there is no place to cut before
+        preprocessor.sizes = []
+        output = "".join(preprocess_chunks(self.document, 200, preprocessor))
+        assert_equal(output, preprocess(self.document))
+        assert len(preprocessor.sizes) > 20
+
+    def test_other_stages(self):
+        r = random.Random(1)
+        document = "\n".join(r.sample(self.parts * 3, 30))
+        preprocessors = [
+            Pipeline().with_options("normalize_link", place_holder=" URL "),
+            Preprocessor(sorted(STAGES)),
+            Preprocessor(DATE_STAGES),
+            Preprocessor(["lower", "remove_dup_spaces"]),
+            Preprocessor(["unescape_html", "unescape_html", "remove_tag"]),
+        ] + [Preprocessor(r.sample(sorted(STAGES), 8)) for _ in range(20)]
+        for preprocessor in preprocessors:
+            for window in [5, 60]:
+                assert_equal(
+                    "".join(preprocess_chunks(document, window, preprocessor)),
+                    preprocessor(document),
+                )
+
+    def test_empty(self):
+        assert_equal(list(preprocess_chunks("", 10)), [])
+        assert_equal(list(preprocess_chunks(["", " \n "], 1)), [])
+        assert_equal("".join(preprocess_chunks("x" * 100, 10)), "x" * 100)
+
+    def test_invalid_arguments(self):
+        assert_raises(ValueError, preprocess_chunks, "text", 0)
+        assert_raises(TypeError, preprocess_chunks, "text", 10, str.upper)
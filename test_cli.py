@@ -0,0 +1,125 @@
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from nose.tools import assert_equal
+
+from th_preprocessor.cli import main
+from th_preprocessor.preprocess import Pipeline, Preprocessor, preprocess
+
+
+class Test_cli(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello 555555",
+        ]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def test_jsonl_gzip(self):
+        with gzip.open(self.path("in.jsonl.gz"), "wt", encoding="utf-8") as f:
+            for i, text in enumerate(self.texts):
+                f.write(json.dumps({"id": i, "text": text}) + "\n")
+            f.write(json.dumps({"id": 99}) + "\n")
+        main([self.path("in.jsonl.gz"), "-o", self.path("out.jsonl.gz")])
+        with gzip.open(self.path("out.jsonl.gz"), "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        expected_result = [
+            {"id": i, "text": preprocess(text)} for i, text in enumerate(self.texts)
+        ] + [{"id": 99}]
+        assert_equal(records, expected_result)
+
+    def test_csv_suffix(self):
+        with open(self.path("in.csv"), "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "message"])
+            writer.writerows(enumerate(self.texts))
+        main(
+            [
+                self.path("in.csv"),
+                "--field",
+                "message",
+                "--suffix",
+                "_clean",
+                "-o",
+                self.path("out.csv"),
+            ]
+        )
+        with open(self.path("out.csv"), encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        expected_result = [
+            {"id": str(i), "message": text, "message_clean": preprocess(text)}
+            for i, text in enumerate(self.texts)
+        ]
+        assert_equal(rows, expected_result)
+
+    def test_text_stages(self):
+        with open(self.path("in.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.texts) + "\n")
+        stages = "lower,normalize_link,remove_dup_spaces"
+        main([self.path("in.txt"), "--stages", stages, "-o", self.path("out.txt")])
+        with open(self.path("out.txt"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        preprocessor = Preprocessor(stages.split(","))
+        assert_equal(lines, [preprocessor(text) for text in self.texts])
+
+    def test_text_cache(self):
+        with open(self.path("in.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.texts * 3) + "\n")
+        main([self.path("in.txt"), "--cache", "2", "-o", self.path("out.txt")])
+        with open(self.path("out.txt"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert_equal(lines, [preprocess(text) for text in self.texts * 3])
+
+    def test_text_pipeline(self):
+        with open(self.path("in.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(self.texts) + "\n")
+        pipeline = Pipeline().without("normalize_num")
+        with open(self.path("pipeline.json"), "w", encoding="utf-8") as f:
+            f.write(pipeline.to_json())
+        main(
+            [
+                self.path("in.txt"),
+                "--pipeline",
+                self.path("pipeline.json"),
+                "-o",
+                self.path("out.txt"),
+            ]
+        )
+        with open(self.path("out.txt"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert_equal(lines, [pipeline(text) for text in self.texts])
+
+    def test_text_bare_carriage_return(self):
+        with open(self.path("in.txt"), "wb") as f:
+            f.write("a\rb\nกิน\r\nx\n".encode("utf-8"))
+        main([self.path("in.txt"), "--stages", "lower", "-o", self.path("out.txt")])
+        with open(self.path("out.txt"), encoding="utf-8", newline="") as f:
+            lines = f.read().split("\n")
+        assert_equal(lines, ["a\rb", "กิน", "x", ""])
+
+    def test_jsonl_not_an_object(self):
+        for line in ['"abc"', "[1]", "3", "{"]:
+            with open(self.path("in.jsonl"), "w", encoding="utf-8") as f:
+                f.write(json.dumps({"text": self.texts[0]}) + "\n\n" + line + "\n")
+            stderr = sys.stderr
+            sys.stderr = io.StringIO()
+            try:
+                code = main([self.path("in.jsonl"), "-o", self.path("out.jsonl")])
+                error = sys.stderr.getvalue()
+            finally:
+                sys.stderr = stderr
+            assert_equal(code, 1)
+            assert "in.jsonl:3: " in error, error
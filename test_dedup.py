@@ -0,0 +1,111 @@
+import importlib
+from unittest import SkipTest
+
+from nose.tools import assert_equal, assert_raises
+
+from th_preprocessor.dedup import NearDuplicateIndex
+from th_preprocessor.preprocess import preprocess
+
+
+class Test_dedup(object):
+    def __init__(self):
+        self.post = (
+            "🔥 โปรโมชั่นพิเศษ ลดราคา 50% วันนี้เท่านั้น สั่งซื้อเลยที่ "
+            "https://shop.example.com/p/123 ติดต่อ @promo_team ส่งฟรีทั่วประเทศ"
+        )
+        self.copy = (
+            "🔥 โปรโมชั่นพิเศษ ลดราคา 70% วันนี้เท่านั้น สั่งซื้อเลยที่ "
+            "http://bit.ly/xYz9 ติดต่อ @shop_admin ส่งฟรีทั่วประเทศ"
+        )
+        self.other = (
+            "วันนี้ฝนตกหนักมาก รถติดยาวตั้งแต่เช้า ใครผ่านแถวนี้ระวังด้วยนะครับ"
+        )
+
+    def test_near_duplicates(self):
+        index = NearDuplicateIndex()
+        assert_equal(index.check(self.post), None)
+        assert_equal(index.check(self.other), None)
+        # Another link, mention and number: the same preprocessed text
+        assert_equal(index.check(self.copy), 0)
+        assert_equal(len(index), 2)
+        ((key, similarity),) = index.query(self.copy)
+        assert_equal((key, similarity), (0, 1.0))
+        assert_equal(index.query("ฝนตก"), [])
+
+    def test_filter_and_flag(self):
+        texts = [self.post, self.copy, self.other, self.post + " 555", self.other]
+        assert_equal(
+            list(NearDuplicateIndex().filter(texts, batch_size=2)),
+            [self.post, self.other],
+        )
+        assert_equal(
+            [original for _, original in NearDuplicateIndex().flag(texts)],
+            [None, 0, None, 0, 2],
+        )
+
+    def test_empty_texts_are_never_duplicates(self):
+        index = NearDuplicateIndex()
+        assert_equal(list(index.filter(["", "<b></b>", ""])), ["", "<b></b>", ""])
+        assert_equal(len(index), 0)
+
+    def test_keys_and_removal(self):
+        index = NearDuplicateIndex()
+        index.add(self.post, key="post-1")
+        assert "post-1" in index
+        assert_equal(index.check(self.copy, key="post-2"), "post-1")
+        assert "post-2" not in index
+        index.remove("post-1")
+        assert_equal(index.query(self.copy), [])
+        assert_equal(index.check(self.copy, key="post-2"), None)
+        assert "post-2" in index
+
+    def test_eviction(self):
+        index = NearDuplicateIndex(max_entries=2)
+        index.add(self.post)
+        index.add(self.other)
+        # A match keeps the original over older texts
+        assert_equal(index.check(self.copy), 0)
+        index.add("ข้อความใหม่ที่ไม่ซ้ำกับอะไรเลย อีกข้อความหนึ่ง")
+        assert_equal(len(index), 2)
+        assert 0 in index
+        assert 1 not in index
+        assert_equal(index.check(self.other), None)
+
+    def test_signatures_same_with_and_without_numpy(self):
+        try:
+            importlib.import_module("numpy")
+        except ImportError:
+            raise SkipTest("numpy is not installed")
+        texts = [self.post, self.copy, self.other, "", "ab", "<b>x</b>", "a" * 40000]
+        for shingle_size in [1, 3, 5]:
+            index = NearDuplicateIndex(shingle_size=shingle_size, num_perm=32)
+            assert_equal(
+                index.signatures(texts), [index.signature(text) for text in texts]
+            )
+        index = NearDuplicateIndex(preprocessor=None)
+        normalized = [preprocess(text) for text in texts]
+        assert_equal(
+            index.signatures(normalized), NearDuplicateIndex().signatures(texts)
+        )
+
+    def test_signatures_lone_surrogates(self):
+        try:
+            importlib.import_module("numpy")
+        except ImportError:
+            raise SkipTest("numpy is not installed")
+        texts = ["\ud800", "ab\udfffcd", "\udc00\ud83dx😀", "ok"]
+        index = NearDuplicateIndex(preprocessor=None, shingle_size=2, num_perm=32)
+        assert_equal(index.signatures(texts), [index.signature(text) for text in texts])
+
+    def test_signatures_without_shingles(self):
+        index = NearDuplicateIndex(preprocessor=None)
+        assert_equal(index.signatures([]), [])
+        assert_equal(index.signatures(["", "", ""]), [None, None, None])
+        assert_equal(index.signatures(iter([""])), [None])
+        # Nothing left after preprocessing
+        assert_equal(NearDuplicateIndex().signatures(["<b></b>", "   "]), [None, None])
+
+    def test_invalid_arguments(self):
+        assert_raises(ValueError, NearDuplicateIndex, threshold=0)
+        assert_raises(ValueError, NearDuplicateIndex, num_perm=0)
+        assert_raises(ValueError, NearDuplicateIndex, shingle_size=0)
@@ -0,0 +1,158 @@
+import collections
+import importlib
+import json
+import os
+import subprocess
+import sys
+from unittest import SkipTest
+
+from nose.tools import assert_almost_equal, assert_equal, assert_raises
+
+from th_preprocessor.features import (
+    HashingVectorizer,
+    SparseRows,
+    combine_hashes,
+    hash_chars,
+    hash_word,
+)
+from th_preprocessor.preprocess import Pipeline, preprocess
+from th_preprocessor.stopwords import StopwordFilter
+
+CHILD = """
+import json, sys
+from th_preprocessor.features import HashingVectorizer
+vectorizer = HashingVectorizer(word_ngrams=(1, 2), char_ngrams=(2, 3))
+print(json.dumps(sorted(vectorizer.transform_one(sys.argv[1]).items())))
+"""
+
+
+def count_features(tokens, n_features, word_ngrams, char_ngrams):
+    # Every n-gram hashed as in the module docstring, one at a time
+    counts = collections.Counter()
+
+    def add(value):
+        counts[value % n_features] += -1 if value >> 63 else 1
+
+    hashes = [hash_word(token) for token in tokens]
+    for n in range(word_ngrams[0], word_ngrams[1] + 1):
+        for i in range(len(tokens) - n + 1):
+            add(combine_hashes(hashes[i : i + n]))
+    if char_ngrams:
+        for token in tokens:
+            if token.startswith("WS") and token.isupper():
+                continue
+            padded = " {} ".format(token)
+            for n in range(char_ngrams[0], min(char_ngrams[1], len(padded)) + 1):
+                for i in range(len(padded) - n + 1):
+                    add(hash_chars(padded[i : i + n]))
+    return {index: count for index, count in counts.items() if count}
+
+
+class Test_features(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789 😀😀😀",
+            "กินข้าวแล้วครับ โทร 02-123-4567 ต่อ e12 กินข้าวแล้วครับ",
+            "",
+            "hello hello hello",
+        ]
+
+    def test_same_as_hashing_every_ngram(self):
+        vectorizer = HashingVectorizer(
+            n_features=2**12, word_ngrams=(1, 3), char_ngrams=(2, 4), norm=None
+        )
+        rows = vectorizer.transform(self.texts)
+        assert_equal(rows.shape, (len(self.texts), 2**12))
+        for i, text in enumerate(self.texts):
+            expected = count_features(preprocess(text).split(), 2**12, (1, 3), (2, 4))
+            assert_equal(rows.row(i), expected)
+            assert_equal(vectorizer.transform_one(text), expected)
+
+    def test_csr_arrays(self):
+        rows = HashingVectorizer(norm=None).transform(iter(self.texts))
+        assert_equal(len(rows), len(self.texts))
+        assert_equal(rows.indptr[0], 0)
+        assert_equal(rows.indptr[-1], len(rows.indices))
+        assert_equal(len(rows.indices), len(rows.data))
+        assert_equal(rows.row(3), {})
+        # "hello" three times: one feature counting 3 (or -3)
+        assert_equal([abs(value) for value in rows.row(4).values()], [3])
+        for i in range(len(rows)):
+            indices = rows.indices[rows.indptr[i] : rows.indptr[i + 1]]
+            assert_equal(list(indices), sorted(set(indices)))
+        assert_raises(IndexError, rows.row, len(rows))
+
+    def test_norms(self):
+        text = self.texts[2]
+        l2 = HashingVectorizer(char_ngrams=(1, 2)).transform_one(text)
+        assert_almost_equal(sum(value * value for value in l2.values()), 1.0)
+        l1 = HashingVectorizer(norm="l1").transform_one(text)
+        assert_almost_equal(sum(abs(value) for value in l1.values()), 1.0)
+        counts = HashingVectorizer(alternate_sign=False, norm=None).transform_one(text)
+        assert_equal(sum(counts.values()), len(preprocess(text).split()))
+
+    def test_stopwords_and_placeholders(self):
+        text = "กิน ครับ www.example.com"
+        vectorizer = HashingVectorizer(
+            char_ngrams=(2, 3), stopwords=StopwordFilter(["ครับ"]), norm=None
+        )
+        expected = count_features(["กิน", "WSLINK"], 2**20, (1, 1), (2, 3))
+        assert_equal(vectorizer.transform_one(text), expected)
+        # Placeholders of a Pipeline's own place_holder options too
+        pipeline = Pipeline().with_options("normalize_link", place_holder=" URL ")
+        vectorizer = HashingVectorizer(
+            char_ngrams=(2, 3), preprocessor=pipeline, norm=None
+        )
+        expected = count_features(["กิน", "ครับ"], 2**20, (1, 1), (2, 3))
+        expected.update(count_features(["URL"], 2**20, (1, 1), None))
+        assert_equal(vectorizer.transform_one(text), expected)
+        assert_equal(
+            HashingVectorizer(stopwords=True).transform_one("และ"),
+            HashingVectorizer().transform_one(""),
+        )
+
+    def test_preprocessed_texts(self):
+        texts = [preprocess(text) for text in self.texts]
+        rows = HashingVectorizer(preprocessor=None).transform(texts)
+        expected = HashingVectorizer().transform(self.texts)
+        assert_equal(rows.indices, expected.indices)
+        assert_equal(rows.data, expected.data)
+
+    def test_small_cache(self):
+        vectorizer = HashingVectorizer(word_ngrams=(1, 2), char_ngrams=(1, 3))
+        small = HashingVectorizer(word_ngrams=(1, 2), char_ngrams=(1, 3), cache_size=2)
+        for text in self.texts * 2:
+            assert_equal(small.transform_one(text), vectorizer.transform_one(text))
+
+    def test_same_in_every_process(self):
+        text = self.texts[2]
+        expected = HashingVectorizer(word_ngrams=(1, 2), char_ngrams=(2, 3))
+        expected = sorted(expected.transform_one(text).items())
+        for seed in ["1", "2"]:
+            output = subprocess.check_output(
+                [sys.executable, "-c", CHILD, text],
+                env=dict(os.environ, PYTHONHASHSEED=seed),
+            )
+            assert_equal([tuple(item) for item in json.loads(output)], expected)
+
+    def test_invalid_arguments(self):
+        assert_raises(ValueError, HashingVectorizer, n_features=0)
+        assert_raises(ValueError, HashingVectorizer, word_ngrams=(2, 1))
+        assert_raises(ValueError, HashingVectorizer, char_ngrams=(0, 2))
+        assert_raises(ValueError, HashingVectorizer, norm="max")
+
+    def test_to_scipy(self):
+        try:
+            importlib.import_module("scipy.sparse")
+        except ImportError:
+            raise SkipTest("scipy is not installed")
+        rows = HashingVectorizer(n_features=64).transform(self.texts)
+        matrix = rows.to_scipy()
+        assert_equal(matrix.shape, (len(self.texts), 64))
+        for i in range(len(rows)):
+            assert_equal(
+                rows.row(i),
+                dict(zip(matrix[i].indices.tolist(), matrix[i].data.tolist())),
+            )
+        assert_equal(repr(SparseRows(8)), "SparseRows(shape=(0, 8), nnz=0)")
@@ -1,16 +1,35 @@
+import json
+import pickle
+import random
 import string
+import sys
+import time
+from datetime import datetime
 
-from nose.tools import assert_equal
+from nose.tools import assert_equal, assert_raises
 
+from th_preprocessor import preprocess as preprocess_module
+from th_preprocessor.data import ACCENTED_PAIRS
 from th_preprocessor.preprocess import (
+    COMBINED_NORMALIZE_PAIRS,
+    Pipeline,
+    Preprocessor,
+    TextReplacer,
     insert_spaces,
+    insert_spaces_many,
     is_date_str,
+    is_date_str_many,
     is_datetime_str,
+    is_datetime_str_many,
     is_latin_str,
+    is_latin_str_many,
     is_number_str,
+    is_number_str_many,
     is_thai_str,
+    is_thai_str_many,
     normalize_accented_chars,
     normalize_at_mention,
+    normalize_date,
     normalize_email,
     normalize_emoji,
     normalize_filename,
@@ -21,6 +40,8 @@ from th_preprocessor.preprocess import (
     normalize_special_chars,
     normalize_text_pairs,
     preprocess,
+    preprocess_tokens,
+    preprocess_tokens_many,
     remove_dup_spaces,
     remove_emoji,
     remove_hashtags,
@@ -28,7 +49,9 @@ from th_preprocessor.preprocess import (
     remove_tag,
     replace_dup_chars,
     replace_dup_emojis,
+    replace_text,
 )
+from th_preprocessor.stopwords import StopwordFilter
 
 
 class Test_preprocess(object):
@@ -100,6 +123,83 @@ class Test_preprocess(object):
     def test_is_not_only_thai_str(self):
         assert_equal(is_thai_str(self.mix_text), False)
 
+    def test_is_date_str_same_as_strptime(self):
+        def parses(value, date_format):
+            try:
+                datetime.strptime(value, date_format)
+            except ValueError:
+                return False
+            return True
+
+        r = random.Random(0)
+        values = [
+            "2020-02-29",
+            "2019-02-29",
+            "1900-02-29",
+            "2000-02-29",
+            "0000-01-01",
+            "2020-04-31",
+            "2020-4-1",
+            "2020-04- 1",
+            "2020-13-01",
+            "๒๐๒๐-๐๒-๐๒",
+            "2020-02-02 15:14:60",
+            "2020-02-02 5:4:3",
+            "2020-02-02\t\n15:14:13",
+            "2020-02-02T15:14:13",
+        ]
+        for _ in range(2000):
+            values.append(
+                "".join(r.choice("0123456789-: 9") for _ in range(r.randint(8, 19)))
+            )
+            values.append(
+                "{:04}-{}-{} {}:{}:{}".format(
+                    *(r.randint(0, limit) for limit in [2100, 13, 32, 24, 61, 61])
+                )
+            )
+        for value in values:
+            assert_equal(is_date_str(value), parses(value, "%Y-%m-%d"))
+            assert_equal(is_datetime_str(value), parses(value, "%Y-%m-%d %H:%M:%S"))
+
+    def test_is_str_many(self):
+        values = [
+            self.date_text,
+            self.datetime_text,
+            self.number_text,
+            "1,234.5",
+            self.latin_text,
+            self.thai_text,
+            self.mix_text,
+            "",
+            20200202,
+        ]
+        for single, many in [
+            (is_date_str, is_date_str_many),
+            (is_datetime_str, is_datetime_str_many),
+            (is_number_str, is_number_str_many),
+            (is_latin_str, is_latin_str_many),
+            (is_thai_str, is_thai_str_many),
+        ]:
+            assert_equal(many(iter(values)), [single(value) for value in values])
+
+    def test_is_number_str_is_linear(self):
+        def fastest(text):
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                is_number_str(text)
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        assert_equal(is_number_str("1" * 5000 + "x"), False)
+        assert_equal(is_number_str("1," * 5000 + ".5"), True)
+        # Ten times the input takes about ten times as long; with the nested
+        # repetition RE_NUM had, a failing match took exponential time
+        for unit, end in [("1", "x"), ("1,", ".5")]:
+            small = fastest(unit * 2000 + end)
+            large = fastest(unit * 20000 + end)
+            assert large < 30 * small, (unit, small, large)
+
     def test_normalize_text_pairs(self):
         expected_result = "แำฤๅฦๅ1234567890         !                     ?            "
         assert_equal(normalize_text_pairs(self.unnorm_text), expected_result)
@@ -168,6 +268,24 @@ class Test_preprocess(object):
         expected_result = " WSPHONE "
         assert_equal(normalize_phone(self.phone_text), expected_result)
 
+    def test_normalize_date(self):
+        for text in [
+            "2019-01-03",
+            "2019-01-03T04:00:00+07:00",
+            "3/1/2562 04:00",
+            "03-01-19",
+            "3 ม.ค. 62",
+            "๓ มกราคม พ.ศ. ๒๕๖๒",
+            "มกราคม 2562",
+            "04:00 น.",
+            "4.30 นาฬิกา",
+        ]:
+            assert_equal(normalize_date(text), " WSDATE ")
+        # Numbers, versions, phone numbers and impossible days stay
+        for text in ["1,299.00", "1.2.3.4", "v2.0", "081-234-5678", "32/13/2019"]:
+            assert_equal(normalize_date(text), text)
+        assert_equal(normalize_date("เวลา 04:00 น.", " DATE "), "เวลา  DATE ")
+
     def test_normalize_special_chars(self):
         expected_result = "The most important thing is to enjoy น้าทุกคน"
         assert_equal(normalize_special_chars(self.special_text), expected_result)
@@ -217,10 +335,62 @@ class Test_preprocess(object):
         expected_result = "นอนได้แล้ว\nเดี๋ยวพรุ่งนี้เขาก็กลับมา"
         assert_equal(remove_dup_spaces(self.dup_space_text), expected_result)
 
+    def test_remove_dup_spaces_same_as_three_passes(self):
+        def three_passes(text):
+            text = preprocess_module.RE_DUP_SPACE.sub(" ", text)
+            text = preprocess_module.RE_DUP_EMPTYLINE.sub("\n", text)
+            text = preprocess_module.RE_STRIP.sub("", text)
+            return text.strip()
+
+        texts = [
+            self.dup_space_text,
+            self.complex_text,
+            self.real_text,
+            self.unnorm_text,
+            " \t a  \t b \n \t\n\n  c\t\r\n d\u00A0 \n",
+            insert_spaces(self.real_text),
+        ]
+        chars = list("  \t\n\n\r\x0b\u00A0ab") + ["ก"]
+        rng = random.Random(0)
+        for _ in range(20000):
+            texts.append("".join(rng.choice(chars) for _ in range(rng.randint(0, 10))))
+        for text in texts:
+            assert_equal(remove_dup_spaces(text), three_passes(text))
+
     def test_insert_spaces(self):
         expected_result = "hey 123 ไม่ได้เป็นคนที่เกเร yoyo & แฮ่ && hello"
         assert_equal(insert_spaces(self.mix_text), expected_result)
 
+    def test_insert_spaces_same_as_six_passes(self):
+        def six_passes(text):
+            for pattern in (
+                preprocess_module.RE_DIGIT_NONDIGIT,
+                preprocess_module.RE_NONDIGIT_DIGIT,
+                preprocess_module.RE_THAI_NONTHAI,
+                preprocess_module.RE_NONTHAI_THAI,
+                preprocess_module.RE_LATIN_NONLATIN,
+                preprocess_module.RE_NONLATIN_LATIN,
+            ):
+                text = pattern.sub(r"\1 \2", text)
+            return text
+
+        texts = [
+            self.complex_text,
+            self.real_text,
+            self.noodle_text,
+            "1.,a 1...a .5 5. ,,, 1,234.50บาท ๑๒.๕% ٣.٤x",
+        ]
+        # Short texts from characters of every class, with "." and ","
+        chars = list("0123456789..,, \n\tabZ!-@") + list("๑๕กขั๏๛😀٣é")
+        rng = random.Random(0)
+        for _ in range(20000):
+            texts.append("".join(rng.choice(chars) for _ in range(rng.randint(0, 10))))
+        tokenizer = Preprocessor(["insert_spaces"])
+        for text in texts:
+            assert_equal(insert_spaces(text), six_passes(text))
+            assert_equal(tokenizer.tokens(text), six_passes(text).split())
+        assert_equal(insert_spaces_many(texts), [six_passes(text) for text in texts])
+
     def test_remove_emoji(self):
         expected_result = "อย่าฟอล เดี๋ยวจนรีวิวในแท็ก"
         assert_equal(remove_emoji(self.emoji_text), expected_result)
@@ -237,6 +407,14 @@ class Test_preprocess(object):
         expected_result = "updated ประกาศเตือนภัย ออกเมื่อพฤหัสที่ WSNUMBER เวลา WSNUMBER WSNUMBER น WSLINK updated การพยากรณ์เส้นทางพายุ ออกโดยกรมอุตุ ฯ เมื่อพฤหัสที่ WSNUMBER เวลา WSNUMBER WSNUMBER น ครับ"
         assert_equal(preprocess(self.real_text), expected_result)
 
+    def test_preprocess_dates(self):
+        expected_result = "updated ประกาศเตือนภัย ออกเมื่อพฤหัสที่ WSNUMBER เวลา WSDATE WSLINK updated การพยากรณ์เส้นทางพายุ ออกโดยกรมอุตุ ฯ เมื่อพฤหัสที่ WSNUMBER เวลา WSDATE ครับ"
+        assert_equal(preprocess(self.real_text, dates=True), expected_result)
+        assert_equal(
+            preprocess("โทร 081-234-5678 วันที่ 3 ม.ค. 2562", dates=True),
+            "โทร WSPHONE วันที่ WSDATE",
+        )
+
     def test_remove_others_char(self):
         expected_result = "         คิดว่าน่าจะเหลือแค่ภาษาไทย กับ                   English และ                    🤔🤔🤔🤔        🤣"
         assert_equal(remove_others_char(self.noodle_text), expected_result)
@@ -254,3 +432,198 @@ class Test_preprocess(object):
         assert_equal(
             replace_dup_emojis(self.dup_emojis_text_with_dup_numbers), expected_result
         )
+
+    def test_preprocessor_default_stages(self):
+        preprocessor = Preprocessor()
+        assert_equal(preprocessor(self.complex_text), preprocess(self.complex_text))
+        assert_equal(preprocessor(self.real_text), preprocess(self.real_text))
+
+    def test_preprocessor_custom_stages(self):
+        preprocessor = Preprocessor(["lower", "normalize_link", "remove_dup_spaces"])
+        expected_result = "visit WSLINK now"
+        assert_equal(preprocessor("Visit  HTTP://WWW.EXAMPLE.COM now"), expected_result)
+
+    def test_preprocess_tokens(self):
+        texts = [self.complex_text, self.real_text, self.noodle_text, "", "  \n "]
+        assert_equal(
+            preprocess_tokens_many(texts), [preprocess(text).split() for text in texts]
+        )
+        stopword_filter = StopwordFilter(["ครับ", "กับ"])
+        assert_equal(
+            preprocess_tokens(self.real_text, stopword_filter),
+            stopword_filter.filter(preprocess(self.real_text).split()),
+        )
+        # Placeholders are one shared string
+        tokens = preprocess_tokens(self.complex_text)
+        assert tokens[2] is sys.intern("WSLINK")
+        pipeline = Pipeline().with_options("normalize_link", place_holder=" URL ")
+        for preprocessor in [
+            pipeline,
+            pipeline.without("insert_spaces"),
+            pipeline.without("remove_dup_spaces"),
+            Preprocessor(["lower", "remove_dup_spaces", "normalize_link"]),
+        ]:
+            assert_equal(
+                preprocessor.tokens_many(texts),
+                [preprocessor(text).split() for text in texts],
+            )
+
+    def test_preprocessor_unknown_stage(self):
+        assert_raises(ValueError, Preprocessor, ["lower", "normalize_nothing"])
+
+    def test_text_replacer_same_as_replace_text(self):
+        for pairs in (COMBINED_NORMALIZE_PAIRS, ACCENTED_PAIRS):
+            replacer = TextReplacer(pairs)
+            all_keys = "".join(k for k, _ in pairs)
+            for text in [
+                self.unnorm_text,
+                self.accented_text,
+                self.complex_text,
+                self.real_text,
+                all_keys,
+                all_keys[::-1],
+            ]:
+                assert_equal(replacer(text), replace_text(text, pairs))
+
+    def test_text_replacer_chained_pairs(self):
+        pairs = [("ab", "x"), ("xb", "y"), ("a", "b"), ("b", "c")]
+        replacer = TextReplacer(pairs)
+        for text in ["abb", "xbab", "aab", "a"]:
+            assert_equal(replacer(text), replace_text(text, pairs))
+
+    def test_replace_dup_emojis_with_modifier(self):
+        text = "👍🏽👍🏽👍🏽 👍👍🏽 👨‍👩‍👧👨‍👩‍👧"
+        expected_result = "👍🏽 👍🏽 👨‍👩‍👧"
+        assert_equal(replace_dup_emojis(text), expected_result)
+
+    def test_emoji_matcher_same_as_re_emoji(self):
+        re_emoji = preprocess_module.RE_EMOJI
+        re_dup_emojis = preprocess_module.RE_DUP_EMOJIS
+        for text in [
+            self.emoji_text,
+            self.noodle_text,
+            self.dup_emojis_text,
+            self.dup_emojis_text_with_dup_numbers,
+            self.complex_text,
+        ]:
+            assert_equal(remove_emoji(text), re_emoji.sub("", text))
+            assert_equal(normalize_emoji(text), re_emoji.sub(r" \1 ", text).strip())
+            assert_equal(replace_dup_emojis(text), re_dup_emojis.sub(r"\1", text))
+
+    def test_guarded_patterns_same_as_re(self):
+        for guarded in (
+            preprocess_module.GUARDED_LINK,
+            preprocess_module.GUARDED_EMAIL,
+            preprocess_module.GUARDED_FILENAME,
+            preprocess_module.GUARDED_HAHA,
+            preprocess_module.GUARDED_TAG,
+        ):
+            for text in [
+                self.complex_text,
+                self.real_text,
+                "a.b.c.com.php x@y.z.co.th 5555.5 555 hahaha ถถถถ",
+                "http://a.b/c.php?x=1&y=@z a.b@c.d.info index.HTML?q",
+                "0" * 50 + "." + "a" * 20 + ".com",
+                "<b>x</b> <3 <> <<a> a<3 b> <3",
+                "a> <3 <3 <p>",
+            ]:
+                assert_equal(guarded.sub("X", text), guarded.pattern.sub("X", text))
+
+    def test_adversarial_input_is_linear(self):
+        def fastest(text):
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                preprocess(text)
+                preprocess(text, dates=True)
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        for prefix, unit, suffix, n in [
+            ("", "a.", "", 5000),
+            ("", "ก.", "", 5000),
+            ("0", " ", "x", 3000),
+            ("", "5", "a1", 5000),
+            ("", "a", "@", 10000),
+            ("", "0 ", "", 3000),
+            ("", "1:", "", 5000),
+            ("3", " ", "x", 5000),
+            ("x> ", "<3 ", "", 5000),
+        ]:
+            small = fastest(prefix + unit * n + suffix)
+            large = fastest(prefix + unit * 2 * n + suffix)
+            # Twice the input takes about twice as long; four times as long
+            # (seconds to minutes) with the quadratic patterns
+            assert large < 3 * small, (unit, small, large)
+
+    def test_stage_anchors_only_skip_unchanged_text(self):
+        texts = [
+            self.complex_text,
+            self.real_text,
+            self.unnorm_text,
+            "สวัสดีครับ วันนี้อากาศดีมาก",
+            "hahaha 555 ถถถ (02) 234 5678 1-800-123-4567 3.14",
+            "&lt;b&gt;x&#64;y.com&lt;/b&gt; #tag",
+        ]
+        for name, anchor in preprocess_module.STAGE_ANCHORS.items():
+            stage = preprocess_module.STAGES[name]
+            for text in texts:
+                for part in [text] + text.split():
+                    if not anchor.search(part):
+                        assert_equal(stage(part), part)
+            unanchored = [stage] * 2
+            for text in texts:
+                expected = text
+                for step in unanchored:
+                    expected = step(expected)
+                assert_equal(Preprocessor([name, name])(text), expected)
+
+    def test_preprocessor_options(self):
+        text = "ดูที่ www.example.com โทร 0812345678 ราคา 100 บาท"
+        preprocessor = Preprocessor(
+            ["normalize_link", "normalize_phone", "normalize_num"],
+            {"normalize_link": {"place_holder": " URL "}},
+        )
+        expected_result = normalize_num(
+            normalize_phone(normalize_link(text, place_holder=" URL "))
+        )
+        assert_equal(preprocessor(text), expected_result)
+        assert_equal(pickle.loads(pickle.dumps(preprocessor))(text), expected_result)
+        assert_raises(
+            ValueError,
+            Preprocessor,
+            ["lower"],
+            {"normalize_link": {"place_holder": ""}},
+        )
+        assert_raises(ValueError, Preprocessor, ["lower"], {"lower": {"x": ""}})
+
+    def test_place_holder_escapes_same_as_re(self):
+        text = "mail a@b.com or www.example.com hahaha a.php"
+        for place_holder in ["\\n", "<\\g<0>>", "\\\\"]:
+            assert_equal(
+                normalize_link(text, place_holder=place_holder),
+                preprocess_module.RE_LINK.sub(place_holder, text),
+            )
+            assert_equal(
+                normalize_email(text, place_holder=place_holder),
+                preprocess_module.RE_EMAIL.sub(place_holder, text),
+            )
+
+    def test_pipeline(self):
+        pipeline = Pipeline()
+        assert_equal(pipeline(self.complex_text), preprocess(self.complex_text))
+
+        pipeline = pipeline.without("normalize_num").with_options(
+            "normalize_link", place_holder=" URL "
+        )
+        assert_equal("normalize_num" in pipeline.stages, False)
+        assert_equal(pipeline("ดูที่ www.example.com 100 บาท"), "ดูที่ URL 100 บาท")
+
+        config = json.loads(pipeline.to_json())
+        assert_equal(config["version"], 1)
+        assert_equal(config["options"], {"normalize_link": {"place_holder": " URL "}})
+        assert_equal(Pipeline.from_json(pipeline.to_json()), pipeline)
+        assert_equal(pickle.loads(pickle.dumps(pipeline)), pipeline)
+        assert_raises(ValueError, Pipeline.from_dict, {"version": 2})
+        assert_raises(ValueError, Pipeline.from_dict, {"stage": ["lower"]})
+        assert_raises(ValueError, pipeline.without, "normalize_num")
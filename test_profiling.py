@@ -0,0 +1,55 @@
+from nose.tools import assert_equal
+
+from th_preprocessor.batch import SERIAL_THRESHOLD, preprocess_many
+from th_preprocessor.preprocess import DEFAULT_STAGES, Preprocessor, preprocess
+from th_preprocessor.profiling import StageProfiler
+
+
+def shout(text):
+    return text.upper()
+
+
+class Test_profiling(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com @test1234",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789",
+        ]
+
+    def test_preprocess_profiler(self):
+        profiler = StageProfiler()
+        for text in self.texts:
+            assert_equal(preprocess(text, profiler=profiler), preprocess(text))
+        assert_equal(list(profiler.stages), list(DEFAULT_STAGES))
+        assert_equal(profiler.stages["lower"]["calls"], 2)
+        assert_equal(profiler.stages["remove_tag"]["matches"], 2)
+        assert_equal(profiler.stages["normalize_link"]["matches"], 1)
+        assert_equal(profiler.stages["normalize_phone"]["matches"], 1)
+        assert_equal(profiler.stages["lower"]["input_chars"], sum(map(len, self.texts)))
+
+    def test_preprocessor_profiler_summary(self):
+        profiler = StageProfiler()
+        Preprocessor(["lower", "normalize_link"])(self.texts[0], profiler)
+        summary = profiler.summary()
+        assert_equal([row["stage"] for row in summary], ["lower", "normalize_link"])
+        assert_equal(round(sum(row["share"] for row in summary), 6), 1.0)
+
+    def test_preprocess_many_profiler(self):
+        texts = self.texts * (SERIAL_THRESHOLD // len(self.texts))
+        profiler = StageProfiler()
+        preprocess_many(texts, workers=2, profiler=profiler)
+        assert_equal(profiler.stages["lower"]["calls"], len(texts))
+        assert_equal(profiler.stages["normalize_link"]["matches"], len(texts) // 2)
+
+    def test_preprocess_many_profiler_other_function(self):
+        # Timed as one stage, since shout takes no profiler
+        for workers in [1, 2]:
+            texts = self.texts * (SERIAL_THRESHOLD // len(self.texts))
+            profiler = StageProfiler()
+            results = preprocess_many(
+                texts, workers, preprocessor=shout, profiler=profiler
+            )
+            assert_equal(results, [shout(text) for text in texts])
+            assert_equal(list(profiler.stages), ["shout"])
+            assert_equal(profiler.stages["shout"]["calls"], len(texts))
+            assert_equal(profiler.stages["shout"]["input_chars"], sum(map(len, texts)))
@@ -0,0 +1,40 @@
+from nose.tools import assert_equal
+
+from th_preprocessor.preprocess import remove_stopwords
+from th_preprocessor.stopwords import StopwordFilter
+
+
+class Test_stopwords(object):
+    def __init__(self):
+        self.tokens = ["ผม", "กิน", "ข้าว", "แล้ว", "ที่", "บ้าน", "WSNUMBER"]
+
+    def test_stopword_filter(self):
+        expected_result = ["ผม", "กิน", "ข้าว", "บ้าน", "WSNUMBER"]
+        assert_equal(StopwordFilter().filter(self.tokens), expected_result)
+
+    def test_stopword_filter_custom(self):
+        expected_result = ["ผม", "กิน", "ข้าว", "บ้าน"]
+        assert_equal(StopwordFilter(["WSNUMBER"]).filter(self.tokens), expected_result)
+
+    def test_stopword_filter_custom_only(self):
+        expected_result = ["ผม", "กิน", "ข้าว", "แล้ว", "ที่", "บ้าน"]
+        stopword_filter = StopwordFilter(["WSNUMBER"], include_legacy_stopwords=False)
+        assert_equal(stopword_filter.filter(self.tokens), expected_result)
+
+    def test_stopword_filter_many(self):
+        expected_result = [["ผม", "กิน", "ข้าว", "บ้าน", "WSNUMBER"], []]
+        assert_equal(
+            StopwordFilter().filter_many([self.tokens, ["และ"]]), expected_result
+        )
+
+    def test_remove_stopwords(self):
+        assert_equal(
+            remove_stopwords(self.tokens), ["ผม", "กิน", "ข้าว", "บ้าน", "WSNUMBER"]
+        )
+        assert_equal(
+            remove_stopwords(self.tokens, ["WSNUMBER"]), ["ผม", "กิน", "ข้าว", "บ้าน"]
+        )
+        assert_equal(
+            remove_stopwords(self.tokens, ["ผม"], include_legacy_stopwords=False),
+            ["กิน", "ข้าว", "แล้ว", "ที่", "บ้าน", "WSNUMBER"],
+        )
@@ -0,0 +1,110 @@
+import importlib
+import random
+from unittest import SkipTest
+
+from nose.tools import assert_equal
+
+from th_preprocessor.preprocess import STAGES, Pipeline, Preprocessor, preprocess
+from th_preprocessor.vectorized import SEPARATOR, preprocess_column, preprocess_texts
+
+
+def import_or_skip(name):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise SkipTest("{} is not installed".format(name))
+
+
+class Test_vectorized(object):
+    def __init__(self):
+        self.texts = [
+            "<div>Test HTML</div> http://www.youtube.com",
+            "🌈อย่าฟอล เดี๋ยวจน🌻รีวิวในแท็ก 0123456789 😀😀😀",
+            "hey123ไม่ได้เป็นคนที่เกเรyoyo&แฮ่&&hello 555555 ©ก'",
+            "กินข้าวแล้วครับ โทร 02-123-4567 ต่อ e12",
+            "ติดต่อ @Somchai หรือ somchai@example.com ไฟล์ report.pdf",
+            "ΟΔΟΣ  Café\r\n\n  &lt;b&gt;x&lt;/b&gt; ๑๒๓ 5555 #แท็ก",
+            "",
+            "   ",
+            "<>",
+        ]
+
+    def test_same_as_preprocess(self):
+        assert_equal(preprocess_texts(self.texts), [preprocess(t) for t in self.texts])
+
+    def test_same_as_any_stages(self):
+        r = random.Random(0)
+        texts = self.texts + [r.choice(self.texts)[::-1] for _ in range(20)]
+        preprocessors = [
+            Pipeline().with_options("normalize_link", place_holder=" URL "),
+            Preprocessor(sorted(STAGES)),
+        ] + [Preprocessor(r.sample(sorted(STAGES), 6)) for _ in range(30)]
+        for preprocessor in preprocessors:
+            assert_equal(
+                preprocess_texts(texts, preprocessor),
+                [preprocessor(text) for text in texts],
+            )
+
+    def test_separator_in_texts(self):
+        texts = self.texts + ["ก" + SEPARATOR + "<b>", SEPARATOR]
+        assert_equal(preprocess_texts(texts), [preprocess(text) for text in texts])
+
+    def test_other_callables(self):
+        assert_equal(preprocess_texts(["a", "b"], str.upper), ["A", "B"])
+
+    def test_list(self):
+        column = self.texts + [None] + self.texts[::-1]
+        expected = [None if text is None else preprocess(text) for text in column]
+        assert_equal(preprocess_column(column), expected)
+        assert_equal(preprocess_column(iter([])), [])
+
+    def test_pandas(self):
+        pd = import_or_skip("pandas")
+        column = self.texts * 3 + [None]
+        for dtype in [object, "string"]:
+            series = pd.Series(
+                column, index=range(10, 10 + len(column)), name="text", dtype=dtype
+            )
+            result = preprocess_column(series, Pipeline())
+            assert_equal(result.dtype, series.dtype)
+            assert_equal(result.name, "text")
+            assert result.index.equals(series.index)
+            assert_equal(
+                result.iloc[:-1].tolist(), [preprocess(text) for text in column[:-1]]
+            )
+            assert result.isna().iloc[-1]
+        assert_equal(len(preprocess_column(pd.Series([], dtype=object))), 0)
+
+    def test_pandas_categorical(self):
+        pd = import_or_skip("pandas")
+        # "Hello" and "hello" are one category after preprocessing
+        column = self.texts * 3 + [None, "Hello", "hello"]
+        series = pd.Series(column, name="text", dtype="category")
+        result = preprocess_column(series)
+        assert isinstance(result.dtype, pd.CategoricalDtype)
+        assert_equal(result.name, "text")
+        assert_equal(
+            result.iloc[:-3].tolist(), [preprocess(text) for text in column[:-3]]
+        )
+        assert result.isna().iloc[-3]
+        assert_equal(result.iloc[-2:].tolist(), ["hello", "hello"])
+        assert_equal(len(result.cat.categories), len(set(result.dropna())))
+
+    def test_arrow(self):
+        pa = import_or_skip("pyarrow")
+        column = self.texts * 3 + [None]
+        expected = [None if text is None else preprocess(text) for text in column]
+        arrays = [
+            pa.array(column),
+            pa.array(column, type=pa.large_string()),
+            pa.chunked_array([column[:5], column[5:]]),
+            pa.array(column).dictionary_encode(),
+            pa.chunked_array([column[:5], column[5:]]).dictionary_encode(),
+        ]
+        if hasattr(pa, "string_view"):  # pyarrow >= 16
+            arrays.append(pa.array(column, type=pa.string_view()))
+        for array in arrays:
+            result = preprocess_column(array)
+            assert_equal(type(result), type(array))
+            assert_equal(result.type, array.type)
+            assert_equal(result.to_pylist(), expected)
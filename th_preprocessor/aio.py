@@ -0,0 +1,246 @@
+"""
+Preprocess from asyncio code without blocking the event loop.
+
+    async with AsyncPreprocessor(workers=4) as pool:
+        text = await pool(text)
+        async for result in pool.map(texts):  # any (async) iterable, in order
+            ...
+
+apreprocess() and apreprocess_stream() share one pool of worker processes
+running preprocess(). Texts waiting at the same time are sent to a worker
+together, so many small requests do not cost one round trip each.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import os
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from th_preprocessor.batch import _flush, _init_worker, _preprocess_chunk
+from th_preprocessor.preprocess import preprocess
+
+EXECUTORS = ("process", "thread")
+
+# Batches being preprocessed at the same time, per worker
+BATCHES_PER_WORKER = 2
+
+_DONE = object()
+
+
+def _preprocess_texts(
+    preprocessor: Callable[[str], str], texts: List[str]
+) -> List[str]:
+    results = [preprocessor(text) for text in texts]
+    _flush(preprocessor)
+    return results
+
+
+async def _aiter(texts: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(texts, "__aiter__"):
+        async for text in texts:
+            yield text
+    else:
+        for text in texts:
+            yield text
+
+
+class AsyncPreprocessor:
+    """
+    Run preprocessor (preprocess() by default, or e.g. a Pipeline) in
+    worker processes (executor="process") or threads (executor="thread").
+
+    Texts are batched up to max_batch at a time. At most max_pending texts
+    wait for a batch; callers beyond that wait before their text is queued.
+    A cancelled call is dropped from its batch if the batch has not started
+    yet; otherwise its result is thrown away. When a worker process dies,
+    the calls in its pool fail with BrokenProcessPool and later calls go to
+    a new pool.
+    """
+
+    def __init__(
+        self,
+        preprocessor: Callable[[str], str] = preprocess,
+        workers: Optional[int] = None,
+        executor: str = "process",
+        max_batch: int = 64,
+        max_pending: int = 1024,
+    ):
+        if executor not in EXECUTORS:
+            raise ValueError(
+                "executor must be one of {}, not {!r}".format(EXECUTORS, executor)
+            )
+        self.preprocessor = preprocessor
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[asyncio.Task] = None
+
+    def _new_executor(self) -> concurrent.futures.Executor:
+        if self.executor == "process":
+            return concurrent.futures.ProcessPoolExecutor(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.preprocessor,),
+            )
+        return concurrent.futures.ThreadPoolExecutor(self.workers)
+
+    def _replace_broken(self, executor: concurrent.futures.Executor) -> None:
+        # E.g. a worker process was killed: later batches get a new pool
+        if self._executor is executor:
+            self._executor = self._new_executor()
+            executor.shutdown(wait=False)
+
+    def _start(self) -> None:
+        if self._executor is None:
+            self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues and tasks belong to one event loop
+            self._loop = loop
+            self._queue = asyncio.Queue(self.max_pending)
+            self._slots = asyncio.Semaphore(self.workers * BATCHES_PER_WORKER)
+            self._batcher = loop.create_task(self._run_batches())
+
+    async def _submit(self, text: str) -> asyncio.Future:
+        self._start()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return future
+
+    async def __call__(self, text: str) -> str:
+        return await (await self._submit(text))
+
+    async def _run_batches(self) -> None:
+        if self.executor == "process":
+            preprocess_batch = _preprocess_chunk
+        else:
+            preprocess_batch = functools.partial(_preprocess_texts, self.preprocessor)
+        while True:
+            batch = [await self._queue.get()]
+            # Whatever queued up while the workers were busy goes together
+            await self._slots.acquire()
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                self._slots.release()
+                continue
+            executor = self._executor
+            try:
+                running = self._loop.run_in_executor(
+                    executor, preprocess_batch, [text for text, _ in batch]
+                )
+            except Exception as e:
+                # A broken pool raises here rather than in the future
+                running = self._loop.create_future()
+                running.set_exception(e)
+            running.add_done_callback(functools.partial(self._finish, executor, batch))
+
+    def _finish(
+        self,
+        executor: concurrent.futures.Executor,
+        batch: List[Tuple[str, asyncio.Future]],
+        running,
+    ) -> None:
+        self._slots.release()
+        if running.cancelled():
+            error = asyncio.CancelledError()
+        else:
+            error = running.exception()
+        if isinstance(error, concurrent.futures.BrokenExecutor):
+            self._replace_broken(executor)
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(running.result()[i])
+
+    async def map(
+        self, texts: Union[Iterable[str], AsyncIterable[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Yield the result of every text in input order, as soon as it is
+        ready. Texts are read at most max_pending ahead of the results.
+        """
+        futures = asyncio.Queue(self.max_pending)
+
+        async def submit_all() -> None:
+            try:
+                async for text in _aiter(texts):
+                    await futures.put(await self._submit(text))
+            except Exception as e:
+                await futures.put(e)
+            else:
+                await futures.put(_DONE)
+
+        submitter = asyncio.ensure_future(submit_all())
+        try:
+            while True:
+                future = await futures.get()
+                if future is _DONE:
+                    break
+                if isinstance(future, Exception):
+                    raise future
+                yield await future
+        finally:
+            submitter.cancel()
+            while not futures.empty():
+                future = futures.get_nowait()
+                if isinstance(future, asyncio.Future):
+                    future.cancel()
+
+    async def aclose(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            while not self._queue.empty():
+                self._queue.get_nowait()[1].cancel()
+            self._batcher = None
+            self._loop = None
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def __aenter__(self) -> "AsyncPreprocessor":
+        self._start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+_DEFAULT_POOL: Optional[AsyncPreprocessor] = None
+
+
+def _default_pool() -> AsyncPreprocessor:
+    global _DEFAULT_POOL
+    if _DEFAULT_POOL is None:
+        _DEFAULT_POOL = AsyncPreprocessor()
+    return _DEFAULT_POOL
+
+
+async def apreprocess(text: str) -> str:
+    """preprocess(text) in a shared pool of worker processes."""
+    return await _default_pool()(text)
+
+
+def apreprocess_stream(
+    texts: Union[Iterable[str], AsyncIterable[str]]
+) -> AsyncIterator[str]:
+    """preprocess() every text in a shared pool of worker processes, in order."""
+    return _default_pool().map(texts)
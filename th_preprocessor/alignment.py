@@ -0,0 +1,409 @@
+"""
+Preprocess a text and keep track of where every output character came from,
+or of what the link, mention, email, filename and phone stages replaced.
+
+    text, alignment = preprocess_aligned(raw)
+    raw_start, raw_end = alignment.to_source(start, end)  # e.g. an NER span
+    start, end = alignment.to_output(raw_start, raw_end)  # e.g. a highlight
+
+Every stage is run as one or more passes that report their edits
+(start, end, length of the replacement). The map is updated from the edits
+alone, so unchanged text costs a slice copy and no per-character work.
+"""
+import html
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from th_preprocessor.data import ACCENTED_PAIRS
+from th_preprocessor.emoji_matcher import get_emoji_matcher
+from th_preprocessor.preprocess import (
+    COMBINED_NORMALIZE_PAIRS,
+    DEFAULT_STAGES,
+    RE_DIGIT_NONDIGIT,
+    RE_DUP_CHARS,
+    RE_DUP_EMPTYLINE,
+    RE_DUP_SPACE,
+    RE_LATIN_NONLATIN,
+    RE_NONDIGIT_DIGIT,
+    RE_NONLATIN_LATIN,
+    RE_NONTHAI_ENG_EMOJI,
+    RE_NONTHAI_THAI,
+    RE_STRIP,
+    RE_THAI_NONTHAI,
+    STAGE_ANCHORS,
+    SUB_STAGES,
+    Preprocessor,
+)
+
+# (start, end) in the input of a pass and the length of what replaced it
+Edit = Tuple[int, int, int]
+Pass = Callable[[str], Tuple[str, List[Edit]]]
+
+# Same as html._charref: html.unescape replaces each match on its own
+_CHARREF = re.compile(r"&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)")
+_SURROGATES = re.compile("[\ud800-\udfff]")
+
+
+class Alignment:
+    """
+    For output character i, starts[i]:ends[i] is the span of the raw text it
+    came from. A replacement such as " WSLINK " maps every one of its
+    characters to the whole link, an inserted space to an empty span (or to
+    the replacement it was inserted into). Both arrays never decrease.
+    """
+
+    def __init__(self, starts: array, ends: array, source_length: int):
+        self.starts = starts
+        self.ends = ends
+        self.source_length = source_length
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def to_source(self, start: int, end: int) -> Tuple[int, int]:
+        """Span of the raw text an output span came from."""
+        if start < end:
+            return self.starts[start], self.ends[end - 1]
+        if start < len(self.starts):
+            return self.starts[start], self.starts[start]
+        position = self.ends[-1] if self.ends else self.source_length
+        return position, position
+
+    def to_output(self, start: int, end: int) -> Tuple[int, int]:
+        """Span of the output made from (part of) a raw span."""
+        first = bisect_right(self.ends, start)
+        last = bisect_left(self.starts, end)
+        if start == end or last < first:
+            return first, first
+        return first, last
+
+    def __repr__(self) -> str:
+        return "{}(<{} -> {} characters>)".format(
+            self.__class__.__name__, self.source_length, len(self.starts)
+        )
+
+
+def _apply(starts: array, ends: array, edits: Sequence[Edit]) -> Tuple[array, array]:
+    new_starts = array("q")
+    new_ends = array("q")
+    last = 0
+    for start, end, length in edits:
+        new_starts += starts[last:start]
+        new_ends += ends[last:start]
+        if length:
+            if end > start:
+                span_start, span_end = starts[start], ends[end - 1]
+            elif start == len(starts):
+                span_start = span_end = ends[start - 1] if start else 0
+            else:
+                span_start = starts[start]
+                # Inside a replacement, the inserted text belongs to it
+                span_end = max(span_start, ends[start - 1] if start else 0)
+            new_starts += array("q", [span_start]) * length
+            new_ends += array("q", [span_end]) * length
+        last = end
+    new_starts += starts[last:]
+    new_ends += ends[last:]
+    return new_starts, new_ends
+
+
+def _join(
+    text: str, replacements: List[Tuple[int, int, str]]
+) -> Tuple[str, List[Edit]]:
+    if not replacements:
+        return text, []
+    chunks = []
+    last = 0
+    for start, end, replacement in replacements:
+        chunks.append(text[last:start])
+        chunks.append(replacement)
+        last = end
+    chunks.append(text[last:])
+    return "".join(chunks), [(s, e, len(r)) for s, e, r in replacements]
+
+
+def _sub_pass(pattern, repl: Union[str, Callable[[re.Match], str]]) -> Pass:
+    if isinstance(repl, str):
+        if "\\" in repl:
+            template = repl
+            repl = lambda matched: matched.expand(template)  # noqa: E731
+        else:
+            return lambda text: _join(
+                text, [(m.start(), m.end(), repl) for m in pattern.finditer(text)]
+            )
+    return lambda text: _join(
+        text, [(m.start(), m.end(), repl(m)) for m in pattern.finditer(text)]
+    )
+
+
+def _insert_space_pass(pattern: re.Pattern) -> Pass:
+    # pattern.sub(r"\1 \2") is a space inserted between the two groups
+    def run(text: str) -> Tuple[str, List[Edit]]:
+        edits = [(m.start(2), m.start(2), 1) for m in pattern.finditer(text)]
+        if not edits:
+            return text, edits
+        return pattern.sub(r"\1 \2", text), edits
+
+    return run
+
+
+def _replace_pass(key: str, value: str) -> Pass:
+    # str.replace: non-overlapping occurrences from the left
+    pattern = re.compile(re.escape(key))
+
+    def run(text: str) -> Tuple[str, List[Edit]]:
+        if key not in text:
+            return text, []
+        return _join(
+            text, [(m.start(), m.end(), value) for m in pattern.finditer(text)]
+        )
+
+    return run
+
+
+def _strip_pass(text: str) -> Tuple[str, List[Edit]]:
+    stripped = text.strip()
+    if len(stripped) == len(text):
+        return text, []
+    lead = len(text) - len(text.lstrip())
+    edits = []
+    if lead:
+        edits.append((0, lead, 0))
+    if lead + len(stripped) < len(text):
+        edits.append((lead + len(stripped), len(text), 0))
+    return stripped, edits
+
+
+def _lower_pass(text: str) -> Tuple[str, List[Edit]]:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered, []
+    # Only a few characters ("İ") lower to more than one
+    return lowered, [
+        (i, i + 1, len(char.lower()))
+        for i, char in enumerate(text)
+        if len(char.lower()) != 1
+    ]
+
+
+def _unescape_html_pass(text: str) -> Tuple[str, List[Edit]]:
+    if "&" not in text:
+        return text, []
+    return _join(
+        text,
+        [
+            (m.start(), m.end(), html.unescape(m.group()))
+            for m in _CHARREF.finditer(text)
+        ],
+    )
+
+
+def _nfkd_pass(text: str) -> Tuple[str, List[Edit]]:
+    normalized = unicodedata.normalize("NFKD", text)
+    if normalized == text:
+        return text, []
+    # Canonical reordering never moves a mark across a character that
+    # decomposes to a starter, so every such character starts a segment
+    # that normalizes on its own
+    replacements = []
+    start = 0
+    for i in range(1, len(text) + 1):
+        if i < len(text):
+            decomposed = unicodedata.normalize("NFKD", text[i])
+            if unicodedata.combining(decomposed[0]):
+                continue
+        segment = text[start:i]
+        segment_normalized = unicodedata.normalize("NFKD", segment)
+        if segment_normalized != segment:
+            replacements.append((start, i, segment_normalized))
+        start = i
+    return _join(text, replacements)
+
+
+def _emoji_pass(pad: bool) -> Pass:
+    def run(text: str) -> Tuple[str, List[Edit]]:
+        return _join(
+            text,
+            [
+                (start, end, " " + text[start:end] + " " if pad else "")
+                for start, end in get_emoji_matcher().finditer(text)
+            ],
+        )
+
+    return run
+
+
+def _dup_emojis_pass(text: str) -> Tuple[str, List[Edit]]:
+    return _join(text, list(get_emoji_matcher().iter_dups(text)))
+
+
+def _stage_passes(name: str, options: Dict[str, str]) -> List[Pass]:
+    if name in SUB_STAGES:
+        pattern, replacement = SUB_STAGES[name]
+        return [_sub_pass(pattern, options.get("place_holder", replacement))]
+    if name == "lower":
+        return [_lower_pass]
+    if name == "unescape_html":
+        return [_unescape_html_pass]
+    if name == "normalize_text_pairs":
+        return [_replace_pass(k, v) for k, v in COMBINED_NORMALIZE_PAIRS]
+    if name == "normalize_accented_chars":
+        return [_replace_pass(k, v) for k, v in ACCENTED_PAIRS]
+    if name == "normalize_special_chars":
+        return [_nfkd_pass, _sub_pass(_SURROGATES, "")]
+    if name == "normalize_emoji":
+        return [_emoji_pass(pad=True), _strip_pass]
+    if name == "remove_emoji":
+        return [_emoji_pass(pad=False)]
+    if name == "replace_dup_emojis":
+        return [_dup_emojis_pass]
+    if name == "replace_dup_chars":
+        return [_sub_pass(RE_DUP_CHARS, lambda matched: matched.group(1))]
+    if name == "remove_others_char":
+        return [_sub_pass(RE_NONTHAI_ENG_EMOJI, " ")]
+    if name == "insert_spaces":
+        return [
+            _insert_space_pass(pattern)
+            for pattern in (
+                RE_DIGIT_NONDIGIT,
+                RE_NONDIGIT_DIGIT,
+                RE_THAI_NONTHAI,
+                RE_NONTHAI_THAI,
+                RE_LATIN_NONLATIN,
+                RE_NONLATIN_LATIN,
+            )
+        ]
+    if name == "remove_dup_spaces":
+        return [
+            _sub_pass(RE_DUP_SPACE, " "),
+            _sub_pass(RE_DUP_EMPTYLINE, "\n"),
+            _sub_pass(RE_STRIP, ""),
+            _strip_pass,
+        ]
+    raise ValueError("Stage without alignment support: {}".format(name))
+
+
+_PASSES: Dict[Tuple[Tuple[str, ...], str], list] = {}
+
+_DEFAULT_PREPROCESSOR = Preprocessor(DEFAULT_STAGES)
+
+
+def _compile_passes(
+    preprocessor: Preprocessor,
+) -> List[Tuple[Optional[re.Pattern], List[Pass]]]:
+    key = (preprocessor.stages, repr(preprocessor.options))
+    passes = _PASSES.get(key)
+    if passes is None:
+        passes = _PASSES[key] = [
+            (
+                STAGE_ANCHORS.get(name),
+                _stage_passes(name, preprocessor.options.get(name, {})),
+            )
+            for name in preprocessor.stages
+        ]
+    return passes
+
+
+def preprocess_aligned(
+    text: str, preprocessor: Optional[Preprocessor] = None
+) -> Tuple[str, Alignment]:
+    """
+    Same text as preprocess(text) (or preprocessor(text) for a
+    Preprocessor/Pipeline), together with its Alignment to text.
+    """
+    if preprocessor is None:
+        preprocessor = _DEFAULT_PREPROCESSOR
+    source_length = len(text) if text else 0
+    starts = array("q", range(source_length))
+    ends = array("q", range(1, source_length + 1))
+    if not text:
+        return "", Alignment(starts, ends, source_length)
+    for anchor, passes in _compile_passes(preprocessor):
+        if anchor is not None and not anchor.search(text):
+            continue
+        for run in passes:
+            text, edits = run(text)
+            if edits:
+                starts, ends = _apply(starts, ends, edits)
+    return text, Alignment(starts, ends, source_length)
+
+
+# Entity type of the matches of each stage, for preprocess_with_entities()
+ENTITY_STAGES = {
+    "normalize_at_mention": "mention",
+    "normalize_email": "email",
+    "normalize_link": "link",
+    "normalize_filename": "filename",
+    "normalize_date": "date",
+    "normalize_phone": "phone",
+}
+
+
+class Entity(NamedTuple):
+    type: str
+    text: str  # as in the raw text
+    start: int
+    end: int
+
+
+def preprocess_with_entities(
+    text: str, preprocessor: Optional[Preprocessor] = None
+) -> Tuple[str, List[Entity]]:
+    """
+    Same text as preprocess(text) (or preprocessor(text)), together with the
+    links, mentions, emails, filenames, dates and phone numbers its stages
+    replaced, with their offsets in text, in order of appearance.
+
+    Matches are collected during the substitution itself. Offsets are only
+    tracked up to the last entity stage, and only once a stage before it
+    changed the length of the text.
+    """
+    if preprocessor is None:
+        preprocessor = _DEFAULT_PREPROCESSOR
+    if not text:
+        return "", []
+    raw = text
+    entity_stages = [
+        i for i, name in enumerate(preprocessor.stages) if name in ENTITY_STAGES
+    ]
+    if not entity_stages:
+        return preprocessor(text), []
+
+    starts = ends = None  # the identity until some edit
+    entities = []
+    compiled = _compile_passes(preprocessor)
+    for i in range(entity_stages[-1] + 1):
+        anchor, passes = compiled[i]
+        if anchor is not None and not anchor.search(text):
+            continue
+        entity_type = ENTITY_STAGES.get(preprocessor.stages[i])
+        for run in passes:
+            text, edits = run(text)
+            if not edits:
+                continue
+            if entity_type is not None:
+                for start, end, _ in edits:
+                    if starts is not None:
+                        start, end = starts[start], ends[end - 1]
+                    entities.append(Entity(entity_type, raw[start:end], start, end))
+            if i < entity_stages[-1]:
+                if starts is None:
+                    starts = array("q", range(len(raw)))
+                    ends = array("q", range(1, len(raw) + 1))
+                starts, ends = _apply(starts, ends, edits)
+    for step in preprocessor._steps[entity_stages[-1] + 1 :]:
+        text = step(text)
+    entities.sort(key=lambda entity: entity.start)
+    return text, entities
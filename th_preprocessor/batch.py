@@ -0,0 +1,146 @@
+"""
+Preprocess many texts at once, in worker processes when it pays off.
+"""
+import collections
+import itertools
+import multiprocessing
+import os
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from th_preprocessor.cache import PreprocessCache
+from th_preprocessor.preprocess import preprocess
+from th_preprocessor.profiling import StageProfiler, profiled
+
+# Below this many texts, starting worker processes costs more than it saves
+SERIAL_THRESHOLD = 2000
+
+# Characters sent to a worker at a time when chunksize is not given
+CHUNK_CHARS = 64 * 1024
+
+# Chunks handed to the pool but not yet collected, per worker
+PENDING_CHUNKS_PER_WORKER = 4
+
+# Touches every lazily built table (emoji matcher etc.) in a new worker
+WARM_UP_TEXT = "Warm up 😀😀 <b>@name</b> a@b.com http://example.com a.png 0812345678 555"
+
+_worker_preprocessor: Optional[Callable[[str], str]] = None
+
+
+def _init_worker(preprocessor: Callable[[str], str]) -> None:
+    global _worker_preprocessor
+    _worker_preprocessor = preprocessor
+    preprocessor(WARM_UP_TEXT)
+
+
+def _flush(preprocessor: Callable[[str], str]) -> None:
+    # A PreprocessCache with a file writes the chunk's new results at once
+    if isinstance(preprocessor, PreprocessCache):
+        preprocessor.flush()
+
+
+def _preprocess_chunk(texts: List[str], profile: bool = False):
+    if not profile:
+        results = [_worker_preprocessor(text) for text in texts]
+        _flush(_worker_preprocessor)
+        return results
+    profiler = StageProfiler()
+    call = profiled(_worker_preprocessor)
+    results = [call(text, profiler) for text in texts]
+    _flush(_worker_preprocessor)
+    return results, profiler.stages
+
+
+def _chunks(texts: Iterable[str], chunksize: Optional[int]) -> Iterator[List[str]]:
+    texts = iter(texts)
+    if chunksize:
+        while True:
+            chunk = list(itertools.islice(texts, chunksize))
+            if not chunk:
+                return
+            yield chunk
+
+    # Many short tweets or a few long posts per chunk, so every chunk is
+    # about the same amount of work and pickling stays small relative to it
+    chunk = []
+    chars = 0
+    for text in texts:
+        chunk.append(text)
+        chars += len(text) if text else 0
+        if chars >= CHUNK_CHARS:
+            yield chunk
+            chunk = []
+            chars = 0
+    if chunk:
+        yield chunk
+
+
+def iter_preprocess(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    preprocessor: Callable[[str], str] = preprocess,
+    profiler: Optional[StageProfiler] = None,
+) -> Iterator[str]:
+    """
+    Like preprocess_many(), but yield the results as they are ready.
+    Texts are read only a few chunks ahead of the results, so memory stays
+    bounded for input of any size.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    texts = iter(texts)
+    head = list(itertools.islice(texts, SERIAL_THRESHOLD))
+    if workers <= 1 or len(head) < SERIAL_THRESHOLD:
+        if profiler is None:
+            yield from map(preprocessor, itertools.chain(head, texts))
+        else:
+            call = profiled(preprocessor)
+            for text in itertools.chain(head, texts):
+                yield call(text, profiler)
+        _flush(preprocessor)
+        return
+
+    def collect(pending_chunk) -> List[str]:
+        results = pending_chunk.get()
+        if profiler is None:
+            return results
+        results, stages = results
+        profiler.merge(stages)
+        return results
+
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker, initargs=(preprocessor,)
+    ) as pool:
+        # Pool.imap would read all of texts ahead, so keep our own window
+        pending = collections.deque()
+        for chunk in _chunks(itertools.chain(head, texts), chunksize):
+            if len(pending) >= PENDING_CHUNKS_PER_WORKER * workers:
+                yield from collect(pending.popleft())
+            pending.append(
+                pool.apply_async(_preprocess_chunk, (chunk, profiler is not None))
+            )
+        while pending:
+            yield from collect(pending.popleft())
+
+
+def preprocess_many(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    preprocessor: Callable[[str], str] = preprocess,
+    profiler: Optional[StageProfiler] = None,
+) -> List[str]:
+    """
+    Apply preprocessor (preprocess() by default, or e.g. a Preprocessor) to
+    every text and return the results in input order.
+
+    workers defaults to the number of CPUs. Texts are sent to the workers
+    in chunks of chunksize texts, or of about CHUNK_CHARS characters when
+    chunksize is not given. With fewer than SERIAL_THRESHOLD texts, or one
+    worker, everything runs in this process.
+
+    With a profiler, the stage statistics of every worker are added to it
+    (for a preprocessor that takes no profiler, the time of the whole call,
+    under the name of the function).
+    """
+    return list(iter_preprocess(texts, workers, chunksize, preprocessor, profiler))
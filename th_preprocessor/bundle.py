@@ -0,0 +1,226 @@
+"""
+Keep the tables the stages build (the emoji trie, translate tables and
+replacement maps) in one file, so that a new process (a worker of
+preprocess_many, a serverless cold start) loads them instead of building
+them again:
+
+    python -m th_preprocessor.bundle [DIRECTORY]
+
+writes the bundle to DIRECTORY, by default $TH_PREPROCESSOR_CACHE_DIR, where
+it is used from then on. Entries are plain data (JSON), so reading a bundle
+never runs code from it; patterns are compiled from the entries as usual.
+The file is memory-mapped and every entry is only read when it is first
+needed.
+
+A bundle is only used with the th_preprocessor version and the emoji
+package installation it was built with. Otherwise, and without a bundle,
+everything is built on first use as before; a bundle that is stale or
+cannot be read is logged (logger "th_preprocessor.bundle").
+"""
+import hashlib
+import importlib.util
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from th_preprocessor import __version__
+
+# Directory to keep built data between processes (optional)
+CACHE_DIR_ENV = "TH_PREPROCESSOR_CACHE_DIR"
+
+# Bump when what an entry holds changes
+FORMAT_VERSION = 2
+
+_MAGIC = b"th-preprocessor bundle\n"
+_LENGTH = struct.Struct("<Q")
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def bundle_path(directory: Optional[str] = None) -> Optional[str]:
+    """The bundle file in directory, by default $TH_PREPROCESSOR_CACHE_DIR."""
+    directory = directory or os.environ.get(CACHE_DIR_ENV)
+    if not directory:
+        return None
+    return os.path.join(directory, "bundle-{}.bin".format(FORMAT_VERSION))
+
+
+def _emoji_stamp() -> Optional[Tuple[str, str]]:
+    # The installed emoji package, without the time it takes to import it
+    spec = importlib.util.find_spec("emoji")
+    if spec is None or not spec.origin:
+        return None
+    with open(spec.origin, "rb") as f:
+        return spec.origin, hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _stamp() -> list:
+    emoji_stamp = _emoji_stamp()
+    return [FORMAT_VERSION, __version__, emoji_stamp and list(emoji_stamp)]
+
+
+def _key(parts: Hashable) -> str:
+    data = repr(parts).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class Bundle:
+    """A bundle file, of which every entry is decoded on request."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[: len(_MAGIC)] != _MAGIC:
+            raise ValueError("{} is not a bundle".format(path))
+        (length,) = _LENGTH.unpack_from(self._data, len(_MAGIC))
+        start = len(_MAGIC) + _LENGTH.size
+        header = json.loads(self._data[start : start + length])
+        self.stamp = header["stamp"]
+        self._index: Dict[str, Tuple[int, int]] = header["index"]
+        self._base = start + length
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, key: str) -> Any:
+        offset, length = self._index[key]
+        start = self._base + offset
+        return json.loads(self._data[start : start + length])
+
+
+def write(path: str, entries: Dict[str, Any]) -> None:
+    """Write entries (keys as made by load(), values JSON data) to path."""
+    index = {}
+    blobs = []
+    offset = 0
+    for key, value in entries.items():
+        blob = json.dumps(value, separators=(",", ":")).encode("ascii")
+        index[key] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    header = json.dumps({"stamp": _stamp(), "index": index}).encode("ascii")
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(_LENGTH.pack(len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+_BUNDLE: Optional[Bundle] = None
+_OPENED = False
+# Everything built through load() while a bundle is being built
+_BUILDING: Optional[Dict[str, Any]] = None
+
+
+def get_bundle() -> Optional[Bundle]:
+    """The bundle in $TH_PREPROCESSOR_CACHE_DIR, if there is a usable one."""
+    global _BUNDLE, _OPENED
+    if not _OPENED:
+        _OPENED = True
+        path = bundle_path()
+        if path and _BUILDING is None and os.path.exists(path):
+            try:
+                bundle = Bundle(path)
+            except Exception as e:
+                # Partly written or not a bundle: the same as none
+                logger.warning("Ignoring unreadable bundle %s: %r", path, e)
+            else:
+                if bundle.stamp == _stamp():
+                    _BUNDLE = bundle
+                else:
+                    logger.warning(
+                        "Ignoring bundle %s built for another th_preprocessor "
+                        "or emoji version; rebuild it with "
+                        "python -m th_preprocessor.bundle",
+                        path,
+                    )
+    return _BUNDLE
+
+
+def load(parts: Hashable, build: Callable[[], T]) -> T:
+    """
+    The entry for parts from the bundle, or build() when the bundle does
+    not have it. parts (e.g. a name and the data built from) must tell
+    apart everything that build() can return. What build() returns must be
+    JSON data, and be usable with its tuples read back as lists.
+    """
+    bundle = get_bundle()
+    if bundle is None and _BUILDING is None:
+        return build()
+    key = _key(parts)
+    if bundle is not None and key in bundle:
+        try:
+            return bundle[key]
+        except ValueError as e:
+            logger.warning("Rebuilding broken bundle entry %r: %r", parts[0], e)
+    value = build()
+    if _BUILDING is not None:
+        _BUILDING[key] = value
+    return value
+
+
+def build(directory: Optional[str] = None) -> str:
+    """
+    Build everything the stages build on first use and write it to a bundle
+    in directory. Only what is built after this is called ends up in the
+    bundle, so call it in a fresh process, before th_preprocessor.preprocess
+    is imported (python -m th_preprocessor.bundle does). Returns the path.
+    """
+    global _BUILDING
+    path = bundle_path(directory)
+    if path is None:
+        raise ValueError("No directory given and {} is not set".format(CACHE_DIR_ENV))
+    if "th_preprocessor.preprocess" in sys.modules:
+        raise RuntimeError(
+            "th_preprocessor.preprocess is already imported; "
+            "run python -m th_preprocessor.bundle instead"
+        )
+    _BUILDING = {}
+    try:
+        from th_preprocessor import preprocess
+
+        for stage in preprocess.STAGES.values():
+            stage("warm up 😀")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write(path, _BUILDING)
+    finally:
+        _BUILDING = None
+    return path
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        help="where to write the bundle (default: ${})".format(CACHE_DIR_ENV),
+    )
+    args = parser.parse_args(argv)
+    try:
+        path = build(args.directory)
+    except ValueError as e:
+        parser.error(str(e))
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    # Build through th_preprocessor.bundle, the module the stages load from,
+    # rather than this copy running as __main__
+    from th_preprocessor.bundle import main as bundle_main
+
+    sys.exit(bundle_main())
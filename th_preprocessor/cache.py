@@ -0,0 +1,231 @@
+"""
+Cache preprocess() (or any Preprocessor) results for repeated texts.
+
+Retweets, copy-paste spam and bot posts make a large share of social
+data exact duplicates:
+
+    cached = PreprocessCache(preprocess, max_entries=100_000)
+    results = preprocess_many(texts, preprocessor=cached)
+    print(cached.cache_info())
+
+With a path, results are also kept in an SQLite file, so worker processes
+(and later runs) share their hits. New results are written to it in
+batches, each in one transaction; preprocess_many() and iter_preprocess()
+write what is left after every chunk, other callers call flush().
+"""
+import atexit
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import weakref
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from th_preprocessor import __version__
+from th_preprocessor.preprocess import _DEFAULT_PREPROCESSOR, Preprocessor, preprocess
+from th_preprocessor.profiling import StageProfiler, profiled
+
+# New results written to the SQLite file at a time
+SAVE_BATCH = 1000
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+def _config_key(preprocessor: Callable[[str], str]) -> str:
+    # The stages and this version, whose stages may give other results
+    if preprocessor is preprocess:
+        preprocessor = _DEFAULT_PREPROCESSOR
+    if isinstance(preprocessor, Preprocessor):
+        config = [preprocessor.stages, preprocessor.options]
+    else:
+        config = "{}.{}".format(
+            getattr(preprocessor, "__module__", ""),
+            getattr(preprocessor, "__qualname__", type(preprocessor).__name__),
+        )
+    return json.dumps([__version__, config], ensure_ascii=False, sort_keys=True)
+
+
+class PreprocessCache:
+    """
+    Call preprocessor once per distinct text and keep the results, least
+    recently used first out when there are more than max_entries of them
+    or they take more than max_bytes (as counted by sys.getsizeof).
+
+    The in-memory cache is keyed by the text itself. The SQLite file at
+    path is keyed by a BLAKE2 hash of the pipeline configuration (the
+    stages of preprocess() or a Preprocessor), the th_preprocessor and emoji
+    versions and the text, so an upgrade does not reuse older results;
+    delete it after changing a custom preprocessor function. Safe to use
+    from several threads.
+    """
+
+    def __init__(
+        self,
+        preprocessor: Callable[[str], str] = preprocess,
+        max_entries: Optional[int] = 100_000,
+        max_bytes: Optional[int] = None,
+        path: Optional[str] = None,
+    ):
+        self.preprocessor = preprocessor
+        self._profiled = profiled(preprocessor)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self._results = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._db = None
+        self._db_pid = None
+        self._key_prefix = None
+        # New results not written to the file yet, by key
+        self._unsaved = {}
+        if path is not None:
+            atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def __call__(self, text: str, profiler: Optional[StageProfiler] = None) -> str:
+        if not text:
+            return self.preprocessor(text)
+        with self._lock:
+            result = self._results.get(text)
+            if result is not None:
+                self._results.move_to_end(text)
+                self._hits += 1
+                return result
+            if self.path is not None:
+                result = self._load(text)
+                if result is not None:
+                    self._hits += 1
+                    self._store(text, result)
+                    return result
+            self._misses += 1
+
+        if profiler is None:
+            result = self.preprocessor(text)
+        else:
+            result = self._profiled(text, profiler)
+
+        with self._lock:
+            if text not in self._results:
+                self._store(text, result)
+                if self.path is not None:
+                    self._save(text, result)
+        return result
+
+    def _store(self, text: str, result: str) -> None:
+        self._results[text] = result
+        self._bytes += sys.getsizeof(text) + sys.getsizeof(result)
+        while self._results and (
+            (self.max_entries is not None and len(self._results) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            old_text, old_result = self._results.popitem(last=False)
+            self._bytes -= sys.getsizeof(old_text) + sys.getsizeof(old_result)
+            self._evictions += 1
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not cross a fork, so every process opens its own
+        if self._db is None or self._db_pid != os.getpid():
+            import emoji
+
+            self._db = sqlite3.connect(
+                self.path, timeout=60, isolation_level=None, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, result TEXT)"
+            )
+            self._db_pid = os.getpid()
+            self._key_prefix = "{}\0emoji {}\0".format(
+                _config_key(self.preprocessor), emoji.__version__
+            )
+        return self._db
+
+    def _db_key(self, text: str) -> Tuple[sqlite3.Connection, bytes]:
+        db = self._connect()
+        data = (self._key_prefix + text).encode("utf-8", "surrogatepass")
+        return db, hashlib.blake2b(data, digest_size=16).digest()
+
+    def _load(self, text: str) -> Optional[str]:
+        db, key = self._db_key(text)
+        if key in self._unsaved:
+            return self._unsaved[key]
+        row = db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _save(self, text: str, result: str) -> None:
+        _, key = self._db_key(text)
+        self._unsaved[key] = result
+        if len(self._unsaved) >= SAVE_BATCH:
+            self._write_unsaved()
+
+    def _write_unsaved(self) -> None:
+        # One transaction for the whole batch rather than one per result
+        if not self._unsaved:
+            return
+        db = self._connect()
+        db.execute("BEGIN")
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO results (key, result) VALUES (?, ?)",
+                self._unsaved.items(),
+            )
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        self._unsaved.clear()
+
+    def flush(self) -> None:
+        """Write the results not yet in the SQLite file to it."""
+        with self._lock:
+            if self.path is not None:
+                self._write_unsaved()
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._results),
+                self._bytes,
+            )
+
+    def cache_clear(self) -> None:
+        """Empty the in-memory cache and reset the statistics (not the file)."""
+        with self._lock:
+            self._results.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def __reduce__(self):
+        # Workers start with an empty in-memory cache and share the file
+        return (
+            self.__class__,
+            (self.preprocessor, self.max_entries, self.max_bytes, self.path),
+        )
+
+    def __repr__(self) -> str:
+        return "{}({!r}, max_entries={!r}, max_bytes={!r}, path={!r})".format(
+            self.__class__.__name__,
+            self.preprocessor,
+            self.max_entries,
+            self.max_bytes,
+            self.path,
+        )
+
+
+def _flush_at_exit(ref: "weakref.ref[PreprocessCache]") -> None:
+    cache = ref()
+    if cache is not None:
+        cache.flush()
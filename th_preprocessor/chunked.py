@@ -0,0 +1,232 @@
+"""
+Preprocess a document too large to hold twice in memory, window by window:
+
+    from th_preprocessor.chunked import preprocess_chunks
+
+    with open("dump.txt", encoding="utf-8") as f, open("clean.txt", "w") as out:
+        out.writelines(preprocess_chunks(f, window=2 ** 16))
+
+The pieces joined together are preprocess(document). A window is only cut
+in a run of whitespace between two words made of Latin and Thai letters,
+outside of any tag, where no stage can match across the run: links, emails,
+mentions, phone numbers, dates, tags, "hahaha" and runs of duplicated
+characters all stay in one window. No stage takes the letters next to the
+cut away, so both sides are preprocessed as they would be in the whole
+document, and the run in between becomes what it becomes there (one space
+in preprocess()). Preprocessors with other stages than STAGES, or other
+functions, cannot be cut this way.
+
+Memory is about the size of the window, unless a document has no place
+to cut for longer than that (one tag over megabytes, text without spaces),
+which is then read until the next place to cut.
+"""
+import html
+import itertools
+import re
+import unicodedata
+from bisect import bisect_right
+from html.entities import html5
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from th_preprocessor.preprocess import (
+    _DEFAULT_PREPROCESSOR,
+    _THAI_MONTHS,
+    Preprocessor,
+    preprocess,
+)
+
+# Latin and Thai letters, except "฿" (a space in normalize_text_pairs)
+_LETTERS = "a-zA-Zก-ฺเ-๎"
+# Words of letters that a date ends or starts with (3 มกราคม, 4 นาฬิกา)
+_DATE_WORDS = _THAI_MONTHS.split("|") + ["นาฬิกา"]
+# A whitespace run between two words of letters. The word before does not
+# end in "a" or "ถ" (a "hahaha" would take the run with it), the word after
+# does not start with "h" or "ถ" (its " WSHAHA " would) or "e" (a phone
+# extension, as in "ต่อ e12"), neither is part of a date, and the word after
+# ends before more whitespace, not where the text read so far ends.
+RE_CUT = re.compile(
+    r"(?<!\S)[{letters}]*[b-zB-Zก-ตท-ฺเ-๎]{not_before}(\s+)"
+    r"(?=[a-dfgi-zA-DFGI-Zก-ตท-ฺเ-๎][{letters}]*\s)(?!{not_after})".format(
+        letters=_LETTERS,
+        not_before="".join("(?<!{})".format(word) for word in _DATE_WORDS),
+        not_after="|".join(_DATE_WORDS),
+    )
+)
+# What a stage before remove_tag can make a "<" of (unescape_html, then
+# normalize_special_chars), besides numeric entities
+_OPENERS = "[<≮﹤＜]|&(?i:{})".format(
+    "|".join(
+        sorted(
+            (
+                re.escape(name)
+                for name, value in html5.items()
+                if "<" in unicodedata.normalize("NFKD", value)
+            ),
+            reverse=True,
+        )
+    )
+)
+_NUMERIC_ENTITY = r"&#(?:[0-9]+|[xX][0-9a-fA-F]+)"
+# Entities that are always a ">" once unescaped ("&gt" alone may be "&gtdot;")
+_ENTITY_CLOSERS = r"&gt;|&GT;|&nvgt;|&#0*62(?![0-9])|&#[xX]0*3[eE](?![0-9a-fA-F])"
+# Stages that leave entities as they are (insert_spaces makes "& gt ;")
+_KEEP_ENTITIES = {"lower", "normalize_accented_chars", "normalize_special_chars"}
+# Stages that can take a ">" away before remove_tag sees it (remove_tag
+# itself, when it runs twice)
+_HIDE_CLOSERS = {
+    "normalize_text_pairs",
+    "remove_others_char",
+    "remove_hashtags",
+    "normalize_filename",
+    "remove_tag",
+}
+
+# Separators cached at most, one per distinct whitespace run
+MAX_SEPARATORS = 1024
+
+
+def _tag_edge_pattern(stages: Sequence[str]) -> Optional[re.Pattern]:
+    """
+    Where a tag may open (group "open") or closes for remove_tag, or None
+    without remove_tag. Where a tag may open includes more than needed and
+    where it closes less, so no tag is taken as closed before it is.
+    """
+    if "remove_tag" not in stages:
+        return None
+    before = stages[: len(stages) - 1 - stages[::-1].index("remove_tag")]
+    if before.count("unescape_html") > 1:
+        # "&amp;lt;" unescaped twice: any entity may be a "<"
+        edges = ["(?P<open>{}|&)".format(_OPENERS)]
+    else:
+        edges = ["(?P<open>{})".format(_OPENERS)]
+    if not _HIDE_CLOSERS.intersection(before):
+        edges.append(">")
+    if "unescape_html" in before:
+        first = before.index("unescape_html")
+        if set(before[:first]) <= _KEEP_ENTITIES and not _HIDE_CLOSERS.intersection(
+            before[first:]
+        ):
+            edges.append(_ENTITY_CLOSERS)
+    edges.append("(?P<numeric>{})".format(_NUMERIC_ENTITY))
+    return re.compile("|".join(edges))
+
+
+def _tag_edges(
+    text: str, pos: int, pattern: Optional[re.Pattern]
+) -> Tuple[List[int], List[bool]]:
+    positions = []
+    opens = []
+    if pattern is None:
+        return positions, opens
+    for matched in pattern.finditer(text, pos):
+        group = matched.lastgroup
+        if group == "numeric":
+            value = unicodedata.normalize("NFKD", html.unescape(matched.group()))
+            if "<" not in value:
+                continue
+            group = "open"
+        positions.append(matched.start())
+        opens.append(group == "open")
+    return positions, opens
+
+
+def _find_cut(
+    text: str, pos: int, limit: int, tag_edges: Optional[re.Pattern]
+) -> Optional[Tuple[int, int]]:
+    # The last place to cut text[pos:] before limit, else the first after it
+    positions, opens = _tag_edges(text, pos, tag_edges)
+    near = max(pos, limit - 4096)
+    for start in sorted({near, pos}, reverse=True):
+        cut = None
+        for matched in RE_CUT.finditer(text, start):
+            run_start = matched.start(1)
+            edge = bisect_right(positions, run_start) - 1
+            if edge >= 0 and opens[edge]:
+                continue
+            if run_start > limit:
+                if cut is None and start == pos:
+                    cut = matched.span(1)
+                break
+            cut = matched.span(1)
+        if cut is not None:
+            return cut
+    return None
+
+
+def preprocess_chunks(
+    document: Union[str, Iterable[str]],
+    window: int = 2**16,
+    preprocessor: Callable[[str], str] = preprocess,
+) -> Iterator[str]:
+    """
+    preprocessor(document) in pieces, from windows of about window
+    characters. document is a string or its pieces in order (such as the
+    lines of a text file); preprocessor is preprocess() or a Preprocessor.
+    """
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if preprocessor is preprocess:
+        preprocessor = _DEFAULT_PREPROCESSOR
+    if not isinstance(preprocessor, Preprocessor):
+        raise TypeError("preprocessor must be preprocess or a Preprocessor")
+    pieces = document
+    if isinstance(document, str):
+        pieces = (document[i : i + window] for i in range(0, len(document), window))
+    return _preprocess_pieces(pieces, window, preprocessor)
+
+
+def _preprocess_pieces(
+    pieces: Iterable[str], window: int, preprocessor: Preprocessor
+) -> Iterator[str]:
+    tag_edges = _tag_edge_pattern(preprocessor.stages)
+    separators: Dict[str, str] = {}
+    separator = None
+    parts = [""]
+    size = 0
+    wanted = window
+    for piece in itertools.chain(pieces, [None]):
+        if piece is not None:
+            parts.append(piece)
+            size += len(piece)
+            if size < wanted:
+                continue
+        text = "".join(parts)
+        pos = 0
+        while True:
+            cut = None
+            if len(text) - pos >= window:
+                cut = _find_cut(text, pos, pos + window, tag_edges)
+            if cut is None and piece is not None:
+                break
+            end = len(text) if cut is None else cut[0]
+            processed = preprocessor(text[pos:end])
+            if processed:
+                if separator is not None:
+                    yield separator
+                yield processed
+            if cut is None:
+                break
+            # Both sides end in a letter: the run is preprocessed on its own
+            run = text[cut[0] : cut[1]]
+            separator = separators.get(run)
+            if separator is None:
+                if len(separators) >= MAX_SEPARATORS:
+                    separators.clear()
+                separator = separators[run] = preprocessor("b" + run + "b")[1:-1]
+            pos = cut[1]
+        if piece is None:
+            return
+        parts = [text[pos:]]
+        size = len(parts[0])
+        # Nowhere to cut yet: read as much again before looking again
+        wanted = 2 * size if size >= window else window
@@ -0,0 +1,316 @@
+"""
+th-preprocess: preprocess JSONL, CSV or plain text files as a stream.
+
+    th-preprocess posts.jsonl.gz --field text -o clean.jsonl.gz --workers 8
+    cat dump.csv | th-preprocess --format csv --field message --suffix _clean
+    th-preprocess lines.txt --stages lower,normalize_link,remove_dup_spaces
+    th-preprocess lines.txt --pipeline model-v3-pipeline.json
+    th-preprocess --serve 127.0.0.1:8080 --workers 4
+"""
+import argparse
+import asyncio
+import collections
+import csv
+import gzip
+import io
+import json
+import sys
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from th_preprocessor.aio import AsyncPreprocessor
+from th_preprocessor.batch import iter_preprocess
+from th_preprocessor.cache import PreprocessCache
+from th_preprocessor.preprocess import STAGES, Pipeline, Preprocessor, preprocess
+from th_preprocessor.profiling import StageProfiler
+from th_preprocessor.server import serve
+
+FORMATS = ("jsonl", "csv", "text")
+
+_EXTENSION_FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl",
+    ".csv": "csv",
+    ".txt": "text",
+}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class InputError(ValueError):
+    """An input record that cannot be read, with where it is."""
+
+
+def _open_input(path: str, newline: str) -> IO[str]:
+    if path == "-":
+        stream = sys.stdin.buffer
+        if stream.peek(2)[:2] == _GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=stream)
+    elif path.endswith(".gz"):
+        stream = gzip.open(path, "rb")
+    else:
+        stream = open(path, "rb")
+    return io.TextIOWrapper(stream, encoding="utf-8", newline=newline)
+
+
+def _open_output(path: str, compress: bool) -> IO[str]:
+    if path == "-":
+        stream = sys.stdout.buffer
+        if compress:
+            stream = gzip.GzipFile(fileobj=stream, mode="wb")
+    elif compress or path.endswith(".gz"):
+        stream = gzip.open(path, "wb")
+    else:
+        stream = open(path, "wb")
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def _guess_format(paths: Sequence[str]) -> str:
+    for path in paths:
+        name = path[:-3] if path.endswith(".gz") else path
+        for extension, fmt in _EXTENSION_FORMATS.items():
+            if name.endswith(extension):
+                return fmt
+    return "text"
+
+
+def _preprocess_records(
+    records: Iterable[dict],
+    fields: Sequence[str],
+    suffix: str,
+    preprocessor: Callable[[str], str],
+    workers: Optional[int],
+    chunksize: Optional[int],
+    profiler: Optional[StageProfiler],
+) -> Iterator[dict]:
+    # Records wait here while their texts are being preprocessed;
+    # iter_preprocess only reads a few chunks ahead, so this stays small
+    waiting = collections.deque()
+
+    def texts() -> Iterator[str]:
+        for record in records:
+            present = [field for field in fields if record.get(field) is not None]
+            waiting.append((record, present))
+            for field in present:
+                yield str(record[field])
+
+    results = iter_preprocess(texts(), workers, chunksize, preprocessor, profiler)
+    while True:
+        result = next(results, None)
+        # Records without any of the fields have no result to wait for
+        while waiting and not waiting[0][1]:
+            yield waiting.popleft()[0]
+        if result is None:
+            break
+        record, present = waiting.popleft()
+        for i, field in enumerate(present):
+            if i:
+                result = next(results)
+            record[field + suffix] = result
+        yield record
+
+
+def _read_jsonl(streams: Iterable[IO[str]]) -> Iterator[dict]:
+    for stream in streams:
+        with stream:
+            name = getattr(stream, "name", "-")
+            for number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise InputError("{}:{}: {}".format(name, number, e))
+                if not isinstance(record, dict):
+                    raise InputError(
+                        "{}:{}: expected a JSON object, not {}".format(
+                            name, number, type(record).__name__
+                        )
+                    )
+                yield record
+
+
+def _read_csv(streams: Iterable[IO[str]], fieldnames: List[str]) -> Iterator[dict]:
+    for stream in streams:
+        with stream:
+            reader = csv.DictReader(stream)
+            for name in reader.fieldnames or []:
+                if name not in fieldnames:
+                    fieldnames.append(name)
+            yield from reader
+
+
+def _read_text(streams: Iterable[IO[str]]) -> Iterator[str]:
+    for stream in streams:
+        with stream:
+            for line in stream:
+                # Lines are only split on "\n", so a "\r" inside one stays
+                if line.endswith("\n"):
+                    line = line[:-1]
+                if line.endswith("\r"):
+                    line = line[:-1]
+                yield line
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="th-preprocess",
+        description="Preprocess Thai text in JSONL, CSV or plain text files.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        help="input files, optionally gzipped (default: stdin)",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file (default: stdout)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="input and output format (default: from the input file extension)",
+    )
+    parser.add_argument(
+        "--field",
+        action="append",
+        dest="fields",
+        help="JSONL/CSV field to preprocess, can be repeated (default: text)",
+    )
+    parser.add_argument(
+        "--suffix",
+        default="",
+        help="write results to <field><suffix> instead of overwriting the field",
+    )
+    pipeline = parser.add_mutually_exclusive_group()
+    pipeline.add_argument(
+        "--stages",
+        help="comma-separated stages to run instead of preprocess() ({})".format(
+            ", ".join(STAGES)
+        ),
+    )
+    pipeline.add_argument(
+        "--pipeline",
+        metavar="JSON_FILE",
+        help="run the stages and options of a saved Pipeline (see Pipeline.to_json)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes, 0 for one per CPU (default: 1)",
+    )
+    parser.add_argument("--chunksize", type=int, help="texts per worker task")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument(
+        "--cache",
+        type=int,
+        metavar="ENTRIES",
+        help="keep up to ENTRIES results per process for duplicate texts",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="serve requests instead of reading files: [HOST:]PORT for HTTP, "
+        "- for JSON lines on stdin/stdout (see th_preprocessor.server)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time spent in each stage to stderr",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    fmt = args.format or _guess_format(args.inputs)
+    fields = args.fields or ["text"]
+    preprocessor = preprocess
+    try:
+        if args.pipeline:
+            with open(args.pipeline, encoding="utf-8") as f:
+                preprocessor = Pipeline.from_json(f.read())
+        elif args.stages:
+            preprocessor = Preprocessor(args.stages.split(","))
+    except (OSError, ValueError) as e:
+        sys.stderr.write("th-preprocess: {}\n".format(e))
+        return 2
+    if args.cache:
+        preprocessor = PreprocessCache(preprocessor, max_entries=args.cache)
+    workers = args.workers or None
+    if args.serve:
+        pool = AsyncPreprocessor(preprocessor, workers, executor="process")
+        try:
+            asyncio.run(serve(pool, args.serve))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    profiler = StageProfiler() if args.profile else None
+
+    # CSV fields can hold line breaks, which csv splits on by itself; JSONL
+    # and text records end at "\n" only (not at a bare "\r")
+    newline = "" if fmt == "csv" else "\n"
+    streams = (_open_input(path, newline) for path in args.inputs)
+    output = _open_output(args.output, args.gzip)
+    try:
+        if fmt == "text":
+            for result in iter_preprocess(
+                _read_text(streams), workers, args.chunksize, preprocessor, profiler
+            ):
+                output.write(result)
+                output.write("\n")
+        elif fmt == "jsonl":
+            for record in _preprocess_records(
+                _read_jsonl(streams),
+                fields,
+                args.suffix,
+                preprocessor,
+                workers,
+                args.chunksize,
+                profiler,
+            ):
+                output.write(json.dumps(record, ensure_ascii=False))
+                output.write("\n")
+        else:
+            fieldnames = []
+            writer = None
+            for record in _preprocess_records(
+                _read_csv(streams, fieldnames),
+                fields,
+                args.suffix,
+                preprocessor,
+                workers,
+                args.chunksize,
+                profiler,
+            ):
+                if writer is None:
+                    fieldnames.extend(
+                        field + args.suffix
+                        for field in fields
+                        if field + args.suffix not in fieldnames
+                    )
+                    writer = csv.DictWriter(output, fieldnames, extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerow(record)
+    except InputError as e:
+        sys.stderr.write("th-preprocess: {}\n".format(e))
+        return 1
+    finally:
+        if args.output == "-":
+            # Finish a gzip stream but leave stdout open
+            output.flush()
+            stream = output.detach()
+            if stream is not sys.stdout.buffer:
+                stream.close()
+        else:
+            output.close()
+    if profiler is not None:
+        sys.stderr.write(profiler.format_summary() + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+Find near-duplicates (bot and copy-paste campaigns) in a stream of texts,
+before they reach slower models:
+
+    from th_preprocessor.dedup import NearDuplicateIndex
+
+    index = NearDuplicateIndex(threshold=0.8, max_entries=100_000)
+    for text in index.filter(texts):  # or index.flag(texts) to keep them
+        ...
+
+Texts are compared after preprocess(), so posts that only differ in their
+links, mentions, numbers or emoji spacing are the same text. Every text has
+a MinHash signature of its character shingles; texts whose signatures agree
+on at least threshold of their values are near-duplicates (about the share
+of shingles they have in common). The signatures of a batch are computed
+together with numpy when it is installed, with the same results as without.
+
+The index keeps the max_entries texts that were most recently added or
+matched, in banded buckets (LSH), so a lookup only compares a text with
+the few that share a band of its signature.
+"""
+import collections
+import itertools
+import operator
+import random
+from array import array
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from th_preprocessor.preprocess import preprocess
+
+_MASK = (1 << 64) - 1
+# A shingle is the polynomial of its code points in _BASE, mixed to 32 bits
+_BASE = 0x100000001B3
+_MIX = 0x9E3779B97F4A7C15
+_EMPTY = 0xFFFFFFFF
+
+# Shingles hashed at a time in the numpy path (num_perm * 8 bytes each)
+BLOCK_SHINGLES = 16384
+
+
+def _bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    # (bands, rows): a pair of texts with similarity s shares a band with
+    # probability 1 - (1 - s ** rows) ** bands, about 1/2 at (1/bands) **
+    # (1/rows). The closest to threshold from below misses the fewest.
+    best = (1, num_perm)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold:
+            best = (num_perm // rows, rows)
+    return best
+
+
+def _shingles(text: str, size: int) -> Set[int]:
+    codes = list(map(ord, text))
+    if len(codes) < size:
+        size = len(codes)
+    if not size:
+        return set()
+    top = pow(_BASE, size - 1, 1 << 64)
+    poly = 0
+    for code in codes[:size]:
+        poly = (poly * _BASE + code) & _MASK
+    polys = [poly]
+    for old, new in zip(codes, codes[size:]):
+        poly = ((poly - old * top) * _BASE + new) & _MASK
+        polys.append(poly)
+    return {(poly * _MIX & _MASK) >> 32 for poly in polys}
+
+
+def _shingles_numpy(np, texts: List[str], size: int):
+    # The shingles of all texts in one array, and where those of each start
+    # surrogatepass: lone surrogates (e.g. from a bad decode) keep their
+    # code point, as with ord() in _shingles
+    data = "".join(texts).encode("utf-32-le", "surrogatepass")
+    codes = np.frombuffer(data, dtype="<u4")
+    codes = codes.astype(np.uint64)
+    windows = np.zeros(max(len(codes) - size + 1, 0), dtype=np.uint64)
+    for j in range(size):
+        windows *= np.uint64(_BASE)
+        windows += codes[j : j + len(windows)]
+    windows *= np.uint64(_MIX)
+    windows >>= np.uint64(32)
+
+    parts = []
+    starts = []
+    count = 0
+    start = 0
+    for text in texts:
+        end = start + len(text)
+        if len(text) >= size:
+            parts.append(windows[start : end - size + 1])
+        elif text:
+            parts.append(np.array(sorted(_shingles(text, size)), dtype=np.uint64))
+        else:
+            parts.append(windows[:0])
+        starts.append(count)
+        count += len(parts[-1])
+        start = end
+    return np.concatenate(parts) if parts else windows[:0], starts
+
+
+class NearDuplicateIndex:
+    """
+    An index of up to max_entries recent texts, each under a key (its
+    position in the stream by default). threshold is the similarity from
+    which texts are near-duplicates, over num_perm MinHash values of the
+    shingle_size character shingles of preprocessor(text) (None for texts
+    that are already preprocessed). Texts that preprocess to nothing are
+    never near-duplicates.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        max_entries: Optional[int] = 100_000,
+        preprocessor: Optional[Callable[[str], str]] = preprocess,
+        seed: int = 0,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be more than 0 and at most 1")
+        if num_perm < 1 or shingle_size < 1:
+            raise ValueError("num_perm and shingle_size must be at least 1")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.preprocessor = preprocessor
+        self.seed = seed
+        self.bands, self.rows = _bands(num_perm, threshold)
+        r = random.Random(seed)
+        # h(x) = ((a * x + b) mod 2 ** 64) >> 32, with a odd
+        self._a = [r.getrandbits(64) | 1 for _ in range(num_perm)]
+        self._b = [r.getrandbits(64) for _ in range(num_perm)]
+        self._signatures: Dict[Hashable, bytes] = collections.OrderedDict()
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [
+            {} for _ in range(self.bands)
+        ]
+        self._next_key = 0
+
+    def _normalize(self, text: str) -> str:
+        return self.preprocessor(text) if self.preprocessor else text
+
+    def signature(self, text: str) -> Optional[bytes]:
+        """The MinHash signature of text (num_perm uint32), None if empty."""
+        return self._minhash(self._normalize(text))
+
+    def _minhash(self, normalized: str) -> Optional[bytes]:
+        shingles = _shingles(normalized, self.shingle_size)
+        if not shingles:
+            return None
+        values = array(
+            "I",
+            (
+                min([(a * x + b) & _MASK for x in shingles]) >> 32
+                for a, b in zip(self._a, self._b)
+            ),
+        )
+        return values.tobytes()
+
+    def signatures(self, texts: Iterable[str]) -> List[Optional[bytes]]:
+        """signature() of every text, all at once with numpy if installed."""
+        texts = [self._normalize(text) for text in texts]
+        try:
+            import numpy as np
+        except ImportError:
+            return [self._minhash(text) for text in texts]
+        return self._signatures_numpy(np, texts)
+
+    def _signatures_numpy(self, np, texts: List[str]) -> List[Optional[bytes]]:
+        shingles, starts = _shingles_numpy(np, texts, self.shingle_size)
+        a = np.array(self._a, dtype=np.uint64)[:, None]
+        b = np.array(self._b, dtype=np.uint64)[:, None]
+        values = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        # Integers even without texts, which np.append would make float64
+        bounds = np.array(starts + [len(shingles)], dtype=np.int64)
+        owners = np.repeat(np.arange(len(texts)), np.diff(bounds))
+        for start in range(0, len(shingles), BLOCK_SHINGLES):
+            block = shingles[start : start + BLOCK_SHINGLES]
+            hashed = ((a * block[None, :] + b) >> np.uint64(32)).astype(np.uint32)
+            # Minimum over the run of every text in the block
+            block_owners = owners[start : start + len(block)]
+            cuts = np.flatnonzero(np.diff(block_owners)) + 1
+            cuts = np.concatenate([[0], cuts])
+            minimums = np.minimum.reduceat(hashed, cuts, axis=1)
+            rows = block_owners[cuts]
+            values[rows] = np.minimum(values[rows], minimums.T)
+        return [
+            row.tobytes() if start < end else None
+            for row, start, end in zip(
+                values, starts, itertools.chain(starts[1:], [len(shingles)])
+            )
+        ]
+
+    def similarity(self, first: bytes, second: bytes) -> float:
+        """The share of equal values in two signatures."""
+        equal = sum(
+            map(operator.eq, memoryview(first).cast("I"), memoryview(second).cast("I"))
+        )
+        return equal / self.num_perm
+
+    def _band_keys(self, signature: bytes) -> Iterator[Tuple[int, bytes]]:
+        width = self.rows * 4
+        for band in range(self.bands):
+            yield band, signature[band * width : (band + 1) * width]
+
+    def query_signature(
+        self, signature: Optional[bytes]
+    ) -> List[Tuple[Hashable, float]]:
+        """(key, similarity) of the indexed near-duplicates, most similar first."""
+        if signature is None:
+            return []
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(key, ()))
+        matches = []
+        for candidate in candidates:
+            similarity = self.similarity(signature, self._signatures[candidate])
+            if similarity >= self.threshold:
+                matches.append((candidate, similarity))
+        matches.sort(key=operator.itemgetter(1), reverse=True)
+        return matches
+
+    def query(self, text: str) -> List[Tuple[Hashable, float]]:
+        """(key, similarity) of the indexed near-duplicates of text."""
+        return self.query_signature(self.signature(text))
+
+    def add_signature(
+        self, signature: Optional[bytes], key: Optional[Hashable] = None
+    ) -> Hashable:
+        """Index a signature under key (the next position by default)."""
+        if key is None:
+            key = self._next_key
+        self._next_key += 1
+        if signature is None:
+            return key
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+        if self.max_entries is not None:
+            while len(self._signatures) > self.max_entries:
+                self.remove(next(iter(self._signatures)))
+        return key
+
+    def add(self, text: str, key: Optional[Hashable] = None) -> Hashable:
+        """Index text under key (the next position by default)."""
+        return self.add_signature(self.signature(text), key)
+
+    def remove(self, key: Hashable) -> None:
+        signature = self._signatures.pop(key)
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band][band_key]
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band][band_key]
+
+    def _check_signature(
+        self, signature: Optional[bytes], key: Optional[Hashable]
+    ) -> Optional[Hashable]:
+        matches = self.query_signature(signature)
+        if matches:
+            original = matches[0][0]
+            # Still active: keep it over older texts
+            self._signatures.move_to_end(original)
+            self._next_key += 1
+            return original
+        self.add_signature(signature, key)
+        return None
+
+    def check(self, text: str, key: Optional[Hashable] = None) -> Optional[Hashable]:
+        """
+        The key of the most similar indexed near-duplicate of text, or None
+        after indexing text under key (the next position by default).
+        """
+        return self._check_signature(self.signature(text), key)
+
+    def flag(
+        self, texts: Iterable[str], batch_size: int = 256
+    ) -> Iterator[Tuple[str, Optional[Hashable]]]:
+        """
+        (text, check(text)) for every text, in order: the key of the
+        near-duplicate seen before, or None for a new text.
+        """
+        texts = iter(texts)
+        while True:
+            batch = list(itertools.islice(texts, batch_size))
+            if not batch:
+                return
+            for text, signature in zip(batch, self.signatures(batch)):
+                yield text, self._check_signature(signature, None)
+
+    def filter(self, texts: Iterable[str], batch_size: int = 256) -> Iterator[str]:
+        """The texts that are not near-duplicates of a text seen before."""
+        for text, original in self.flag(texts, batch_size):
+            if original is None:
+                yield text
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._signatures
+
+    def __repr__(self) -> str:
+        return "{}(threshold={}, num_perm={}, entries={})".format(
+            self.__class__.__name__, self.threshold, self.num_perm, len(self)
+        )
@@ -0,0 +1,204 @@
+"""
+Emoji matching with a prefix trie over emoji.EMOJI_DATA.
+
+A match is the same as with one alternation of every emoji sorted
+longest first: scanning from the left, the longest emoji starting at a
+position wins. Candidate positions are found with a character class of
+the emojis' first code points, so text without emoji is one regex scan.
+"""
+import json
+import logging
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from th_preprocessor import bundle
+from th_preprocessor.bundle import CACHE_DIR_ENV
+
+_END = ""  # trie key marking the end of an emoji
+
+logger = logging.getLogger(__name__)
+
+
+def _char_class(chars: Iterable[str]) -> str:
+    code_points = sorted({ord(c) for c in chars})
+    ranges = []
+    start = end = code_points[0]
+    for code_point in code_points[1:]:
+        if code_point != end + 1:
+            ranges.append((start, end))
+            start = code_point
+        end = code_point
+    ranges.append((start, end))
+    # Python's re is much faster with ranges than with a long list of
+    # astral code points
+    return "[{}]".format(
+        "".join(
+            re.escape(chr(start))
+            if start == end
+            else "{}-{}".format(re.escape(chr(start)), re.escape(chr(end)))
+            for start, end in ranges
+        )
+    )
+
+
+class EmojiMatcher:
+    def __init__(self, emojis: Iterable[str]):
+        trie: Dict[str, dict] = {}
+        for emoji_str in emojis:
+            node = trie
+            for char in emoji_str:
+                node = node.setdefault(char, {})
+            node[_END] = {}
+        self._set_trie(trie)
+
+    @classmethod
+    def from_trie(cls, trie: Dict[str, dict]) -> "EmojiMatcher":
+        """The matcher for a trie as built by another matcher (.trie)."""
+        matcher = cls.__new__(cls)
+        matcher._set_trie(trie)
+        return matcher
+
+    def _set_trie(self, trie: Dict[str, dict]) -> None:
+        self.trie = trie
+        self._candidate = re.compile(_char_class(trie)).search
+
+    def _lengths(self, text: str, start: int) -> List[int]:
+        # Lengths of every emoji starting at text[start], shortest first
+        lengths = []
+        node = self.trie
+        for end in range(start, len(text)):
+            node = node.get(text[end])
+            if node is None:
+                break
+            if _END in node:
+                lengths.append(end + 1 - start)
+        return lengths
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) of every emoji, like RE_EMOJI.finditer."""
+        pos = 0
+        while True:
+            candidate = self._candidate(text, pos)
+            if candidate is None:
+                return
+            start = candidate.start()
+            lengths = self._lengths(text, start)
+            if not lengths:
+                pos = start + 1
+                continue
+            pos = start + lengths[-1]
+            yield start, pos
+
+    def sub(self, repl: Union[str, Callable[[str], str]], text: str) -> str:
+        """Replace every emoji with repl (or repl(emoji)), like RE_EMOJI.sub."""
+        if self._candidate(text) is None:
+            return text
+        chunks = []
+        last = 0
+        for start, end in self.finditer(text):
+            chunks.append(text[last:start])
+            chunks.append(repl if isinstance(repl, str) else repl(text[start:end]))
+            last = end
+        if not chunks:
+            return text
+        chunks.append(text[last:])
+        return "".join(chunks)
+
+    def iter_dups(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, emoji) of every run of an emoji repeated back to
+        back, like RE_DUP_EMOJIS.finditer. A shorter emoji is tried when the
+        longest one at a position is not repeated.
+        """
+        pos = 0
+        while True:
+            candidate = self._candidate(text, pos)
+            if candidate is None:
+                return
+            start = candidate.start()
+            pos = start + 1
+            for length in reversed(self._lengths(text, start)):
+                emoji_str = text[start : start + length]
+                end = start + length
+                if not text.startswith(emoji_str, end):
+                    continue
+                while text.startswith(emoji_str, end):
+                    end += length
+                yield start, end, emoji_str
+                pos = end
+                break
+
+    def replace_dups(self, text: str) -> str:
+        """Collapse an emoji repeated back to back into one."""
+        chunks = []
+        last = 0
+        for start, end, emoji_str in self.iter_dups(text):
+            chunks.append(text[last:start])
+            chunks.append(emoji_str)
+            last = end
+        if not chunks:
+            return text
+        chunks.append(text[last:])
+        return "".join(chunks)
+
+    def save(self, path: str) -> None:
+        """Write the trie to path as JSON."""
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with open(tmp_path, "w", encoding="ascii") as f:
+            json.dump(self.trie, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EmojiMatcher":
+        """The matcher for a trie written by save()."""
+        with open(path, encoding="ascii") as f:
+            trie = json.load(f)
+        if not isinstance(trie, dict) or not trie:
+            raise ValueError("{} does not contain an emoji trie".format(path))
+        return cls.from_trie(trie)
+
+    def __getstate__(self):
+        return {"trie": self.trie}
+
+    def __setstate__(self, state):
+        self._set_trie(state["trie"])
+
+
+_MATCHER: Optional[EmojiMatcher] = None
+
+
+def get_emoji_matcher() -> EmojiMatcher:
+    """
+    Build the matcher for every emoji in the installed emoji package on
+    first use. With TH_PREPROCESSOR_CACHE_DIR set, its trie is kept there,
+    one file per emoji package version, unless it is in the bundle (see
+    th_preprocessor.bundle).
+    """
+    global _MATCHER
+    if _MATCHER is None:
+        trie = bundle.load(("EmojiMatcher",), lambda: _build_emoji_matcher().trie)
+        _MATCHER = EmojiMatcher.from_trie(trie)
+    return _MATCHER
+
+
+def _build_emoji_matcher() -> EmojiMatcher:
+    import emoji
+
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, "emoji-trie-{}.json".format(emoji.__version__))
+        if os.path.exists(path):
+            try:
+                return EmojiMatcher.load(path)
+            except (OSError, ValueError) as e:
+                logger.warning("Rebuilding unreadable emoji trie %s: %r", path, e)
+    matcher = EmojiMatcher(emoji.EMOJI_DATA)
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            matcher.save(path)
+        except OSError as e:
+            logger.warning("Could not keep the emoji trie in %s: %r", path, e)
+    return matcher
@@ -0,0 +1,282 @@
+"""
+Hash preprocessed words and their character n-grams into sparse feature
+rows, for linear models on millions of posts without a vocabulary:
+
+    from th_preprocessor.features import HashingVectorizer
+
+    vectorizer = HashingVectorizer(word_ngrams=(1, 2), char_ngrams=(2, 4))
+    rows = vectorizer.transform(texts)  # any iterable, read once
+    X = rows.to_scipy()  # scipy.sparse.csr_matrix, if scipy is installed
+
+Texts are preprocessed with Preprocessor.tokens() (stopwords dropped in
+the same pass) and the rows go straight into the CSR arrays (indptr,
+indices, data as array.array), so memory is the size of the features.
+Every distinct word is hashed once per cache_size words: its character
+n-grams are kept with it, and word n-grams combine the hashes of their
+words instead of joining the words.
+
+Placeholders (WSLINK, WSNUMBER, ...) are features as whole words; they
+have no character n-grams. Features are the same in every process and on
+every platform.
+"""
+import collections
+import hashlib
+import itertools
+import math
+from array import array
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from th_preprocessor.preprocess import (
+    _DEFAULT_PREPROCESSOR,
+    REPLACE_AT_MENTION,
+    REPLACE_DATE,
+    REPLACE_EMAIL,
+    REPLACE_FILENAME,
+    REPLACE_HAHA,
+    REPLACE_LINK,
+    REPLACE_NUMBER,
+    REPLACE_PHONE,
+    Preprocessor,
+    preprocess,
+)
+from th_preprocessor.stopwords import StopwordFilter
+
+# Placeholder words when the texts are preprocessed elsewhere
+PLACEHOLDERS = frozenset(
+    placeholder.strip()
+    for placeholder in (
+        REPLACE_LINK,
+        REPLACE_FILENAME,
+        REPLACE_EMAIL,
+        REPLACE_AT_MENTION,
+        REPLACE_HAHA,
+        REPLACE_NUMBER,
+        REPLACE_PHONE,
+        REPLACE_DATE,
+    )
+)
+
+NORMS = (None, "l1", "l2")
+
+_MASK = (1 << 64) - 1
+
+
+def hash_word(word: str) -> int:
+    """The 64-bit hash of a word."""
+    data = word.encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def hash_chars(gram: str) -> int:
+    """The 64-bit hash of a character n-gram, apart from any word's."""
+    data = gram.encode("utf-8", "surrogatepass")
+    digest = hashlib.blake2b(data, digest_size=8, person=b"chars").digest()
+    return int.from_bytes(digest, "little")
+
+
+def combine_hashes(hashes: Sequence[int]) -> int:
+    """The 64-bit hash of a word n-gram, from hash_word() of its words."""
+    combined = len(hashes)
+    for value in hashes:
+        # splitmix64's finalizer: every bit changes half the bits of the result
+        combined = ((combined * 0x100000001B3) ^ value) & _MASK
+        combined = ((combined ^ (combined >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        combined = ((combined ^ (combined >> 27)) * 0x94D049BB133111EB) & _MASK
+        combined ^= combined >> 31
+    return combined
+
+
+class SparseRows:
+    """
+    Feature rows in CSR form: the features of row i are at
+    indices[indptr[i]:indptr[i + 1]] with values at the same place in data.
+    """
+
+    def __init__(self, n_features: int):
+        self.n_features = n_features
+        self.indptr = array("q", [0])
+        self.indices = array("i")
+        self.data = array("f")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self), self.n_features
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def append(self, features: Dict[int, float]) -> None:
+        """Add a row from {index: value}."""
+        indices = sorted(features)
+        self.indices.extend(indices)
+        self.data.extend(map(features.__getitem__, indices))
+        self.indptr.append(len(self.indices))
+
+    def row(self, i: int) -> Dict[int, float]:
+        """Row i as {index: value}."""
+        if not -len(self) <= i < len(self):
+            raise IndexError("row index out of range")
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return dict(zip(self.indices[start:end], self.data[start:end]))
+
+    def to_scipy(self):
+        """A scipy.sparse.csr_matrix sharing nothing with these rows."""
+        from scipy.sparse import csr_matrix
+
+        return csr_matrix(
+            (self.data, self.indices, self.indptr), shape=self.shape, copy=True
+        )
+
+    def __repr__(self) -> str:
+        return "{}(shape={}, nnz={})".format(
+            self.__class__.__name__, self.shape, len(self.indices)
+        )
+
+
+class HashingVectorizer:
+    """
+    Word n-grams (word_ngrams, None for none) and character n-grams of
+    every word (char_ngrams, None for none; the word has a space on both
+    sides, so n-grams at its ends are told apart) hashed into n_features
+    columns.
+
+    preprocessor is preprocess() by default, a Preprocessor, another
+    function of a text, or None for texts that are already preprocessed.
+    stopwords is a StopwordFilter, True for StopwordFilter() (THAI_STOPWORDS)
+    or False. With alternate_sign, half the features count -1 so that
+    collisions cancel out on average. Rows are scaled to norm 1 ("l1",
+    "l2") or kept as counts (None).
+    """
+
+    def __init__(
+        self,
+        n_features: int = 2**20,
+        word_ngrams: Optional[Tuple[int, int]] = (1, 1),
+        char_ngrams: Optional[Tuple[int, int]] = None,
+        preprocessor: Optional[Callable[[str], str]] = preprocess,
+        stopwords: Union[StopwordFilter, bool] = False,
+        alternate_sign: bool = True,
+        norm: Optional[str] = "l2",
+        cache_size: int = 2**18,
+    ):
+        if not 0 < n_features < 2**31:
+            raise ValueError("n_features must be between 1 and 2 ** 31 - 1")
+        ngram_ranges = {"word_ngrams": word_ngrams, "char_ngrams": char_ngrams}
+        for name, ngrams in ngram_ranges.items():
+            if ngrams is not None and not 1 <= ngrams[0] <= ngrams[1]:
+                raise ValueError(
+                    "{} must be (min_n, max_n) with 1 <= min_n <= max_n".format(name)
+                )
+        if norm not in NORMS:
+            raise ValueError("norm must be one of {}, not {!r}".format(NORMS, norm))
+        self.n_features = n_features
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = char_ngrams
+        self.preprocessor = preprocessor
+        if stopwords is True:
+            stopwords = StopwordFilter()
+        self.stopwords = stopwords or None
+        self.alternate_sign = alternate_sign
+        self.norm = norm
+        self.cache_size = cache_size
+
+        if preprocessor is preprocess:
+            preprocessor = _DEFAULT_PREPROCESSOR
+        if isinstance(preprocessor, Preprocessor):
+            self._placeholders = frozenset(preprocessor._placeholders)
+        else:
+            self._placeholders = PLACEHOLDERS
+        self._preprocessor = preprocessor
+        # word -> (hash_word(word), feature keys of the word on its own)
+        self._words: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+
+    def _tokens(self, text: str):
+        preprocessor = self._preprocessor
+        if isinstance(preprocessor, Preprocessor):
+            return preprocessor.tokens(text, self.stopwords)
+        tokens = (preprocessor(text) if preprocessor else text).split()
+        if self.stopwords is not None:
+            return self.stopwords.filter(tokens)
+        return tokens
+
+    def _key(self, value: int) -> int:
+        # A column, or ~column for the features that count -1
+        index = value % self.n_features
+        if self.alternate_sign and value >> 63:
+            return ~index
+        return index
+
+    def _word(self, word: str) -> Tuple[int, Tuple[int, ...]]:
+        word_hash = hash_word(word)
+        keys = []
+        if self.word_ngrams is not None and self.word_ngrams[0] == 1:
+            keys.append(self._key(combine_hashes((word_hash,))))
+        if self.char_ngrams is not None and word not in self._placeholders:
+            padded = " {} ".format(word)
+            low, high = self.char_ngrams
+            for n in range(low, min(high, len(padded)) + 1):
+                for i in range(len(padded) - n + 1):
+                    keys.append(self._key(hash_chars(padded[i : i + n])))
+        entry = word_hash, tuple(keys)
+        if len(self._words) >= self.cache_size:
+            self._words.clear()
+        self._words[word] = entry
+        return entry
+
+    def _features(self, text: str) -> Dict[int, float]:
+        words = self._words
+        entries = [
+            words.get(token) or self._word(token) for token in self._tokens(text)
+        ]
+        counts = collections.Counter(
+            itertools.chain.from_iterable(keys for _, keys in entries)
+        )
+        if self.word_ngrams is not None:
+            low, high = self.word_ngrams
+            hashes = [word_hash for word_hash, _ in entries]
+            for n in range(max(low, 2), high + 1):
+                counts.update(
+                    self._key(combine_hashes(hashes[i : i + n]))
+                    for i in range(len(hashes) - n + 1)
+                )
+        features: Dict[int, float] = {}
+        for key, count in counts.items():
+            if key < 0:
+                key, count = ~key, -count
+            features[key] = features.get(key, 0) + count
+        if len(features) < len(counts):
+            # Features of opposite signs in one column may have cancelled out
+            features = {key: value for key, value in features.items() if value}
+        if self.norm is not None:
+            if self.norm == "l2":
+                total = math.sqrt(sum(value * value for value in features.values()))
+            else:
+                total = sum(abs(value) for value in features.values())
+            if total:
+                features = {key: value / total for key, value in features.items()}
+        return features
+
+    def transform_one(self, text: str) -> Dict[int, float]:
+        """The features of one text as {column: value}."""
+        return self._features(text)
+
+    def transform(self, texts: Iterable[str]) -> SparseRows:
+        """The features of every text, one row each, read as a stream."""
+        rows = SparseRows(self.n_features)
+        for text in texts:
+            rows.append(self._features(text))
+        return rows
+
+    def __repr__(self) -> str:
+        return (
+            "{}(n_features={}, word_ngrams={}, char_ngrams={}, stopwords={}, "
+            "alternate_sign={}, norm={!r})"
+        ).format(
+            self.__class__.__name__,
+            self.n_features,
+            self.word_ngrams,
+            self.char_ngrams,
+            self.stopwords is not None,
+            self.alternate_sign,
+            self.norm,
+        )
@@ -1,11 +1,26 @@
+import calendar
+import functools
 import html
+import itertools
+import json
 import re
+import sys
+import time
 import unicodedata
-from datetime import datetime
-from typing import Iterable, List, Set, Tuple, Union
-
-import emoji
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+from th_preprocessor import bundle
 from th_preprocessor.data import (
     ACCENTED_PAIRS,
     THAI_NORMALIZE_PAIRS,
@@ -13,6 +28,9 @@ from th_preprocessor.data import (
     THAI_TO_ARABIC_DIGIT_PAIRS,
     TOKENIZE_PAIRS,
 )
+from th_preprocessor.emoji_matcher import get_emoji_matcher
+from th_preprocessor.profiling import StageProfiler
+from th_preprocessor.stopwords import StopwordFilter
 
 COMBINED_NORMALIZE_PAIRS = (
     THAI_NORMALIZE_PAIRS + THAI_TO_ARABIC_DIGIT_PAIRS + TOKENIZE_PAIRS
@@ -30,10 +48,24 @@ REPLACE_PHONE = " WSPHONE "
 REPLACE_DATE = " WSDATE "
 
 # Check word class
-RE_NUM = re.compile(r"[+\-]?(?:[0-9๑๒๓๔๕๖๗๘๙๐]+,?)+(?:\.[0-9๑๒๓๔๕๖๗๘๙๐]*)?")
+# Same matches as r"[+\-]?(?:[0-9๑๒๓๔๕๖๗๘๙๐]+,?)+(?:\.[0-9๑๒๓๔๕๖๗๘๙๐]*)?", whose
+# nested repetition takes exponential time to fail a fullmatch ("1" * 30 + "x")
+RE_NUM = re.compile(
+    r"[+\-]?[0-9๑๒๓๔๕๖๗๘๙๐]+(?:,[0-9๑๒๓๔๕๖๗๘๙๐]+)*,?(?:\.[0-9๑๒๓๔๕๖๗๘๙๐]*)?"
+)
 RE_NUM2 = re.compile(r"[+\-]?(?:[0-9๑๒๓๔๕๖๗๘๙๐]+,?){2,}(?:\.[0-9๑๒๓๔๕๖๗๘๙๐]*)?")
 RE_THAI = re.compile(r"[\u0E00-\u0E7F0-9\s]+")
 RE_LATIN = re.compile(r"[a-zA-Z0-9\s]+")
+# The patterns datetime.strptime() builds for "%Y-%m-%d" and "%Y-%m-%d
+# %H:%M:%S" (\d is any Unicode digit there too); the ranges that depend on
+# each other (the days of a month) are checked after a match
+RE_DATE_STR = re.compile(
+    r"(\d{4})-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+)
+RE_DATETIME_STR = re.compile(
+    RE_DATE_STR.pattern + r"\s+(2[0-3]|[01]\d|\d):([0-5]\d|\d):(6[01]|[0-5]\d|\d)"
+)
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 
 # <tag>, http://, www., .php, @mention, mail@address.com, hahaha, 555, 1234
 # To be normalized
@@ -52,14 +84,16 @@ RE_HAHA = re.compile(r"\b(?:ha\s*){2,}|\u0E16{3,}|5{3,}(?!.\d)\b", flags=re.IGNO
 RE_HASHTAGS = re.compile(r"#[^\s]+")
 
 # Phone numbers
+# A separator is written \s*(?:[.-]\s*)? rather than \s*[.-]?\s*: same matches,
+# but a long run of spaces does not split between the two \s* in every way
 phone_body_patterns = [
-    r"\b[0๐]\s*[.-]?\s*[0-9๐-๙]{4}\s*[.-]?\s*[0-9๐-๙]{4}\b",  # 0-1234-5678
-    r"\b[0๐][0-9๐-๙]{2}\s*[.-]?\s*[0-9๐-๙]{3}\s*[.-]?\s*[0-9๐-๙]{3,4}\b",  # 012-345-678
-    r"\b[0๐]\s*[.-]?\s*[0-9๐-๙]{3}\s*[.-]?\s*[0-9๐-๙]{3}\s*[.-]?\s*[0-9๐-๙]{3,4}\b",  # 0-123-456-789
-    r"\b[0๐][0-9๐-๙]\s*[.-]?\s*[0-9๐-๙]{4}\s*[.-]?\s*[0-9๐-๙]{4}\b",  # 01-2345-6789
+    r"\b[0๐]\s*(?:[.-]\s*)?[0-9๐-๙]{4}\s*(?:[.-]\s*)?[0-9๐-๙]{4}\b",  # 0-1234-5678
+    r"\b[0๐][0-9๐-๙]{2}\s*(?:[.-]\s*)?[0-9๐-๙]{3}\s*(?:[.-]\s*)?[0-9๐-๙]{3,4}\b",  # 012-345-678
+    r"\b[0๐]\s*(?:[.-]\s*)?[0-9๐-๙]{3}\s*(?:[.-]\s*)?[0-9๐-๙]{3}\s*(?:[.-]\s*)?[0-9๐-๙]{3,4}\b",  # 0-123-456-789
+    r"\b[0๐][0-9๐-๙]\s*(?:[.-]\s*)?[0-9๐-๙]{4}\s*(?:[.-]\s*)?[0-9๐-๙]{4}\b",  # 01-2345-6789
     r"\b[0๐][0-9๐-๙]{9}\b",  # 0123456789
-    r"\b[01๐๑]\s*[.-]?\s*[8๘][0-9๐-๙]{2}\s*[.-]?\s*[0-9๐-๙]{3,4}\s*[.-]?\s*[0-9๐-๙]{3,4}\b",  # 1-800-123-4567
-    r"\b\([0-9๐-๙]{2,3}\)\s*[.-]?\s*[0-9๐-๙]{3,4}\s*[.-]?\s*[0-9๐-๙]{3,4}\b",  # (01) 234 5678
+    r"\b[01๐๑]\s*(?:[.-]\s*)?[8๘][0-9๐-๙]{2}\s*(?:[.-]\s*)?[0-9๐-๙]{3,4}\s*(?:[.-]\s*)?[0-9๐-๙]{3,4}\b",  # 1-800-123-4567
+    r"\b\([0-9๐-๙]{2,3}\)\s*(?:[.-]\s*)?[0-9๐-๙]{3,4}\s*(?:[.-]\s*)?[0-9๐-๙]{3,4}\b",  # (01) 234 5678
 ]
 phone_area_patterns = [
     r"(\+[0-9๐-๙]{2,3}\s?)?",  # +66
@@ -76,10 +110,161 @@ phone_regex = (
 )
 RE_PHONE = re.compile(phone_regex)
 
+# Dates and times: ISO (2019-01-03, 2019-01-03T04:00:00+07:00), day first
+# (3/1/2562, 03-01-19, 3.1.2019), Thai months (3 ม.ค. 62, 3 มกราคม พ.ศ. 2562,
+# มกราคม 2562) and times (04:00, 04:00:59, 4.00 น.), in Thai digits too.
+# No whitespace inside a match is between two words of letters (see chunked).
+_D = "[0-9๐-๙]"
+_DAY = "(?:[12๑๒][0-9๐-๙]|[3๓][01๐๑]|[0๐]?[1-9๑-๙])"
+_MONTH = "(?:[1๑][0-2๐-๒]|[0๐]?[1-9๑-๙])"
+_YEAR = "(?:{0}{{4}}|{0}{{2}})".format(_D)
+_HOUR = "(?:[2๒][0-3๐-๓]|[01๐๑]?[0-9๐-๙])"
+_MINUTE = "[0-5๐-๕][0-9๐-๙]"
+_THAI_MONTHS = (
+    "มกราคม|กุมภาพันธ์|มีนาคม|เมษายน|พฤษภาคม|มิถุนายน|กรกฎาคม|กรกฏาคม|สิงหาคม"
+    "|กันยายน|ตุลาคม|พฤศจิกายน|ธันวาคม"
+)
+_THAI_SHORT_MONTHS = (
+    r"(?:ม\.ค|ก\.พ|มี\.ค|เม\.ย|พ\.ค|มิ\.ย|ก\.ค|ส\.ค|ก\.ย|ต\.ค|พ\.ย|ธ\.ค)\.?"
+)
+_ERA = r"(?:[พค]\.\s?ศ\.?\s*)?"  # พ.ศ. (Buddhist era), ค.ศ.
+date_patterns = [
+    r"{D}{{4}}-{M}-{d}|{D}{{4}}/{M}/{d}",  # 2019-01-03
+    r"{d}/{M}/{Y}|{d}-{M}-{Y}|{d}\.{M}\.{D}{{4}}",  # 3/1/2562
+    r"{d}\s*(?:{months}|{short})(?:\s*{era}{Y})?",  # 3 ม.ค. 62
+    r"(?:{months})\s*{era}{D}{{4}}",  # มกราคม 2562
+]
+time_pattern = (
+    r"{H}:{m}(?::{m}(?:\.{D}+)?)?(?:[Zz](?![a-zA-Z])|[+-]{H}:?{m})?"
+    r"(?:\s*น(?:\.|าฬิกา))?"
+    r"|{H}\.{m}\s*น(?:\.|าฬิกา)"
+)
+# Every match starts with a digit or a month: looking ahead for one first
+# fails most positions before trying every alternative there
+_DATE_FIRST = "(?=[0-9๐-๙{}])".format(
+    "".join(sorted({month[0] for month in _THAI_MONTHS.split("|")}))
+)
+date_regex = (
+    _DATE_FIRST
+    + r"(?<![0-9๐-๙.,:/-])(?:(?:"
+    + "|".join(date_patterns)
+    + r")(?:(?:[Tt]|,?\s+)(?:"
+    + time_pattern
+    + r"))?|"
+    + time_pattern
+    + r")(?![0-9๐-๙]|[.,:/-][0-9๐-๙])"
+).format(
+    D=_D,
+    d=_DAY,
+    M=_MONTH,
+    Y=_YEAR,
+    H=_HOUR,
+    m=_MINUTE,
+    months=_THAI_MONTHS,
+    short=_THAI_SHORT_MONTHS,
+    era=_ERA,
+)
+RE_DATE = re.compile(date_regex)
+
+
+class GuardedPattern:
+    """
+    Same matches as pattern.sub/subn/finditer, in linear time for patterns
+    like RE_LINK where a greedy character class is followed by something
+    that must come right after it (a TLD, "@", a file extension).
+
+    Every match attempt inside one run of the class then scans to the end
+    of the run and succeeds or fails regardless of where in the run it
+    started. The regex engine still retries from every position of the run,
+    which is quadratic in the run length ("a.a.a.a..." takes seconds for
+    RE_LINK). Here a match is only attempted where start matches, and after
+    a failed attempt the rest of the run (match of run) is skipped.
+    Text without the required character (if given) is not scanned at all.
+    """
+
+    def __init__(self, pattern: re.Pattern, start: str, run: str, required: str = ""):
+        self.pattern = pattern
+        self.required = required
+        self._start = re.compile(start, pattern.flags).search
+        self._run = re.compile(run, pattern.flags).match
+
+    def finditer(self, text: str) -> Iterator[re.Match]:
+        if self.required not in text:
+            return
+        match = self.pattern.match
+        pos = 0
+        while True:
+            start = self._start(text, pos)
+            if start is None:
+                return
+            pos = start.start()
+            matched = match(text, pos)
+            if matched is not None:
+                yield matched
+                pos = matched.end()
+                continue
+            run = self._run(text, pos)
+            pos = run.end() if run is not None and run.end() > pos else pos + 1
+
+    def subn(self, repl: str, text: str) -> Tuple[str, int]:
+        chunks = []
+        last = 0
+        # Backslash escapes and group references, as in pattern.sub
+        expand = "\\" in repl
+        for matched in self.finditer(text):
+            chunks.append(text[last : matched.start()])
+            chunks.append(matched.expand(repl) if expand else repl)
+            last = matched.end()
+        if not chunks:
+            return text, 0
+        chunks.append(text[last:])
+        return "".join(chunks), len(chunks) // 2
+
+    def sub(self, repl: str, text: str) -> str:
+        return self.subn(repl, text)[0]
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (
+                self.pattern,
+                self._start.__self__.pattern,
+                self._run.__self__.pattern,
+                self.required,
+            ),
+        )
+
+
+_LINK_CHARS = r"[a-zA-Z0-9ก-๛\.\/\?\:\-_=#]"
+GUARDED_LINK = GuardedPattern(
+    RE_LINK,
+    start=r"((http|https)\:\/\/)?(?<![@\.])(?<=\b)" + _LINK_CHARS,
+    run=_LINK_CHARS + "+",
+    required=".",
+)
+GUARDED_EMAIL = GuardedPattern(
+    RE_EMAIL,
+    start=r"\b[a-zA-Z0-9._%+-]",
+    run=r"[a-zA-Z0-9._%+-]+",
+    required="@",
+)
+# Only the first character of a run of \w can start a match: a match ends on
+# a word boundary, so the next one never starts inside a run
+GUARDED_FILENAME = GuardedPattern(
+    RE_FILENAME, start=r"(?<!\w)\w+\.", run=r"\w+", required="."
+)
+# "5" only matches the last branch and "\u0E16" the second one
+GUARDED_HAHA = GuardedPattern(RE_HAHA, start=r"\bh|\u0E16|5", run=r"5+|\u0E16+")
+# A "<" that is not closed ("<3") fails after scanning to the end of the
+# text, and so does every "<" after it: the scan is only done once
+GUARDED_TAG = GuardedPattern(RE_TAG, start=r"<", run=r"<[^>]*", required=">")
+
 # Duplicated whitespaces: spaces, tabs, empty lines, leading/trailing spaces
 RE_DUP_SPACE = re.compile(r"[\t ]{2,}")
 RE_DUP_EMPTYLINE = re.compile(r"[\t ]*\n([\t ]*\n)*")
 RE_STRIP = re.compile(r"(?:(?<=\n)[\t ]+)|(?:[\t ]+(?=\n))")
+# What the three above leave of spaces, tabs and newlines around a newline
+RE_NEWLINE_RUN = re.compile(r"[\t ]*\n[\t \n]*")
 
 # Adjacent characters in different class
 RE_DIGIT_NONDIGIT = re.compile(r"([\d\.,])(\D)")  # (Digit)(Non-Digit)
@@ -93,75 +278,283 @@ RE_NONTHAI_THAI = re.compile(
 RE_LATIN_NONLATIN = re.compile(r"([a-zA-Z])([^a-zA-Z\s])")  # (Latin)(Non-Latin)
 RE_NONLATIN_LATIN = re.compile(r"([^a-zA-Z\s])([a-zA-Z])")  # (Non-Latin)(Latin)
 
+# insert_spaces does the six substitutions above in two scans. The two digit
+# passes only interact inside a run of [\d\.,] ("1.,a" -> "1 ., a"), which
+# _space_number_run spaces as they would. The four class passes put exactly
+# one space between two non-space characters of different classes (Thai,
+# Latin, other) that are still next to each other: one zero-width regex.
+RE_NUMBER_RUN = re.compile(r"[\d\.,]+")
+RE_CLASS_BOUNDARY = re.compile(
+    r"(?<=[\u0E00-\u0E4F])(?=[^\u0E00-\u0E4F\s])"
+    r"|(?<=[^\u0E00-\u0E4F\s])(?=[\u0E00-\u0E4F])"
+    r"|(?<=[a-zA-Z])(?=[^a-zA-Z\s])"
+    r"|(?<=[^a-zA-Z\s])(?=[a-zA-Z])"
+)
+# The words left after RE_CLASS_BOUNDARY.sub(" ", text).split(): runs of Thai,
+# of Latin letters and of anything else that is not a space
+RE_CLASS_RUN = re.compile(r"[\u0E00-\u0E4F]+|[a-zA-Z]+|[^\u0E00-\u0E4Fa-zA-Z\s]+")
 
-RE_EMOJI = re.compile(
-    "("
-    + "|".join(re.escape(u) for u in sorted(emoji.EMOJI_DATA, key=len, reverse=True))
-    + ")"
-)  # use pre-complied pattern from emoji library
+# Anything but Thai, English letters, "!?" and the characters that emojis are
+# made of (digits, space, "#" and "*" are in keycaps), and quotes around words
 RE_NONTHAI_ENG_EMOJI = re.compile(
-    r"[^\u0E00-\u0E7Fa-zA-Z!?👨\u200d❤️\u200d💋\u200d👨|👩\u200d❤️\u200d💋\u200d👨|👩\u200d❤️\u200d💋\u200d👩|🏴\U000e0067\U000e0062\U000e0065\U000e006e\U000e0067\U000e007f|🏴\U000e0067\U000e0062\U000e0073\U000e0063\U000e0074\U000e007f|🏴\U000e0067\U000e0062\U000e0077\U000e006c\U000e0073\U000e007f|👨\u200d👨\u200d👦\u200d👦|👨\u200d👨\u200d👧\u200d👦|👨\u200d👨\u200d👧\u200d👧|👨\u200d👩\u200d👦\u200d👦|👨\u200d👩\u200d👧\u200d👦|👨\u200d👩\u200d👧\u200d👧|👩\u200d👩\u200d👦\u200d👦|👩\u200d👩\u200d👧\u200d👦|👩\u200d👩\u200d👧\u200d👧|👨\u200d❤️\u200d👨|👩\u200d❤️\u200d👨|👩\u200d❤️\u200d👩|👱🏿\u200d♂️|👱🏻\u200d♂️|👱🏾\u200d♂️|👱🏼\u200d♂️|👱🏽\u200d♂️|👱🏿\u200d♀️|👱🏻\u200d♀️|👱🏾\u200d♀️|👱🏼\u200d♀️|👱🏽\u200d♀️|👁️\u200d🗨️|👨\u200d👦\u200d👦|👨\u200d👧\u200d👦|👨\u200d👧\u200d👧|👨\u200d👨\u200d👦|👨\u200d👨\u200d👧|👨\u200d👩\u200d👦|👨\u200d👩\u200d👧|👩\u200d👦\u200d👦|👩\u200d👧\u200d👦|👩\u200d👧\u200d👧|👩\u200d👩\u200d👦|👩\u200d👩\u200d👧|🚴🏿\u200d♂️|🚴🏻\u200d♂️|🚴🏾\u200d♂️|🚴🏼\u200d♂️|🚴🏽\u200d♂️|⛹️\u200d♂️|⛹🏿\u200d♂️|⛹🏻\u200d♂️|⛹🏾\u200d♂️|⛹🏼\u200d♂️|⛹🏽\u200d♂️|🙇🏿\u200d♂️|🙇🏻\u200d♂️|🙇🏾\u200d♂️|🙇🏼\u200d♂️|🙇🏽\u200d♂️|🤸🏿\u200d♂️|🤸🏻\u200d♂️|🤸🏾\u200d♂️|🤸🏼\u200d♂️|🤸🏽\u200d♂️|🧗🏿\u200d♂️|🧗🏻\u200d♂️|🧗🏾\u200d♂️|🧗🏼\u200d♂️|🧗🏽\u200d♂️|👷🏿\u200d♂️|👷🏻\u200d♂️|👷🏾\u200d♂️|👷🏼\u200d♂️|👷🏽\u200d♂️|🕵️\u200d♂️|🕵🏿\u200d♂️|🕵🏻\u200d♂️|🕵🏾\u200d♂️|🕵🏼\u200d♂️|🕵🏽\u200d♂️|🧝🏿\u200d♂️|🧝🏻\u200d♂️|🧝🏾\u200d♂️|🧝🏼\u200d♂️|🧝🏽\u200d♂️|🤦🏿\u200d♂️|🤦🏻\u200d♂️|🤦🏾\u200d♂️|🤦🏼\u200d♂️|🤦🏽\u200d♂️|🧚🏿\u200d♂️|🧚🏻\u200d♂️|🧚🏾\u200d♂️|🧚🏼\u200d♂️|🧚🏽\u200d♂️|🙍🏿\u200d♂️|🙍🏻\u200d♂️|🙍🏾\u200d♂️|🙍🏼\u200d♂️|🙍🏽\u200d♂️|🙅🏿\u200d♂️|🙅🏻\u200d♂️|🙅🏾\u200d♂️|🙅🏼\u200d♂️|🙅🏽\u200d♂️|🙆🏿\u200d♂️|🙆🏻\u200d♂️|🙆🏾\u200d♂️|🙆🏼\u200d♂️|🙆🏽\u200d♂️|💇🏿\u200d♂️|💇🏻\u200d♂️|💇🏾\u200d♂️|💇🏼\u200d♂️|💇🏽\u200d♂️|💆🏿\u200d♂️|💆🏻\u200d♂️|💆🏾\u200d♂️|💆🏼\u200d♂️|💆🏽\u200d♂️|🏌️\u200d♂️|🏌🏿\u200d♂️|🏌🏻\u200d♂️|🏌🏾\u200d♂️|🏌🏼\u200d♂️|🏌🏽\u200d♂️|💂🏿\u200d♂️|💂🏻\u200d♂️|💂🏾\u200d♂️|💂🏼\u200d♂️|💂🏽\u200d♂️|👨🏿\u200d⚕️|👨🏻\u200d⚕️|👨🏾\u200d⚕️|👨🏼\u200d⚕️|👨🏽\u200d⚕️|🧘🏿\u200d♂️|🧘🏻\u200d♂️|🧘🏾\u200d♂️|🧘🏼\u200d♂️|🧘🏽\u200d♂️|🧖🏿\u200d♂️|🧖🏻\u200d♂️|🧖🏾\u200d♂️|🧖🏼\u200d♂️|🧖🏽\u200d♂️|👨🏿\u200d⚖️|👨🏻\u200d⚖️|👨🏾\u200d⚖️|👨🏼\u200d⚖️|👨🏽\u200d⚖️|🤹🏿\u200d♂️|🤹🏻\u200d♂️|🤹🏾\u200d♂️|🤹🏼\u200d♂️|🤹🏽\u200d♂️|🏋️\u200d♂️|🏋🏿\u200d♂️|🏋🏻\u200d♂️|🏋🏾\u200d♂️|🏋🏼\u200d♂️|🏋🏽\u200d♂️|🧙🏿\u200d♂️|🧙🏻\u200d♂️|🧙🏾\u200d♂️|🧙🏼\u200d♂️|🧙🏽\u200d♂️|🚵🏿\u200d♂️|🚵🏻\u200d♂️|🚵🏾\u200d♂️|🚵🏼\u200d♂️|🚵🏽\u200d♂️|👨🏿\u200d✈️|👨🏻\u200d✈️|👨🏾\u200d✈️|👨🏼\u200d✈️|👨🏽\u200d✈️|🤾🏿\u200d♂️|🤾🏻\u200d♂️|🤾🏾\u200d♂️|🤾🏼\u200d♂️|🤾🏽\u200d♂️|🤽🏿\u200d♂️|🤽🏻\u200d♂️|🤽🏾\u200d♂️|🤽🏼\u200d♂️|🤽🏽\u200d♂️|👮🏿\u200d♂️|👮🏻\u200d♂️|👮🏾\u200d♂️|👮🏼\u200d♂️|👮🏽\u200d♂️|🙎🏿\u200d♂️|🙎🏻\u200d♂️|🙎🏾\u200d♂️|🙎🏼\u200d♂️|🙎🏽\u200d♂️|🙋🏿\u200d♂️|🙋🏻\u200d♂️|🙋🏾\u200d♂️|🙋🏼\u200d♂️|🙋🏽\u200d♂️|🚣🏿\u200d♂️|🚣🏻\u200d♂️|🚣🏾\u200d♂️|🚣🏼\u200d♂️|🚣🏽\u200d♂️|🏃🏿\u200d♂️|🏃🏻\u200d♂️|🏃🏾\u200d♂️|🏃🏼\u200d♂️|🏃🏽\u200d♂️|🤷🏿\u200d♂️|🤷🏻\u200d♂️|🤷🏾\u200d♂️|🤷🏼\u200d♂️|🤷🏽\u200d♂️|🏄🏿\u200d♂️|🏄🏻\u200d♂️|🏄🏾\u200d♂️|🏄🏼\u200d♂️|🏄🏽\u200d♂️|🏊🏿\u200d♂️|🏊🏻\u200d♂️|🏊🏾\u200d♂️|🏊🏼\u200d♂️|🏊🏽\u200d♂️|💁🏿\u200d♂️|💁🏻\u200d♂️|💁🏾\u200d♂️|💁🏼\u200d♂️|💁🏽\u200d♂️|🧛🏿\u200d♂️|🧛🏻\u200d♂️|🧛🏾\u200d♂️|🧛🏼\u200d♂️|🧛🏽\u200d♂️|🚶🏿\u200d♂️|🚶🏻\u200d♂️|🚶🏾\u200d♂️|🚶🏼\u200d♂️|🚶🏽\u200d♂️|👳🏿\u200d♂️|👳🏻\u200d♂️|👳🏾\u200d♂️|👳🏼\u200d♂️|👳🏽\u200d♂️|🧜🏿\u200d♀️|🧜🏻\u200d♀️|🧜🏾\u200d♀️|🧜🏼\u200d♀️|🧜🏽\u200d♀️|🧜🏿\u200d♂️|🧜🏻\u200d♂️|🧜🏾\u200d♂️|🧜🏼\u200d♂️|🧜🏽\u200d♂️|🧑\u200d🤝\u200d🧑|🚴🏿\u200d♀️|🚴🏻\u200d♀️|🚴🏾\u200d♀️|🚴🏼\u200d♀️|🚴🏽\u200d♀️|⛹️\u200d♀️|⛹🏿\u200d♀️|⛹🏻\u200d♀️|⛹🏾\u200d♀️|⛹🏼\u200d♀️|⛹🏽\u200d♀️|🙇🏿\u200d♀️|🙇🏻\u200d♀️|🙇🏾\u200d♀️|🙇🏼\u200d♀️|🙇🏽\u200d♀️|🤸🏿\u200d♀️|🤸🏻\u200d♀️|🤸🏾\u200d♀️|🤸🏼\u200d♀️|🤸🏽\u200d♀️|🧗🏿\u200d♀️|🧗🏻\u200d♀️|🧗🏾\u200d♀️|🧗🏼\u200d♀️|🧗🏽\u200d♀️|👷🏿\u200d♀️|👷🏻\u200d♀️|👷🏾\u200d♀️|👷🏼\u200d♀️|👷🏽\u200d♀️|🕵️\u200d♀️|🕵🏿\u200d♀️|🕵🏻\u200d♀️|🕵🏾\u200d♀️|🕵🏼\u200d♀️|🕵🏽\u200d♀️|🧝🏿\u200d♀️|🧝🏻\u200d♀️|🧝🏾\u200d♀️|🧝🏼\u200d♀️|🧝🏽\u200d♀️|🤦🏿\u200d♀️|🤦🏻\u200d♀️|🤦🏾\u200d♀️|🤦🏼\u200d♀️|🤦🏽\u200d♀️|🧚🏿\u200d♀️|🧚🏻\u200d♀️|🧚🏾\u200d♀️|🧚🏼\u200d♀️|🧚🏽\u200d♀️|🙍🏿\u200d♀️|🙍🏻\u200d♀️|🙍🏾\u200d♀️|🙍🏼\u200d♀️|🙍🏽\u200d♀️|🙅🏿\u200d♀️|🙅🏻\u200d♀️|🙅🏾\u200d♀️|🙅🏼\u200d♀️|🙅🏽\u200d♀️|🙆🏿\u200d♀️|🙆🏻\u200d♀️|🙆🏾\u200d♀️|🙆🏼\u200d♀️|🙆🏽\u200d♀️|💇🏿\u200d♀️|💇🏻\u200d♀️|💇🏾\u200d♀️|💇🏼\u200d♀️|💇🏽\u200d♀️|💆🏿\u200d♀️|💆🏻\u200d♀️|💆🏾\u200d♀️|💆🏼\u200d♀️|💆🏽\u200d♀️|🏌️\u200d♀️|🏌🏿\u200d♀️|🏌🏻\u200d♀️|🏌🏾\u200d♀️|🏌🏼\u200d♀️|🏌🏽\u200d♀️|💂🏿\u200d♀️|💂🏻\u200d♀️|💂🏾\u200d♀️|💂🏼\u200d♀️|💂🏽\u200d♀️|👩🏿\u200d⚕️|👩🏻\u200d⚕️|👩🏾\u200d⚕️|👩🏼\u200d⚕️|👩🏽\u200d⚕️|🧘🏿\u200d♀️|🧘🏻\u200d♀️|🧘🏾\u200d♀️|🧘🏼\u200d♀️|🧘🏽\u200d♀️|🧖🏿\u200d♀️|🧖🏻\u200d♀️|🧖🏾\u200d♀️|🧖🏼\u200d♀️|🧖🏽\u200d♀️|👩🏿\u200d⚖️|👩🏻\u200d⚖️|👩🏾\u200d⚖️|👩🏼\u200d⚖️|👩🏽\u200d⚖️|🤹🏿\u200d♀️|🤹🏻\u200d♀️|🤹🏾\u200d♀️|🤹🏼\u200d♀️|🤹🏽\u200d♀️|🏋️\u200d♀️|🏋🏿\u200d♀️|🏋🏻\u200d♀️|🏋🏾\u200d♀️|🏋🏼\u200d♀️|🏋🏽\u200d♀️|🧙🏿\u200d♀️|🧙🏻\u200d♀️|🧙🏾\u200d♀️|🧙🏼\u200d♀️|🧙🏽\u200d♀️|🚵🏿\u200d♀️|🚵🏻\u200d♀️|🚵🏾\u200d♀️|🚵🏼\u200d♀️|🚵🏽\u200d♀️|👩🏿\u200d✈️|👩🏻\u200d✈️|👩🏾\u200d✈️|👩🏼\u200d✈️|👩🏽\u200d✈️|🤾🏿\u200d♀️|🤾🏻\u200d♀️|🤾🏾\u200d♀️|🤾🏼\u200d♀️|🤾🏽\u200d♀️|🤽🏿\u200d♀️|🤽🏻\u200d♀️|🤽🏾\u200d♀️|🤽🏼\u200d♀️|🤽🏽\u200d♀️|👮🏿\u200d♀️|👮🏻\u200d♀️|👮🏾\u200d♀️|👮🏼\u200d♀️|👮🏽\u200d♀️|🙎🏿\u200d♀️|🙎🏻\u200d♀️|🙎🏾\u200d♀️|🙎🏼\u200d♀️|🙎🏽\u200d♀️|🙋🏿\u200d♀️|🙋🏻\u200d♀️|🙋🏾\u200d♀️|🙋🏼\u200d♀️|🙋🏽\u200d♀️|🚣🏿\u200d♀️|🚣🏻\u200d♀️|🚣🏾\u200d♀️|🚣🏼\u200d♀️|🚣🏽\u200d♀️|🏃🏿\u200d♀️|🏃🏻\u200d♀️|🏃🏾\u200d♀️|🏃🏼\u200d♀️|🏃🏽\u200d♀️|🤷🏿\u200d♀️|🤷🏻\u200d♀️|🤷🏾\u200d♀️|🤷🏼\u200d♀️|🤷🏽\u200d♀️|🏄🏿\u200d♀️|🏄🏻\u200d♀️|🏄🏾\u200d♀️|🏄🏼\u200d♀️|🏄🏽\u200d♀️|🏊🏿\u200d♀️|🏊🏻\u200d♀️|🏊🏾\u200d♀️|🏊🏼\u200d♀️|🏊🏽\u200d♀️|💁🏿\u200d♀️|💁🏻\u200d♀️|💁🏾\u200d♀️|💁🏼\u200d♀️|💁🏽\u200d♀️|🧛🏿\u200d♀️|🧛🏻\u200d♀️|🧛🏾\u200d♀️|🧛🏼\u200d♀️|🧛🏽\u200d♀️|🚶🏿\u200d♀️|🚶🏻\u200d♀️|🚶🏾\u200d♀️|🚶🏼\u200d♀️|🚶🏽\u200d♀️|👳🏿\u200d♀️|👳🏻\u200d♀️|👳🏾\u200d♀️|👳🏼\u200d♀️|👳🏽\u200d♀️|👱\u200d♂️|👱\u200d♀️|👨🏿\u200d🎨|👨🏻\u200d🎨|👨🏾\u200d🎨|👨🏼\u200d🎨|👨🏽\u200d🎨|👨🏿\u200d🚀|👨🏻\u200d🚀|👨🏾\u200d🚀|👨🏼\u200d🚀|👨🏽\u200d🚀|🚴\u200d♂️|🙇\u200d♂️|🤸\u200d♂️|🧗\u200d♂️|👷\u200d♂️|👨🏿\u200d🍳|👨🏻\u200d🍳|👨🏾\u200d🍳|👨🏼\u200d🍳|👨🏽\u200d🍳|🧝\u200d♂️|🤦\u200d♂️|👨🏿\u200d🏭|👨🏻\u200d🏭|👨🏾\u200d🏭|👨🏼\u200d🏭|👨🏽\u200d🏭|🧚\u200d♂️|👨🏿\u200d🌾|👨🏻\u200d🌾|👨🏾\u200d🌾|👨🏼\u200d🌾|👨🏽\u200d🌾|👨🏿\u200d🚒|👨🏻\u200d🚒|👨🏾\u200d🚒|👨🏼\u200d🚒|👨🏽\u200d🚒|🙍\u200d♂️|🧞\u200d♂️|🙅\u200d♂️|🙆\u200d♂️|💇\u200d♂️|💆\u200d♂️|💂\u200d♂️|👨\u200d⚕️|🧘\u200d♂️|🧖\u200d♂️|👨\u200d⚖️|🤹\u200d♂️|🧙\u200d♂️|👨🏿\u200d🔧|👨🏻\u200d🔧|👨🏾\u200d🔧|👨🏼\u200d🔧|👨🏽\u200d🔧|🚵\u200d♂️|👨🏿\u200d💼|👨🏻\u200d💼|👨🏾\u200d💼|👨🏼\u200d💼|👨🏽\u200d💼|👨\u200d✈️|🤾\u200d♂️|🤽\u200d♂️|👮\u200d♂️|🙎\u200d♂️|🙋\u200d♂️|🚣\u200d♂️|🏃\u200d♂️|👨🏿\u200d🔬|👨🏻\u200d🔬|👨🏾\u200d🔬|👨🏼\u200d🔬|👨🏽\u200d🔬|🤷\u200d♂️|👨🏿\u200d🎤|👨🏻\u200d🎤|👨🏾\u200d🎤|👨🏼\u200d🎤|👨🏽\u200d🎤|👨🏿\u200d🎓|👨🏻\u200d🎓|👨🏾\u200d🎓|👨🏼\u200d🎓|👨🏽\u200d🎓|🏄\u200d♂️|🏊\u200d♂️|👨🏿\u200d🏫|👨🏻\u200d🏫|👨🏾\u200d🏫|👨🏼\u200d🏫|👨🏽\u200d🏫|👨🏿\u200d💻|👨🏻\u200d💻|👨🏾\u200d💻|👨🏼\u200d💻|👨🏽\u200d💻|💁\u200d♂️|🧛\u200d♂️|🚶\u200d♂️|👳\u200d♂️|🧟\u200d♂️|👯\u200d♂️|🤼\u200d♂️|🧜\u200d♀️|🧜\u200d♂️|🏴\u200d☠️|🏳️\u200d🌈|👩🏿\u200d🎨|👩🏻\u200d🎨|👩🏾\u200d🎨|👩🏼\u200d🎨|👩🏽\u200d🎨|👩🏿\u200d🚀|👩🏻\u200d🚀|👩🏾\u200d🚀|👩🏼\u200d🚀|👩🏽\u200d🚀|🚴\u200d♀️|🙇\u200d♀️|🤸\u200d♀️|🧗\u200d♀️|👷\u200d♀️|👩🏿\u200d🍳|👩🏻\u200d🍳|👩🏾\u200d🍳|👩🏼\u200d🍳|👩🏽\u200d🍳|🧝\u200d♀️|🤦\u200d♀️|👩🏿\u200d🏭|👩🏻\u200d🏭|👩🏾\u200d🏭|👩🏼\u200d🏭|👩🏽\u200d🏭|🧚\u200d♀️|👩🏿\u200d🌾|👩🏻\u200d🌾|👩🏾\u200d🌾|👩🏼\u200d🌾|👩🏽\u200d🌾|👩🏿\u200d🚒|👩🏻\u200d🚒|👩🏾\u200d🚒|👩🏼\u200d🚒|👩🏽\u200d🚒|🙍\u200d♀️|🧞\u200d♀️|🙅\u200d♀️|🙆\u200d♀️|💇\u200d♀️|💆\u200d♀️|💂\u200d♀️|👩\u200d⚕️|🧘\u200d♀️|🧖\u200d♀️|👩\u200d⚖️|🤹\u200d♀️|🧙\u200d♀️|👩🏿\u200d🔧|👩🏻\u200d🔧|👩🏾\u200d🔧|👩🏼\u200d🔧|👩🏽\u200d🔧|🚵\u200d♀️|👩🏿\u200d💼|👩🏻\u200d💼|👩🏾\u200d💼|👩🏼\u200d💼|👩🏽\u200d💼|👩\u200d✈️|🤾\u200d♀️|🤽\u200d♀️|👮\u200d♀️|🙎\u200d♀️|🙋\u200d♀️|🚣\u200d♀️|🏃\u200d♀️|👩🏿\u200d🔬|👩🏻\u200d🔬|👩🏾\u200d🔬|👩🏼\u200d🔬|👩🏽\u200d🔬|🤷\u200d♀️|👩🏿\u200d🎤|👩🏻\u200d🎤|👩🏾\u200d🎤|👩🏼\u200d🎤|👩🏽\u200d🎤|👩🏿\u200d🎓|👩🏻\u200d🎓|👩🏾\u200d🎓|👩🏼\u200d🎓|👩🏽\u200d🎓|🏄\u200d♀️|🏊\u200d♀️|👩🏿\u200d🏫|👩🏻\u200d🏫|👩🏾\u200d🏫|👩🏼\u200d🏫|👩🏽\u200d🏫|👩🏿\u200d💻|👩🏻\u200d💻|👩🏾\u200d💻|👩🏼\u200d💻|👩🏽\u200d💻|💁\u200d♀️|🧛\u200d♀️|🚶\u200d♀️|👳\u200d♀️|🧟\u200d♀️|👯\u200d♀️|🤼\u200d♀️|👨\u200d🦲|👩\u200d🦲|👨\u200d🦱|👩\u200d🦱|👨\u200d👦|👨\u200d👧|👩\u200d👦|👩\u200d👧|\#️⃣|\*️⃣|0️⃣|1️⃣|2️⃣|3️⃣|4️⃣|5️⃣|6️⃣|7️⃣|8️⃣|9️⃣|👨\u200d🎨|👨\u200d🚀|👨\u200d🍳|👨\u200d🏭|👨\u200d🌾|👨\u200d🚒|👨\u200d\U0001f9bd|👨\u200d\U0001f9bc|👨\u200d🔧|👨\u200d💼|👨\u200d🔬|👨\u200d🎤|👨\u200d🎓|👨\u200d🏫|👨\u200d💻|👨\u200d\U0001f9af|👨\u200d🦰|👩\u200d🦰|🐕\u200d\U0001f9ba|👨\u200d🦳|👩\u200d🦳|👩\u200d🎨|👩\u200d🚀|👩\u200d🍳|👩\u200d🏭|👩\u200d🌾|👩\u200d🚒|👩\u200d\U0001f9bd|👩\u200d\U0001f9bc|👩\u200d🔧|👩\u200d💼|👩\u200d🔬|👩\u200d🎤|👩\u200d🎓|👩\u200d🏫|👩\u200d💻|👩\u200d\U0001f9af|🇦🇫|🇦🇱|🇩🇿|🇦🇸|🇦🇩|🇦🇴|🇦🇮|🇦🇶|🇦🇬|🇦🇷|🇦🇲|🇦🇼|🇦🇨|🇦🇺|🇦🇹|🇦🇿|🇧🇸|🇧🇭|🇧🇩|🇧🇧|🇧🇾|🇧🇪|🇧🇿|🇧🇯|🇧🇲|🇧🇹|🇧🇴|🇧🇦|🇧🇼|🇧🇻|🇧🇷|🇮🇴|🇻🇬|🇧🇳|🇧🇬|🇧🇫|🇧🇮|🇰🇭|🇨🇲|🇨🇦|🇮🇨|🇨🇻|🇧🇶|🇰🇾|🇨🇫|🇪🇦|🇹🇩|🇨🇱|🇨🇳|🇨🇽|🇨🇵|🇨🇨|🇨🇴|🇰🇲|🇨🇬|🇨🇩|🇨🇰|🇨🇷|🇭🇷|🇨🇺|🇨🇼|🇨🇾|🇨🇿|🇨🇮|🇩🇰|🇩🇬|🇩🇯|🇩🇲|🇩🇴|🇪🇨|🇪🇬|🇸🇻|🇬🇶|🇪🇷|🇪🇪|🇪🇹|🇪🇺|🇫🇰|🇫🇴|🇫🇯|🇫🇮|🇫🇷|🇬🇫|🇵🇫|🇹🇫|🇬🇦|🇬🇲|🇬🇪|🇩🇪|🇬🇭|🇬🇮|🇬🇷|🇬🇱|🇬🇩|🇬🇵|🇬🇺|🇬🇹|🇬🇬|🇬🇳|🇬🇼|🇬🇾|🇭🇹|🇭🇲|🇭🇳|🇭🇰|🇭🇺|🇮🇸|🇮🇳|🇮🇩|🇮🇷|🇮🇶|🇮🇪|🇮🇲|🇮🇱|🇮🇹|🇯🇲|🇯🇵|🇯🇪|🇯🇴|🇰🇿|🇰🇪|🇰🇮|🇽🇰|🇰🇼|🇰🇬|🇱🇦|🇱🇻|🇱🇧|🇱🇸|🇱🇷|🇱🇾|🇱🇮|🇱🇹|🇱🇺|🇲🇴|🇲🇰|🇲🇬|🇲🇼|🇲🇾|🇲🇻|🇲🇱|🇲🇹|🇲🇭|🇲🇶|🇲🇷|🇲🇺|🇾🇹|🇲🇽|🇫🇲|🇲🇩|🇲🇨|🇲🇳|🇲🇪|🇲🇸|🇲🇦|🇲🇿|🤶🏿|🤶🏻|🤶🏾|🤶🏼|🤶🏽|🇲🇲|🇳🇦|🇳🇷|🇳🇵|🇳🇱|🇳🇨|🇳🇿|🇳🇮|🇳🇪|🇳🇬|🇳🇺|🇳🇫|🇰🇵|🇲🇵|🇳🇴|👌🏿|👌🏻|👌🏾|👌🏼|👌🏽|🇴🇲|🇵🇰|🇵🇼|🇵🇸|🇵🇦|🇵🇬|🇵🇾|🇵🇪|🇵🇭|🇵🇳|🇵🇱|🇵🇹|🇵🇷|🇶🇦|🇷🇴|🇷🇺|🇷🇼|🇷🇪|🇼🇸|🇸🇲|🎅🏿|🎅🏻|🎅🏾|🎅🏼|🎅🏽|🇸🇦|🇸🇳|🇷🇸|🇸🇨|🇸🇱|🇸🇬|🇸🇽|🇸🇰|🇸🇮|🇸🇧|🇸🇴|🇿🇦|🇬🇸|🇰🇷|🇸🇸|🇪🇸|🇱🇰|🇧🇱|🇸🇭|🇰🇳|🇱🇨|🇲🇫|🇵🇲|🇻🇨|🇸🇩|🇸🇷|🇸🇯|🇸🇿|🇸🇪|🇨🇭|🇸🇾|🇸🇹|🇹🇼|🇹🇯|🇹🇿|🇹🇭|🇹🇱|🇹🇬|🇹🇰|🇹🇴|🇹🇹|🇹🇦|🇹🇳|🇹🇷|🇹🇲|🇹🇨|🇹🇻|🇺🇲|🇻🇮|🇺🇬|🇺🇦|🇦🇪|🇬🇧|🇺🇳|🇺🇸|🇺🇾|🇺🇿|🇻🇺|🇻🇦|🇻🇪|🇻🇳|🇼🇫|🇪🇭|🇾🇪|🇿🇲|🇿🇼|🧑🏿|🧑🏻|🧑🏾|🧑🏼|🧑🏽|👼🏿|👼🏻|👼🏾|👼🏼|👼🏽|👶🏿|👶🏻|👶🏾|👶🏼|👶🏽|👇🏿|👇🏻|👇🏾|👇🏼|👇🏽|👈🏿|👈🏻|👈🏾|👈🏼|👈🏽|👉🏿|👉🏻|👉🏾|👉🏼|👉🏽|👆🏿|👆🏻|👆🏾|👆🏼|👆🏽|🧔🏿|🧔🏻|🧔🏾|🧔🏼|🧔🏽|👱🏿|👱🏻|👱🏾|👱🏼|👱🏽|👦🏿|👦🏻|👦🏾|👦🏼|👦🏽|🤱🏿|🤱🏻|🤱🏾|🤱🏼|🤱🏽|👰🏿|👰🏻|👰🏾|👰🏼|👰🏽|🤙🏿|🤙🏻|🤙🏾|🤙🏼|🤙🏽|🧒🏿|🧒🏻|🧒🏾|🧒🏼|🧒🏽|👏🏿|👏🏻|👏🏾|👏🏼|👏🏽|👷🏿|👷🏻|👷🏾|👷🏼|👷🏽|🤞🏿|🤞🏻|🤞🏾|🤞🏼|🤞🏽|🕵🏿|🕵🏻|🕵🏾|🕵🏼|🕵🏽|👂🏿|👂🏻|👂🏾|👂🏼|👂🏽|🧝🏿|🧝🏻|🧝🏾|🧝🏼|🧝🏽|🧚🏿|🧚🏻|🧚🏾|🧚🏼|🧚🏽|💪🏿|💪🏻|💪🏾|💪🏼|💪🏽|🙏🏿|🙏🏻|🙏🏾|🙏🏼|🙏🏽|👧🏿|👧🏻|👧🏾|👧🏼|👧🏽|💂🏿|💂🏻|💂🏾|💂🏼|💂🏽|🖐🏿|🖐🏻|🖐🏾|🖐🏼|🖐🏽|🏇🏿|🏇🏻|🏇🏾|🏇🏼|🏇🏽|☝🏿|☝🏻|☝🏾|☝🏼|☝🏽|🤛🏿|🤛🏻|🤛🏾|🤛🏼|🤛🏽|🤟🏿|🤟🏻|🤟🏾|🤟🏼|🤟🏽|🧙🏿|🧙🏻|🧙🏾|🧙🏼|🧙🏽|🕺🏿|🕺🏻|🕺🏾|🕺🏼|🕺🏽|👨🏿|🕴🏿|🕴🏻|🕴🏾|🕴🏼|🕴🏽|🤵🏿|🤵🏻|🤵🏾|🤵🏼|🤵🏽|👨🏻|👨🏾|👨🏼|👨🏽|👲🏿|👲🏻|👲🏾|👲🏼|👲🏽|🧜🏿|🧜🏻|🧜🏾|🧜🏼|🧜🏽|🖕🏿|🖕🏻|🖕🏾|🖕🏼|🖕🏽|💅🏿|💅🏻|💅🏾|💅🏼|💅🏽|👃🏿|👃🏻|👃🏾|👃🏼|👃🏽|👴🏿|👴🏻|👴🏾|👴🏼|👴🏽|👵🏿|👵🏻|👵🏾|👵🏼|👵🏽|🧓🏿|🧓🏻|🧓🏾|🧓🏼|🧓🏽|👊🏿|👊🏻|👊🏾|👊🏼|👊🏽|👐🏿|👐🏻|👐🏾|👐🏼|👐🏽|🤲🏿|🤲🏻|🤲🏾|🤲🏼|🤲🏽|🚴🏿|🚴🏻|🚴🏾|🚴🏼|🚴🏽|⛹🏿|⛹🏻|⛹🏾|⛹🏼|⛹🏽|🙇🏿|🙇🏻|🙇🏾|🙇🏼|🙇🏽|🤸🏿|🤸🏻|🤸🏾|🤸🏼|🤸🏽|🧗🏿|🧗🏻|🧗🏾|🧗🏼|🧗🏽|🤦🏿|🤦🏻|🤦🏾|🤦🏼|🤦🏽|🙍🏿|🙍🏻|🙍🏾|🙍🏼|🙍🏽|🙅🏿|🙅🏻|🙅🏾|🙅🏼|🙅🏽|🙆🏿|🙆🏻|🙆🏾|🙆🏼|🙆🏽|💇🏿|💇🏻|💇🏾|💇🏼|💇🏽|💆🏿|💆🏻|💆🏾|💆🏼|💆🏽|🏌🏿|🏌🏻|🏌🏾|🏌🏼|🏌🏽|🛌🏿|🛌🏻|🛌🏾|🛌🏼|🛌🏽|🧘🏿|🧘🏻|🧘🏾|🧘🏼|🧘🏽|🧖🏿|🧖🏻|🧖🏾|🧖🏼|🧖🏽|🤹🏿|🤹🏻|🤹🏾|🤹🏼|🤹🏽|🏋🏿|🏋🏻|🏋🏾|🏋🏼|🏋🏽|🚵🏿|🚵🏻|🚵🏾|🚵🏼|🚵🏽|🤾🏿|🤾🏻|🤾🏾|🤾🏼|🤾🏽|🤽🏿|🤽🏻|🤽🏾|🤽🏼|🤽🏽|🙎🏿|🙎🏻|🙎🏾|🙎🏼|🙎🏽|🙋🏿|🙋🏻|🙋🏾|🙋🏼|🙋🏽|🚣🏿|🚣🏻|🚣🏾|🚣🏼|🚣🏽|🏃🏿|🏃🏻|🏃🏾|🏃🏼|🏃🏽|🤷🏿|🤷🏻|🤷🏾|🤷🏼|🤷🏽|🏄🏿|🏄🏻|🏄🏾|🏄🏼|🏄🏽|🏊🏿|🏊🏻|🏊🏾|🏊🏼|🏊🏽|🛀🏿|🛀🏻|🛀🏾|🛀🏼|🛀🏽|💁🏿|💁🏻|💁🏾|💁🏼|💁🏽|🚶🏿|🚶🏻|🚶🏾|🚶🏼|🚶🏽|👳🏿|👳🏻|👳🏾|👳🏼|👳🏽|👮🏿|👮🏻|👮🏾|👮🏼|👮🏽|🤰🏿|🤰🏻|🤰🏾|🤰🏼|🤰🏽|🤴🏿|🤴🏻|🤴🏾|🤴🏼|🤴🏽|👸🏿|👸🏻|👸🏾|👸🏼|👸🏽|🤚🏿|🤚🏻|🤚🏾|🤚🏼|🤚🏽|✊🏿|✊🏻|✊🏾|✊🏼|✊🏽|✋🏿|✋🏻|✋🏾|✋🏼|✋🏽|🙌🏿|🙌🏻|🙌🏾|🙌🏼|🙌🏽|🤜🏿|🤜🏻|🤜🏾|🤜🏼|🤜🏽|🤳🏿|🤳🏻|🤳🏾|🤳🏼|🤳🏽|🤘🏿|🤘🏻|🤘🏾|🤘🏼|🤘🏽|🏂🏿|🏂🏻|🏂🏾|🏂🏼|🏂🏽|👎🏿|👎🏻|👎🏾|👎🏼|👎🏽|👍🏿|👍🏻|👍🏾|👍🏼|👍🏽|🧛🏿|🧛🏻|🧛🏾|🧛🏼|🧛🏽|✌🏿|✌🏻|✌🏾|✌🏼|✌🏽|🖖🏿|🖖🏻|🖖🏾|🖖🏼|🖖🏽|👋🏿|👋🏻|👋🏾|👋🏼|👋🏽|💃🏿|💃🏻|💃🏾|💃🏼|💃🏽|👩🏿|👩🏻|👩🏾|👩🏼|👩🏽|🧕🏿|🧕🏻|🧕🏾|🧕🏼|🧕🏽|✍🏿|✍🏻|✍🏾|✍🏼|✍🏽|🇦🇽|\*⃣|8⃣|5⃣|4⃣|9⃣|1⃣|7⃣|6⃣|3⃣|2⃣|0⃣|\#⃣|🥇|🥈|🥉|🆎|🏧|🅰|♒|♈|🔙|🅱|🆑|🆒|♋|♑|🎄|🔚|🆓|♊|🆔|🉑|🈸|🉐|🏯|㊗|🈹|🎎|🈚|🈁|🈷|🈵|🈶|🈺|🈴|🏣|🈲|🈯|㊙|🈂|🔰|🈳|♌|♎|🤶|🆕|🆖|🆗|👌|🔛|🅾|⛎|🅿|♓|🔜|🆘|♐|🎅|♏|🗽|🦖|🔝|♉|🗼|🆙|🆚|♍|🧮|\U0001fa79|🎟|🧑|🚡|✈|🛬|🛫|⏰|⚗|👽|👾|🚑|🏈|🏺|⚓|💢|😠|👿|😧|🐜|📶|😰|🚛|🎨|😲|⚛|\U0001f6fa|🚗|🥑|\U0001fa93|👶|👼|🍼|🐤|🚼|👇|👈|👉|👆|🥓|🦡|🏸|🥯|🛄|🥖|⚖|🦲|\U0001fa70|🎈|🗳|☑|🍌|\U0001fa95|🏦|📊|💈|⚾|🧺|🏀|🦇|🛁|🔋|🏖|😁|🐻|🧔|💓|🛏|🍺|🔔|🔕|🛎|🍱|\U0001f9c3|🚲|👙|🧢|☣|🐦|🎂|⚫|🏴|🖤|⬛|◾|◼|✒|▪|🔲|👱|🌼|🐡|📘|🔵|💙|\U0001f7e6|🐗|💣|🦴|🔖|📑|📚|🍾|💐|🏹|🥣|🎳|🥊|👦|🧠|🍞|🤱|🧱|👰|🌉|💼|\U0001fa72|🔆|🥦|💔|🧹|\U0001f7e4|\U0001f90e|\U0001f7eb|🐛|🏗|🚅|🌯|🚌|🚏|👤|👥|\U0001f9c8|🦋|🌵|📅|🤙|🐪|📷|📸|🏕|🕯|🍬|🥫|🛶|🗃|📇|🗂|🎠|🎏|🥕|🏰|🐈|🐱|😹|😼|⛓|\U0001fa91|📉|📈|💹|🧀|🏁|🍒|🌸|♟|🌰|🐔|🧒|🚸|🐿|🍫|🥢|⛪|🚬|🎦|Ⓜ|🎪|🏙|🌆|🗜|🎬|👏|🏛|🍻|🥂|📋|🔃|📕|📪|📫|🌂|☁|🌩|⛈|🌧|🌨|🤡|♣|👝|🧥|🍸|🥥|⚰|🥶|💥|☄|🧭|💽|🖱|🎊|😖|😕|🚧|👷|🎛|🏪|🍚|🍪|🍳|©|🛋|🔄|💑|🐄|🐮|🤠|🦀|🖍|💳|🌙|🦗|🏏|🐊|🥐|❌|❎|🤞|🎌|⚔|👑|😿|😢|🔮|🥒|🧁|🥤|🥌|🦱|➰|💱|🍛|🍮|🛃|🥩|🌀|🗡|🍡|💨|\U0001f9cf|🌳|🦌|🚚|🏬|🏚|🏜|🏝|🖥|🕵|♦|💠|🔅|🎯|😞|\U0001f93f|\U0001fa94|💫|😵|🧬|🐕|🐶|💵|🐬|🚪|🔯|➿|‼|🍩|🕊|↙|↘|⬇|😓|🔽|🐉|🐲|👗|🤤|\U0001fa78|💧|🥁|🦆|🥟|📀|📧|🦅|👂|🌽|\U0001f9bb|🥚|🍆|✴|✳|🕣|🕗|⏏|🔌|🐘|🕦|🕚|🧝|✉|📩|💶|🌲|🐑|❗|⁉|🤯|😑|👁|👀|😘|😋|😱|🤮|🤭|🤕|😷|🧐|😮|🤨|🙄|😤|🤬|😂|🤒|😛|😶|🏭|🧚|\U0001f9c6|🍂|👪|⏩|⏬|⏪|⏫|📠|😨|♀|🎡|⛴|🏑|🗄|📁|🎞|📽|🔥|🧯|🧨|🚒|🎆|🌓|🌛|🐟|🍥|🎣|🕠|🕔|⛳|\U0001f9a9|🔦|🥿|⚜|💪|💾|🎴|😳|🥏|🛸|🌫|🌁|🙏|🦶|👣|🍴|🍽|🥠|⛲|🖋|🕟|🍀|🕓|🦊|🖼|🍟|🍤|🐸|🐥|☹|😦|⛽|🌕|🌝|⚱|🎲|\U0001f9c4|⚙|💎|🧞|👻|🦒|👧|🥛|👓|🌎|🌏|🌍|🌐|🧤|🌟|🥅|🐐|👺|🥽|🦍|🎓|🍇|🍏|📗|\U0001f7e2|💚|🥗|\U0001f7e9|😬|😺|😸|😀|😃|😄|😅|😆|💗|💂|\U0001f9ae|🎸|🍔|🔨|⚒|🛠|🐹|🖐|👜|🤝|🐣|🎧|🙉|💟|♥|💘|💝|✔|➗|💲|❣|⭕|➖|✖|➕|🦔|🚁|🌿|🌺|👠|🚄|⚡|🥾|\U0001f6d5|🦛|🕳|🍯|🐝|🚥|🐎|🐴|🏇|🏥|☕|🌭|🥵|🌶|♨|🏨|⌛|⏳|🏠|🏡|🏘|🤗|💯|😯|\U0001f9ca|🍨|🏒|⛸|📥|📨|☝|♾|ℹ|🔤|🔡|🔠|🔢|🔣|🎃|👖|🧩|🃏|🕹|🕋|🦘|🔑|⌨|🔟|🛴|👘|💏|💋|😽|😗|😚|😙|🔪|\U0001fa81|🥝|🐨|🥼|🏷|🥍|🐞|💻|🔷|🔶|🌗|🌜|⏮|✝|🍃|🥬|📒|🤛|↔|⬅|↪|🛅|🗨|🦵|🍋|🐆|🎚|💡|🚈|🔗|🖇|🦁|💄|🚮|🦎|🦙|🦞|🔒|🔐|🔏|🚂|🍭|🧴|😭|📢|🤟|🏩|💌|🧳|🤥|🧙|🧲|🔍|🔎|🀄|♂|👨|👫|🕺|🕴|🤵|👲|🥭|🕰|\U0001f9bd|👞|🗾|🍁|🥋|\U0001f9c9|🍖|\U0001f9be|\U0001f9bf|⚕|📣|🍈|📝|🕎|🚹|🧜|🚇|🦠|🎤|🔬|🖕|🎖|🌌|🚐|🗿|📱|📴|📲|🤑|💰|💸|🐒|🐵|🚝|🥮|🎑|🕌|🦟|🛥|🛵|🏍|\U0001f9bc|🛣|🗻|⛰|🚠|🚞|🐁|🐭|👄|🎥|🍄|🎹|🎵|🎶|🎼|🔇|💅|📛|🏞|🤢|🧿|👔|🤓|😐|🌑|🌚|📰|⏭|🌃|🕤|🕘|🚳|⛔|🚯|📵|🔞|🚷|🚭|🚱|👃|📓|📔|🔩|🐙|🍢|🏢|👹|🛢|🗝|👴|👵|🧓|🕉|🚘|🚍|👊|🚔|🚖|\U0001fa71|🕜|🕐|\U0001f9c5|📖|📂|👐|📭|📬|💿|📙|\U0001f7e0|🧡|\U0001f7e7|\U0001f9a7|☦|\U0001f9a6|📤|🦉|🐂|\U0001f9aa|📦|📄|📃|📟|🖌|🌴|🤲|🥞|🐼|📎|🦜|〽|🎉|🥳|🛳|🛂|⏸|🐾|☮|🍑|🦚|🥜|🍐|🖊|✏|🐧|😔|👯|🤼|🎭|😣|🚴|⛹|🙇|🤸|🧗|🤦|🤺|🙍|🙅|🙆|💇|💆|🏌|🛌|🧘|🧖|🤹|\U0001f9ce|🏋|🚵|🤾|🤽|🙎|🙋|🚣|🏃|🤷|\U0001f9cd|🏄|🏊|🛀|💁|🚶|👳|🧫|⛏|🥧|🐖|🐷|🐽|💩|💊|\U0001f90f|🎍|🍍|🏓|🔫|🍕|🛐|▶|⏯|🥺|🚓|🚨|👮|🐩|🎱|🍿|🏤|📯|📮|🍲|🚰|🥔|🍗|💷|😾|😡|📿|🤰|🥨|\U0001f9af|🤴|👸|🖨|🚫|\U0001f7e3|💜|\U0001f7ea|👛|📌|❓|🐇|🐰|🦝|🏎|📻|🔘|☢|🚃|🛤|🌈|🤚|✊|✋|🙌|🐏|🐀|\U0001fa92|\U0001fa90|🧾|⏺|♻|🍎|🔴|🧧|🦰|❤|🏮|\U0001f7e5|🔻|🔺|®|😌|🎗|🔁|🔂|⛑|🚻|◀|💞|🦏|🎀|🍙|🍘|🤜|🗯|➡|⤵|↩|⤴|💍|🍠|🤖|🚀|🧻|🗞|🎢|🤣|🐓|🌹|🏵|📍|🏉|🎽|👟|😥|🧷|\U0001f9ba|🧂|⛵|🍶|🥪|\U0001f97b|🛰|📡|🦕|🎷|🧣|🏫|🎒|✂|🦂|📜|💺|🙈|🌱|🤳|🕢|🕖|🥘|☘|🦈|🍧|🌾|🛡|⛩|🚢|🌠|🛍|🛒|🍰|\U0001fa73|🚿|🦐|🔀|🤫|🤘|🕡|🕕|🛹|⛷|🎿|💀|☠|\U0001f9a8|🛷|😴|😪|🙁|🙂|🎰|\U0001f9a5|🛩|🔹|🔸|😻|☺|😇|🥰|😍|😈|😊|😎|😏|🐌|🐍|🤧|🏔|🏂|❄|☃|⛄|🧼|⚽|🧦|🥎|🍦|♠|🍝|❇|🎇|✨|💖|🙊|🔊|🔈|🔉|🗣|💬|🚤|🕷|🕸|🗓|🗒|🐚|🥄|🧽|🚙|🏅|🐳|🦑|😝|🏟|🤩|☪|✡|🚉|🍜|\U0001fa7a|⏹|🛑|⏱|📏|🍓|🎙|🥙|☀|⛅|🌥|🌦|🌤|🌞|🌻|🕶|🌅|🌄|🌇|🦸|🦹|🍣|🚟|🦢|💦|🕍|💉|👕|🌮|🥡|🎋|🍊|🚕|🍵|📆|🧸|☎|📞|🔭|📺|🕥|🕙|🎾|⛺|🧪|🌡|🤔|💭|🧵|🕞|🕒|👎|👍|🎫|🐅|🐯|⏲|😫|🧰|🚽|🍅|👅|🦷|🎩|🌪|🖲|🚜|™|🚆|🚊|🚋|🚩|📐|🔱|🚎|🏆|🍹|🐠|🎺|🌷|🥃|🦃|🐢|🕧|🕛|🐫|🕝|💕|👬|🕑|👭|☂|⛱|☔|😒|🦄|🔓|↕|↖|↗|⬆|🙃|🔼|🧛|🚦|📳|✌|📹|🎮|📼|🎻|🌋|🏐|🖖|\U0001f9c7|🌘|🌖|⚠|🗑|⌚|🐃|🚾|🌊|🍉|👋|〰|🌒|🌔|🙀|😩|💒|🐋|☸|♿|⚪|❕|🏳|💮|🦳|\U0001f90d|✅|⬜|◽|◻|⭐|❔|▫|🔳|🥀|🎐|🌬|🍷|😉|😜|🐺|👩|💃|🧕|👢|👚|👒|👡|🚺|🥴|🗺|😟|🎁|🔧|✍|🧶|\U0001f971|\U0001f7e1|💛|\U0001f7e8|💴|\U0001fa80|☯|🤪|🦓|🤐|🧟|💤|🏻|🏼|🏽|🏾|🏿|🇦|🇧|🇨|🇩|🇪|🇫|🇬|🇭|🇮|🇯|🇰|🇱|🇲|🇳|🇴|🇵|🇶|🇷|🇸|🇹|🇺|🇻|🇼|🇽|🇾|🇿' ]|^'|'$|''"
+    r"[^\ !\#'\*0-9\?A-Za-z\|\u00A9\u00AE\u0E00-\u0E7F\u200D\u203C\u2049\u20E3\u2122"
+    r"\u2139\u2194-\u2199\u21A9\u21AA\u231A\u231B\u2328\u23CF\u23E9-\u23F3"
+    r"\u23F8-\u23FA\u24C2\u25AA\u25AB\u25B6\u25C0\u25FB-\u25FE\u2600-\u2604\u260E"
+    r"\u2611\u2614\u2615\u2618\u261D\u2620\u2622\u2623\u2626\u262A\u262E\u262F"
+    r"\u2638-\u263A\u2640\u2642\u2648-\u2653\u265F\u2660\u2663\u2665\u2666\u2668"
+    r"\u267B\u267E\u267F\u2692-\u2697\u2699\u269B\u269C\u26A0\u26A1\u26AA\u26AB"
+    r"\u26B0\u26B1\u26BD\u26BE\u26C4\u26C5\u26C8\u26CE\u26CF\u26D1\u26D3\u26D4"
+    r"\u26E9\u26EA\u26F0-\u26F5\u26F7-\u26FA\u26FD\u2702\u2705\u2708-\u270D\u270F"
+    r"\u2712\u2714\u2716\u271D\u2721\u2728\u2733\u2734\u2744\u2747\u274C\u274E"
+    r"\u2753-\u2755\u2757\u2763\u2764\u2795-\u2797\u27A1\u27B0\u27BF\u2934\u2935"
+    r"\u2B05-\u2B07\u2B1B\u2B1C\u2B50\u2B55\u3030\u303D\u3297\u3299\uFE0F"
+    r"\U0001F004\U0001F0CF\U0001F170\U0001F171\U0001F17E\U0001F17F\U0001F18E"
+    r"\U0001F191-\U0001F19A\U0001F1E6-\U0001F1FF\U0001F201\U0001F202\U0001F21A"
+    r"\U0001F22F\U0001F232-\U0001F23A\U0001F250\U0001F251\U0001F300-\U0001F321"
+    r"\U0001F324-\U0001F393\U0001F396\U0001F397\U0001F399-\U0001F39B"
+    r"\U0001F39E-\U0001F3F0\U0001F3F3-\U0001F3F5\U0001F3F7-\U0001F4FD"
+    r"\U0001F4FF-\U0001F53D\U0001F549-\U0001F54E\U0001F550-\U0001F567\U0001F56F"
+    r"\U0001F570\U0001F573-\U0001F57A\U0001F587\U0001F58A-\U0001F58D\U0001F590"
+    r"\U0001F595\U0001F596\U0001F5A4\U0001F5A5\U0001F5A8\U0001F5B1\U0001F5B2"
+    r"\U0001F5BC\U0001F5C2-\U0001F5C4\U0001F5D1-\U0001F5D3\U0001F5DC-\U0001F5DE"
+    r"\U0001F5E1\U0001F5E3\U0001F5E8\U0001F5EF\U0001F5F3\U0001F5FA-\U0001F64F"
+    r"\U0001F680-\U0001F6C5\U0001F6CB-\U0001F6D2\U0001F6D5\U0001F6E0-\U0001F6E5"
+    r"\U0001F6E9\U0001F6EB\U0001F6EC\U0001F6F0\U0001F6F3-\U0001F6FA"
+    r"\U0001F7E0-\U0001F7EB\U0001F90D-\U0001F93A\U0001F93C-\U0001F945"
+    r"\U0001F947-\U0001F971\U0001F973-\U0001F976\U0001F97A-\U0001F9A2"
+    r"\U0001F9A5-\U0001F9AA\U0001F9AE-\U0001F9CA\U0001F9CD-\U0001F9FF"
+    r"\U0001FA70-\U0001FA73\U0001FA78-\U0001FA7A\U0001FA80\U0001FA81"
+    r"\U0001FA90-\U0001FA95\U000E0062\U000E0063\U000E0065\U000E0067\U000E006C"
+    r"\U000E006E\U000E0073\U000E0074\U000E0077\U000E007F"
+    r"]|^'|'$|''"
 )
 
 # Any non-whitesplace character and non-digits duplication
 RE_DUP_CHARS = re.compile(r"([^0-9๐-๙\s])(\1{2,})")
-RE_DUP_EMOJIS = re.compile(r"{}(\1{})".format(RE_EMOJI.pattern, "{1,}"))
+
+
+def __getattr__(name: str):
+    # RE_EMOJI and RE_DUP_EMOJIS are not used here anymore (see
+    # emoji_matcher) and take a while to compile, so only build them on request
+    if name in ("RE_EMOJI", "RE_DUP_EMOJIS"):
+        import emoji
+
+        pattern = (
+            "("
+            + "|".join(
+                re.escape(u) for u in sorted(emoji.EMOJI_DATA, key=len, reverse=True)
+            )
+            + ")"
+        )
+        globals()["RE_EMOJI"] = re.compile(pattern)
+        globals()["RE_DUP_EMOJIS"] = re.compile(r"{}(\1{})".format(pattern, "{1,}"))
+        return globals()[name]
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 
 def is_date_str(var) -> bool:
-    try:
-        datetime.strptime(str(var), "%Y-%m-%d")
-    except ValueError:
-        # raise ValueError("Incorrect data format, should be YYYY-MM-DD")
-        return False
-    return True
+    """Same as datetime.strptime(str(var), "%Y-%m-%d") not failing."""
+    return _date_str(RE_DATE_STR.fullmatch(str(var)))
 
 
 def is_datetime_str(var) -> bool:
-    try:
-        datetime.strptime(str(var), "%Y-%m-%d %H:%M:%S")
-    except ValueError:
-        # raise ValueError("Incorrect data format, should be YYYY-MM-DD")
+    """Same as datetime.strptime(str(var), "%Y-%m-%d %H:%M:%S") not failing."""
+    return _datetime_str(RE_DATETIME_STR.fullmatch(str(var)))
+
+
+def _date_str(matched: Optional[re.Match]) -> bool:
+    if matched is None:
         return False
-    return True
+    year, month, day = map(int, matched.group(1, 2, 3))
+    if year == 0 or day > _DAYS_IN_MONTH[month]:
+        return False
+    return month != 2 or day < 29 or calendar.isleap(year)
+
+
+def _datetime_str(matched: Optional[re.Match]) -> bool:
+    # Seconds 60 and 61 match, but datetime() refuses them
+    return _date_str(matched) and int(matched.group(6)) < 60
 
 
 def is_number_str(var) -> bool:
-    if RE_NUM.fullmatch(str(var)):
-        return True
-    return False
+    return RE_NUM.fullmatch(str(var)) is not None
 
 
 def is_latin_str(var) -> bool:
-    if RE_LATIN.fullmatch(str(var)):
-        return True
-    return False
+    return RE_LATIN.fullmatch(str(var)) is not None
 
 
 def is_thai_str(var) -> bool:
-    if RE_THAI.fullmatch(str(var)):
-        return True
-    return False
+    return RE_THAI.fullmatch(str(var)) is not None
+
+
+def is_date_str_many(values: Iterable) -> List[bool]:
+    """is_date_str() for every value, e.g. the tokens of a text."""
+    matches = map(RE_DATE_STR.fullmatch, map(str, values))
+    return [matched is not None and _date_str(matched) for matched in matches]
+
+
+def is_datetime_str_many(values: Iterable) -> List[bool]:
+    """is_datetime_str() for every value."""
+    matches = map(RE_DATETIME_STR.fullmatch, map(str, values))
+    return [matched is not None and _datetime_str(matched) for matched in matches]
+
+
+def is_number_str_many(values: Iterable) -> List[bool]:
+    """is_number_str() for every value."""
+    return _fullmatches(RE_NUM, values)
+
+
+def is_latin_str_many(values: Iterable) -> List[bool]:
+    """is_latin_str() for every value."""
+    return _fullmatches(RE_LATIN, values)
+
+
+def is_thai_str_many(values: Iterable) -> List[bool]:
+    """is_thai_str() for every value."""
+    return _fullmatches(RE_THAI, values)
+
+
+def _fullmatches(pattern: re.Pattern, values: Iterable) -> List[bool]:
+    return [matched is not None for matched in map(pattern.fullmatch, map(str, values))]
 
 
 def replace_text(text: str, replace_pairs: Iterable[Tuple[str, str]]) -> str:
-    # consider using str.translate
+    # for a fixed list of pairs, TextReplacer does the same in fewer passes
     for k, v in replace_pairs:
         text = text.replace(k, v)
     return text
 
 
+class TextReplacer:
+    """
+    Precompiled replace_text() for a fixed list of pairs.
+
+    Consecutive pairs with single-character keys become one str.translate
+    table, consecutive pairs with longer keys one regex alternation.
+    A run of longer keys that could interact with each other (overlapping
+    keys, or a replacement that can form a later key) keeps the sequential
+    str.replace loop, so the output is always the same as replace_text().
+    """
+
+    def __init__(self, replace_pairs: Iterable[Tuple[str, str]]):
+        self.replace_pairs = tuple(replace_pairs)
+        self._runs: Optional[List[Callable[[str], str]]] = None
+
+    def _plan_runs(self) -> List[list]:
+        return [
+            _plan_replace_run(tuple(run))
+            for _, run in itertools.groupby(
+                self.replace_pairs, key=lambda pair: len(pair[0]) == 1
+            )
+        ]
+
+    def __call__(self, text: str) -> str:
+        if self._runs is None:
+            # Planned (or loaded from the bundle) and compiled on first use
+            runs = bundle.load(("TextReplacer", self.replace_pairs), self._plan_runs)
+            self._runs = [_compile_replace_run(kind, pairs) for kind, pairs in runs]
+        for run in self._runs:
+            text = run(text)
+        return text
+
+    def __reduce__(self):
+        return (self.__class__, (self.replace_pairs,))
+
+
+def _plan_replace_run(replace_pairs: Tuple[Tuple[str, str], ...]) -> list:
+    # Plain data, so that it can go into the bundle
+    if len(replace_pairs[0][0]) == 1:
+        # Later pairs also apply to what earlier pairs put in
+        mapping = {}
+        for i, (k, v) in enumerate(replace_pairs):
+            mapping.setdefault(ord(k), replace_text(v, replace_pairs[i + 1 :]))
+        return ["translate", list(mapping.items())]
+
+    if not _independent_pairs(replace_pairs):
+        return ["pairs", list(replace_pairs)]
+    replacements = {}
+    for k, v in replace_pairs:
+        replacements.setdefault(k, v)
+    return ["sub", list(replacements.items())]
+
+
+def _compile_replace_run(kind: str, pairs: Sequence) -> Callable[[str], str]:
+    if kind == "translate":
+        return _compile_translate({k: v for k, v in pairs})
+    if kind == "pairs":
+        return functools.partial(replace_text, replace_pairs=[(k, v) for k, v in pairs])
+    replacements = {k: v for k, v in pairs}
+    pattern = re.compile("|".join(re.escape(k) for k in replacements))
+    return functools.partial(pattern.sub, functools.partial(_replacement, replacements))
+
+
+def _replacement(replacements: Dict[str, str], matched: re.Match) -> str:
+    return replacements[matched.group()]
+
+
+def _compile_translate(mapping: Dict[int, str]) -> Callable[[str], str]:
+    # str.translate looks a list up much faster than a dict, and the character
+    # class lets texts without any of the keys skip translate altogether
+    table = mapping
+    if max(mapping) <= 0xFFFF:
+        table = [chr(i) for i in range(max(mapping) + 1)]
+        for k, v in mapping.items():
+            table[k] = v
+    search = re.compile(
+        "[{}]".format("".join(re.escape(chr(k)) for k in mapping))
+    ).search
+    return functools.partial(_translate, search, table)
+
+
+def _translate(
+    search: Callable[[str], Optional[re.Match]],
+    table: Union[List[str], Dict[int, str]],
+    text: str,
+) -> str:
+    if search(text) is None:
+        return text
+    return text.translate(table)
+
+
+def _overlaps(left: str, right: str) -> bool:
+    # A suffix of left is a (proper) prefix of right
+    return any(left.endswith(right[:n]) for n in range(1, len(right)))
+
+
+def _independent_pairs(replace_pairs: Sequence[Tuple[str, str]]) -> bool:
+    for i, (key, value) in enumerate(replace_pairs):
+        for j, (other_key, _) in enumerate(replace_pairs):
+            if i == j:
+                continue
+            if key != other_key and (other_key in key or _overlaps(key, other_key)):
+                return False
+            if j > i and (
+                not value
+                or other_key in value
+                or value in other_key
+                or _overlaps(value, other_key)
+                or _overlaps(other_key, value)
+            ):
+                return False
+    return True
+
+
+_TEXT_PAIRS_REPLACER = TextReplacer(COMBINED_NORMALIZE_PAIRS)
+_ACCENTED_PAIRS_REPLACER = TextReplacer(ACCENTED_PAIRS)
+
+
 def normalize_text_pairs(text: str) -> str:
-    return replace_text(text, COMBINED_NORMALIZE_PAIRS)
+    return _TEXT_PAIRS_REPLACER(text)
 
 
 def normalize_link(text: str, place_holder: str = REPLACE_LINK) -> str:
-    text = RE_LINK.sub(place_holder, text)  # http, https, www.
+    text = GUARDED_LINK.sub(place_holder, text)  # http, https, www.
     return text
 
 
 def normalize_filename(text: str, place_holder: str = REPLACE_FILENAME) -> str:
-    text = RE_FILENAME.sub(place_holder, text)  # .html, php3, .jpg
+    text = GUARDED_FILENAME.sub(place_holder, text)  # .html, php3, .jpg
     return text
 
 
@@ -171,12 +564,12 @@ def normalize_at_mention(text: str, place_holder: str = REPLACE_AT_MENTION) -> s
 
 
 def normalize_email(text: str, place_holder: str = REPLACE_EMAIL) -> str:
-    text = RE_EMAIL.sub(place_holder, text)  # mail@address.com
+    text = GUARDED_EMAIL.sub(place_holder, text)  # mail@address.com
     return text
 
 
 def normalize_haha(text: str, place_holder: str = REPLACE_HAHA) -> str:
-    text = RE_HAHA.sub(place_holder, text)
+    text = GUARDED_HAHA.sub(place_holder, text)
     return text
 
 
@@ -185,13 +578,21 @@ def normalize_num(text: str, place_holder: str = REPLACE_NUMBER) -> str:
     return text
 
 
+def normalize_date(text: str, place_holder: str = REPLACE_DATE) -> str:
+    """
+    Replace dates and times, with any time that follows a date, in one pass:
+    3 ม.ค. 2562 04:00 น. -> WSDATE
+    """
+    return RE_DATE.sub(place_holder, text)
+
+
 def normalize_phone(text: str, place_holder: str = REPLACE_PHONE) -> str:
     text = RE_PHONE.sub(place_holder, text)
     return text
 
 
 def normalize_accented_chars(text: str) -> str:
-    return replace_text(text, ACCENTED_PAIRS)
+    return _ACCENTED_PAIRS_REPLACER(text)
 
 
 def normalize_special_chars(text: str) -> str:
@@ -212,17 +613,21 @@ def remove_tag(text: str) -> str:
     For more sophisticated HTML/XML tags removal, consider using libraries
     like xml.etree or BeautifulSoup (heavier weight).
     """
-    text = RE_TAG.sub("", text)
+    text = GUARDED_TAG.sub("", text)
     return text
 
 
 # " ".join(text.split()) will remove newlines, which we may like to preserve them
 def remove_dup_spaces(text: str) -> str:
-    text = RE_DUP_SPACE.sub(" ", text)
-    text = RE_DUP_EMPTYLINE.sub("\n", text)
-    text = RE_STRIP.sub("", text)
-
-    return text.strip()
+    """
+    Same as substituting RE_DUP_SPACE, RE_DUP_EMPTYLINE and RE_STRIP one
+    after the other, then strip(): a run of spaces, tabs and newlines with
+    a newline in it becomes one newline, any other run of two or more
+    spaces and tabs one space.
+    """
+    if "\n" in text:
+        text = RE_NEWLINE_RUN.sub("\n", text)
+    return RE_DUP_SPACE.sub(" ", text).strip()
 
 
 def replace_dup_chars(text: str) -> str:
@@ -236,7 +641,7 @@ def replace_dup_chars(text: str) -> str:
 
 
 def replace_dup_emojis(text: str) -> str:
-    return RE_DUP_EMOJIS.sub(__replace_rep, text)
+    return get_emoji_matcher().replace_dups(text)
 
 
 def __replace_rep(matched: re.Match) -> str:
@@ -246,65 +651,428 @@ def __replace_rep(matched: re.Match) -> str:
 
 
 def insert_spaces(text: str) -> str:
-    text = RE_DIGIT_NONDIGIT.sub(r"\1 \2", text)  # (Digit)(Non-digit)
-    text = RE_NONDIGIT_DIGIT.sub(r"\1 \2", text)  # (Non-Digit)(Digit)
-    text = RE_THAI_NONTHAI.sub(r"\1 \2", text)  # (Thai)(Non-Thai)
-    text = RE_NONTHAI_THAI.sub(r"\1 \2", text)  # (Non-Thai)(Thai)
-    text = RE_LATIN_NONLATIN.sub(r"\1 \2", text)  # (Latin)(Non-Latin)
-    text = RE_NONLATIN_LATIN.sub(r"\1 \2", text)  # (Non-Latin)(Latin)
-
-    return text
+    """
+    Same as substituting r"\1 \2" for RE_DIGIT_NONDIGIT, RE_NONDIGIT_DIGIT,
+    RE_THAI_NONTHAI, RE_NONTHAI_THAI, RE_LATIN_NONLATIN and RE_NONLATIN_LATIN
+    one after the other.
+    """
+    text = RE_NUMBER_RUN.sub(_space_number_run, text)  # (Digit)(Non-digit) and back
+    return RE_CLASS_BOUNDARY.sub(" ", text)  # (Thai)(Non-Thai), (Latin)(Non-Latin)
+
+
+def insert_spaces_many(texts: Iterable[str]) -> List[str]:
+    """insert_spaces() for every text."""
+    space_numbers = functools.partial(RE_NUMBER_RUN.sub, _space_number_run)
+    space_classes = functools.partial(RE_CLASS_BOUNDARY.sub, " ")
+    return [space_classes(space_numbers(text)) for text in texts]
+
+
+def _insert_spaces_tokens(text: str) -> List[str]:
+    # insert_spaces(text).split(), without building the spaced text
+    return RE_CLASS_RUN.findall(RE_NUMBER_RUN.sub(_space_number_run, text))
+
+
+def _space_number_run(matched: re.Match) -> str:
+    # What RE_DIGIT_NONDIGIT and then RE_NONDIGIT_DIGIT do to a run of
+    # [\d\.,] and both its ends. Matches of one pass do not overlap, so a
+    # "." or "," that ended a match cannot start the next one.
+    text = matched.string
+    start, end = matched.span()
+    run = matched.group()
+    # The character before the run is \D: the second pass always splits them
+    chunks = [" "] if start > 0 else []
+    if run.isdecimal():
+        chunks.append(run)
+        if end < len(text):
+            chunks.append(" ")
+        return "".join(chunks)
+
+    first_ended = False  # the first pass matched the pair before
+    second_ended = start > 0  # the second pass matched the pair before
+    for i, left in enumerate(run):
+        chunks.append(left)
+        if i + 1 < len(run):
+            right_in_run, right_non_digit = True, run[i + 1] in ".,"
+        elif end < len(text):
+            right_in_run, right_non_digit = False, True
+        else:
+            break
+        first = not first_ended and right_non_digit
+        if first:
+            # The second pass sees (" ", right) here
+            second = right_in_run
+        else:
+            second = not second_ended and left in ".," and right_in_run
+        first_ended, second_ended = first, second
+        chunks.append(" " * (first + second))
+    return "".join(chunks)
 
 
 def remove_emoji(text: str) -> str:
-    return RE_EMOJI.sub("", text)
+    return get_emoji_matcher().sub("", text)
 
 
 def normalize_emoji(text: str) -> str:
-    return re.sub(RE_EMOJI, r" \1 ", text).strip()
+    return get_emoji_matcher().sub(_pad_emoji, text).strip()
+
+
+def _pad_emoji(emoji_str: str) -> str:
+    return " " + emoji_str + " "
 
 
 def remove_others_char(text):
-    text = re.sub(RE_NONTHAI_ENG_EMOJI, " ", text)
+    text = RE_NONTHAI_ENG_EMOJI.sub(" ", text)
     return text
 
 
+# Stages that are a single regex substitution with a constant replacement.
+# Preprocessor binds them directly to the compiled pattern.
+SUB_STAGES = {
+    "remove_tag": (GUARDED_TAG, ""),
+    "remove_hashtags": (RE_HASHTAGS, ""),
+    "normalize_at_mention": (RE_AT_MENTION, REPLACE_AT_MENTION),
+    "normalize_email": (GUARDED_EMAIL, REPLACE_EMAIL),
+    "normalize_link": (GUARDED_LINK, REPLACE_LINK),
+    "normalize_filename": (GUARDED_FILENAME, REPLACE_FILENAME),
+    "normalize_date": (RE_DATE, REPLACE_DATE),
+    "normalize_phone": (RE_PHONE, REPLACE_PHONE),
+    "normalize_haha": (GUARDED_HAHA, REPLACE_HAHA),
+    "normalize_num": (RE_NUM, REPLACE_NUMBER),
+}
+
+# Characters of which a stage needs at least one to change anything; the
+# stage is skipped for text without any. Checked right before the stage,
+# since earlier stages add characters (unescape_html can make a "<" or "@").
+STAGE_ANCHORS = {
+    "remove_tag": re.compile(r"<"),
+    "remove_hashtags": re.compile(r"#"),
+    "normalize_at_mention": re.compile(r"@"),
+    "normalize_email": re.compile(r"@"),
+    "normalize_link": re.compile(r"\."),
+    "normalize_filename": re.compile(r"\."),
+    "normalize_date": re.compile(r"[0-9๐-๙]"),
+    # Every phone body starts with [0๐], [01๐๑] or "("
+    "normalize_phone": re.compile(r"[0๐1๑(]"),
+    "normalize_haha": re.compile(r"[h5\u0E16]", flags=re.IGNORECASE),
+    "normalize_num": re.compile(r"[0-9๐-๙]"),
+}
+
+# Keyword options of each stage that takes any, with their defaults
+STAGE_OPTIONS = {
+    "normalize_at_mention": {"place_holder": REPLACE_AT_MENTION},
+    "normalize_email": {"place_holder": REPLACE_EMAIL},
+    "normalize_link": {"place_holder": REPLACE_LINK},
+    "normalize_filename": {"place_holder": REPLACE_FILENAME},
+    "normalize_date": {"place_holder": REPLACE_DATE},
+    "normalize_phone": {"place_holder": REPLACE_PHONE},
+    "normalize_haha": {"place_holder": REPLACE_HAHA},
+    "normalize_num": {"place_holder": REPLACE_NUMBER},
+}
+
+STAGES = {
+    "lower": str.lower,
+    "unescape_html": html.unescape,
+    "remove_tag": remove_tag,
+    "remove_hashtags": remove_hashtags,
+    "normalize_at_mention": normalize_at_mention,
+    "normalize_email": normalize_email,
+    "normalize_link": normalize_link,
+    "normalize_filename": normalize_filename,
+    "normalize_date": normalize_date,
+    "normalize_phone": normalize_phone,
+    "normalize_text_pairs": normalize_text_pairs,
+    "normalize_haha": normalize_haha,
+    "normalize_num": normalize_num,
+    "normalize_accented_chars": normalize_accented_chars,
+    "normalize_special_chars": normalize_special_chars,
+    "normalize_emoji": normalize_emoji,
+    "remove_emoji": remove_emoji,
+    "replace_dup_chars": replace_dup_chars,
+    "replace_dup_emojis": replace_dup_emojis,
+    "remove_others_char": remove_others_char,
+    "insert_spaces": insert_spaces,
+    "remove_dup_spaces": remove_dup_spaces,
+}
+
 # The current sequence of operations is designed to produce text
 # to be a training data for classification task.
-def preprocess(text: str) -> str:
-    if not text:
-        return ""
+DEFAULT_STAGES = (
+    "lower",
+    "unescape_html",
+    "remove_tag",
+    "normalize_at_mention",
+    "normalize_email",
+    "normalize_link",
+    "normalize_filename",
+    "normalize_phone",
+    "normalize_text_pairs",
+    "normalize_haha",
+    "normalize_num",
+    "normalize_emoji",
+    "remove_others_char",
+    "insert_spaces",
+    "remove_dup_spaces",
+)
 
-    text = text.lower()
+# DEFAULT_STAGES with dates and times as WSDATE, before their numbers
+# become WSPHONE or WSNUMBER: preprocess(text, dates=True)
+DATE_STAGES = (
+    DEFAULT_STAGES[: DEFAULT_STAGES.index("normalize_phone")]
+    + ("normalize_date",)
+    + DEFAULT_STAGES[DEFAULT_STAGES.index("normalize_phone") :]
+)
 
-    text = html.unescape(text)
-    text = remove_tag(text)
 
-    text = normalize_at_mention(text)
-    text = normalize_email(text)
-    text = normalize_link(text)
-    text = normalize_filename(text)
-    text = normalize_phone(text)
-    text = normalize_text_pairs(text)
-    text = normalize_haha(text)
-    text = normalize_num(text)
-    text = normalize_emoji(text)
+def _stage_function(name: str, options: Dict[str, str]) -> Callable[[str], str]:
+    # The stage with its options, without the anchor check
+    if name in SUB_STAGES:
+        pattern, replacement = SUB_STAGES[name]
+        return functools.partial(pattern.sub, options.get("place_holder", replacement))
+    if options:
+        return functools.partial(STAGES[name], **options)
+    return STAGES[name]
 
-    text = remove_others_char(text)
 
-    text = insert_spaces(text)
-    text = remove_dup_spaces(text)
+def _compile_step(name: str, options: Dict[str, str]) -> Callable[[str], str]:
+    step = _stage_function(name, options)
+    if name in STAGE_ANCHORS:
+        return functools.partial(_step_if_anchored, STAGE_ANCHORS[name].search, step)
+    return step
 
-    return text
+
+def _step_if_anchored(
+    anchor: Callable[[str], Optional[re.Match]], step: Callable[[str], str], text: str
+) -> str:
+    return step(text) if anchor(text) else text
+
+
+class Preprocessor:
+    """
+    Compile a sequence of stage names (see STAGES) once into a callable.
+    The result is always the same as applying the stages one by one.
+
+    >>> clean = Preprocessor(["lower", "normalize_link", "remove_dup_spaces"])
+    >>> clean("Visit  HTTP://WWW.EXAMPLE.COM")
+    'visit WSLINK'
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[str] = DEFAULT_STAGES,
+        options: Optional[Dict[str, Dict[str, str]]] = None,
+    ):
+        unknown = [name for name in stages if name not in STAGES]
+        if unknown:
+            raise ValueError("Unknown stage(s): {}".format(", ".join(unknown)))
+        self.stages = tuple(stages)
+        self.options = {}
+        for name, stage_options in (options or {}).items():
+            if name not in self.stages:
+                raise ValueError("Options for a stage not in stages: {}".format(name))
+            known = STAGE_OPTIONS.get(name, {})
+            unknown = [key for key in stage_options if key not in known]
+            if unknown:
+                raise ValueError(
+                    "Unknown option(s) for {}: {}".format(name, ", ".join(unknown))
+                )
+            if stage_options:
+                self.options[name] = dict(stage_options)
+        self._steps = tuple(
+            _compile_step(name, self.options.get(name, {})) for name in self.stages
+        )
+        self._compile_tokens()
+
+    def _compile_tokens(self) -> None:
+        # str.split() drops whatever remove_dup_spaces would have done, and
+        # the words insert_spaces would have spaced out are found directly
+        end = len(self.stages)
+        if end and self.stages[end - 1] == "remove_dup_spaces":
+            end -= 1
+        self._split = str.split
+        if end and self.stages[end - 1] == "insert_spaces":
+            end -= 1
+            self._split = _insert_spaces_tokens
+        self._token_steps = self._steps[:end]
+        self._placeholders = {}
+        for name in self.stages:
+            if name in SUB_STAGES:
+                options = self.options.get(name, {})
+                for word in options.get("place_holder", SUB_STAGES[name][1]).split():
+                    self._placeholders[word] = sys.intern(word)
+
+    def __call__(self, text: str, profiler: Optional[StageProfiler] = None) -> str:
+        if not text:
+            return ""
+        if profiler is not None:
+            return self._profile(text, profiler)
+        for step in self._steps:
+            text = step(text)
+        return text
+
+    def tokens(
+        self, text: str, stopwords: Optional[StopwordFilter] = None
+    ) -> List[str]:
+        """
+        self(text).split() (without the stopwords, if given), without
+        building the final text. Placeholders such as WSLINK are always the
+        same interned string objects.
+        """
+        if not text:
+            return []
+        for step in self._token_steps:
+            text = step(text)
+        tokens = self._split(text)
+        if self._placeholders:
+            tokens = map(self._placeholders.get, tokens, tokens)
+        if stopwords is not None:
+            return stopwords.filter(tokens)
+        return tokens if isinstance(tokens, list) else list(tokens)
+
+    def tokens_many(
+        self, texts: Iterable[str], stopwords: Optional[StopwordFilter] = None
+    ) -> List[List[str]]:
+        """tokens() for every text."""
+        return [self.tokens(text, stopwords) for text in texts]
+
+    def _profile(self, text: str, profiler: StageProfiler) -> str:
+        for name, step in zip(self.stages, self._steps):
+            matches = None
+            start = time.perf_counter()
+            if name in STAGE_ANCHORS and not STAGE_ANCHORS[name].search(text):
+                output, matches = text, 0
+            elif name in SUB_STAGES:
+                pattern, replacement = SUB_STAGES[name]
+                options = self.options.get(name, {})
+                replacement = options.get("place_holder", replacement)
+                output, matches = pattern.subn(replacement, text)
+            else:
+                output = step(text)
+            seconds = time.perf_counter() - start
+            profiler.record(name, seconds, len(text), len(output), matches)
+            text = output
+        return text
+
+    def __reduce__(self):
+        return (self.__class__, (self.stages, self.options))
+
+    def __repr__(self) -> str:
+        if not self.options:
+            return "{}({!r})".format(self.__class__.__name__, list(self.stages))
+        return "{}({!r}, options={!r})".format(
+            self.__class__.__name__, list(self.stages), self.options
+        )
+
+
+class Pipeline(Preprocessor):
+    """
+    A Preprocessor that is built and saved declaratively, e.g. to pin the
+    exact preprocessing a model was trained with:
+
+    >>> pipeline = Pipeline().without("normalize_num").with_options(
+    ...     "normalize_link", place_holder=" URL "
+    ... )
+    >>> pipeline("ดูที่ www.example.com 100 บาท")
+    'ดูที่ URL 100 บาท'
+    >>> Pipeline.from_json(pipeline.to_json())(" 100 ")
+    '100'
+
+    The JSON is {"version": 1, "stages": [...], "options": {stage: {...}}}.
+    """
+
+    FORMAT_VERSION = 1
+
+    def without(self, *names: str) -> "Pipeline":
+        """A copy with the named stages (and their options) left out."""
+        unknown = [name for name in names if name not in self.stages]
+        if unknown:
+            raise ValueError(
+                "Stage(s) not in the pipeline: {}".format(", ".join(unknown))
+            )
+        return self.__class__(
+            [name for name in self.stages if name not in names],
+            {name: o for name, o in self.options.items() if name not in names},
+        )
+
+    def with_options(self, name: str, **options: str) -> "Pipeline":
+        """A copy with options of one stage set."""
+        merged = {stage: dict(o) for stage, o in self.options.items()}
+        merged.setdefault(name, {}).update(options)
+        return self.__class__(self.stages, merged)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.FORMAT_VERSION,
+            "stages": list(self.stages),
+            "options": {name: dict(o) for name, o in self.options.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "Pipeline":
+        version = config.get("version", cls.FORMAT_VERSION)
+        if version != cls.FORMAT_VERSION:
+            raise ValueError("Unsupported pipeline version: {}".format(version))
+        unknown = [key for key in config if key not in ("version", "stages", "options")]
+        if unknown:
+            raise ValueError("Unknown pipeline key(s): {}".format(", ".join(unknown)))
+        return cls(config.get("stages", DEFAULT_STAGES), config.get("options"))
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    @classmethod
+    def from_json(cls, config: str) -> "Pipeline":
+        return cls.from_dict(json.loads(config))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Preprocessor):
+            return NotImplemented
+        return (self.stages, self.options) == (other.stages, other.options)
+
+    def __hash__(self) -> int:
+        return hash(self.to_json(sort_keys=True))
+
+
+_DEFAULT_PREPROCESSOR = Preprocessor()
+_DATE_PREPROCESSOR = Preprocessor(DATE_STAGES)
+
+
+def preprocess(
+    text: str, profiler: Optional[StageProfiler] = None, dates: bool = False
+) -> str:
+    """Preprocess text with DEFAULT_STAGES, or DATE_STAGES if dates."""
+    if dates:
+        return _DATE_PREPROCESSOR(text, profiler)
+    return _DEFAULT_PREPROCESSOR(text, profiler)
+
+
+def preprocess_tokens(
+    text: str, stopwords: Optional[StopwordFilter] = None
+) -> List[str]:
+    """
+    preprocess(text).split(), without building the joined text first.
+    Pass e.g. StopwordFilter() to leave out the stopwords in the same step.
+    """
+    return _DEFAULT_PREPROCESSOR.tokens(text, stopwords)
+
+
+def preprocess_tokens_many(
+    texts: Iterable[str], stopwords: Optional[StopwordFilter] = None
+) -> List[List[str]]:
+    """preprocess_tokens() for every text."""
+    return _DEFAULT_PREPROCESSOR.tokens_many(texts, stopwords)
 
 
 def remove_stopwords(
     tokens: list, custom_stopwords: list = [], include_legacy_stopwords: bool = True
 ) -> list:
-    stopwords = list(THAI_STOPWORDS)
-    if custom_stopwords:
-        if include_legacy_stopwords:
-            stopwords += custom_stopwords
-        else:
-            stopwords = custom_stopwords
-    return [token for token in tokens if token not in stopwords]
+    return _stopword_filter(tuple(custom_stopwords), include_legacy_stopwords).filter(
+        tokens
+    )
+
+
+# Most callers pass the same few custom lists over and over
+@functools.lru_cache(maxsize=32)
+def _stopword_filter(
+    custom_stopwords: Tuple[str, ...], include_legacy_stopwords: bool
+) -> StopwordFilter:
+    return StopwordFilter(custom_stopwords, include_legacy_stopwords)
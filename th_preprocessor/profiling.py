@@ -0,0 +1,114 @@
+"""
+Per-stage timing of Preprocessor / preprocess() calls.
+
+    profiler = StageProfiler()
+    for text in texts:
+        preprocess(text, profiler=profiler)
+    print(profiler.format_summary())
+
+Calls without a profiler are not instrumented at all.
+"""
+import inspect
+import time
+from typing import Callable, Dict, List, Optional
+
+# Per stage: number of calls, total and slowest wall time, characters in
+# and out, and regex matches (substitution stages only)
+FIELDS = ("calls", "seconds", "max_seconds", "input_chars", "output_chars", "matches")
+
+
+class StageProfiler:
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        input_chars: int,
+        output_chars: int,
+        matches: Optional[int] = None,
+    ) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = dict.fromkeys(FIELDS, 0)
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        if seconds > stats["max_seconds"]:
+            stats["max_seconds"] = seconds
+        stats["input_chars"] += input_chars
+        stats["output_chars"] += output_chars
+        if matches:
+            stats["matches"] += matches
+
+    def merge(self, stages: Dict[str, Dict[str, float]]) -> None:
+        """Add the stages of another profiler, e.g. from a worker process."""
+        for stage, other in stages.items():
+            stats = self.stages.get(stage)
+            if stats is None:
+                self.stages[stage] = dict(other)
+                continue
+            for field in FIELDS:
+                if field == "max_seconds":
+                    stats[field] = max(stats[field], other[field])
+                else:
+                    stats[field] += other[field]
+
+    def reset(self) -> None:
+        self.stages = {}
+
+    def summary(self) -> List[Dict[str, float]]:
+        """One row per stage, in pipeline order, with its share of the time."""
+        total = sum(stats["seconds"] for stats in self.stages.values()) or 1.0
+        return [
+            dict(
+                stats,
+                stage=stage,
+                share=stats["seconds"] / total,
+                us_per_call=stats["seconds"] / stats["calls"] * 1e6,
+            )
+            for stage, stats in self.stages.items()
+        ]
+
+    def format_summary(self) -> str:
+        lines = [
+            "{:<26} {:>9} {:>10} {:>7} {:>11} {:>12} {:>9}".format(
+                "stage", "calls", "us/call", "share", "max ms", "chars in", "matches"
+            )
+        ]
+        for row in self.summary():
+            lines.append(
+                "{:<26} {:>9} {:>10.1f} {:>6.1%} {:>11.2f} {:>12} {:>9}".format(
+                    row["stage"],
+                    row["calls"],
+                    row["us_per_call"],
+                    row["share"],
+                    row["max_seconds"] * 1e3,
+                    row["input_chars"],
+                    row["matches"],
+                )
+            )
+        return "\n".join(lines)
+
+
+def profiled(preprocessor: Callable[..., str]) -> Callable[[str, StageProfiler], str]:
+    """
+    preprocessor as a function of (text, profiler): per stage when it takes
+    a profiler (preprocess(), a Preprocessor), else the whole call as one
+    stage named after the function.
+    """
+    try:
+        takes_profiler = "profiler" in inspect.signature(preprocessor).parameters
+    except (TypeError, ValueError):  # some builtins have no signature
+        takes_profiler = False
+    if takes_profiler:
+        return preprocessor
+    name = getattr(preprocessor, "__name__", type(preprocessor).__name__)
+
+    def call(text: str, profiler: StageProfiler) -> str:
+        start = time.perf_counter()
+        result = preprocessor(text)
+        profiler.record(name, time.perf_counter() - start, len(text), len(result))
+        return result
+
+    return call
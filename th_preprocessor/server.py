@@ -0,0 +1,223 @@
+"""
+Serve one warm pool of preprocessors to other programs (th-preprocess --serve).
+
+Over HTTP, POST a JSON object to any path:
+
+    {"text": "..."}          -> {"text": "..."}
+    {"texts": ["...", ...]}  -> {"texts": ["...", ...]}
+
+GET /health answers {"status": "ok"}. Over stdin/stdout, every line is a
+JSON string (or object with "text") and is answered by one line in the
+same order, as soon as it is ready: the preprocessed JSON string, or
+{"error": "..."} for a line that is not a request or fails.
+"""
+import asyncio
+import json
+import sys
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+
+from th_preprocessor.aio import AsyncPreprocessor
+
+# Largest request body accepted over HTTP
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parse "8080" or "0.0.0.0:8080"; the host defaults to localhost."""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+async def _respond(
+    writer: asyncio.StreamWriter, status: int, body: dict, keep_alive: bool
+) -> None:
+    data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    head = (
+        "HTTP/1.1 {} {}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        "Content-Length: {}\r\n"
+        "Connection: {}\r\n\r\n"
+    ).format(
+        status, _REASONS[status], len(data), "keep-alive" if keep_alive else "close"
+    )
+    writer.write(head.encode("ascii") + data)
+    await writer.drain()
+
+
+async def _handle_request(
+    pool: AsyncPreprocessor, method: str, path: str, body: bytes
+) -> Tuple[int, dict]:
+    if method == "GET" and path == "/health":
+        return 200, {"status": "ok"}
+    if method != "POST":
+        return 405, {"error": "POST a JSON object with text or texts"}
+    try:
+        request = json.loads(body.decode("utf-8"))
+    except ValueError as e:
+        return 400, {"error": "Invalid JSON: {}".format(e)}
+    try:
+        if isinstance(request, dict) and isinstance(request.get("text"), str):
+            return 200, {"text": await pool(request["text"])}
+        if (
+            isinstance(request, dict)
+            and isinstance(request.get("texts"), list)
+            and all(isinstance(text, str) for text in request["texts"])
+        ):
+            texts = [result async for result in pool.map(request["texts"])]
+            return 200, {"texts": texts}
+    except Exception as e:
+        return 500, {"error": "Preprocessing failed: {!r}".format(e)}
+    return 400, {"error": 'Expected {"text": str} or {"texts": [str, ...]}'}
+
+
+async def _read_head(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+    # (method, path, version, headers), None at the end of the connection;
+    # ValueError for a line over the reader's limit
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    parts = request_line.decode("latin-1").split()
+    method, path, version = (parts + [""] * 3)[:3]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+
+async def _handle_connection(
+    pool: AsyncPreprocessor,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        while True:
+            try:
+                head = await _read_head(reader)
+            except ValueError:
+                error = {"error": "Request line or header too long"}
+                await _respond(writer, 400, error, False)
+                break
+            if head is None:
+                break
+            method, path, version, headers = head
+            keep_alive = headers.get("connection", "").lower() != "close" and (
+                version == "HTTP/1.1"
+                or headers.get("connection", "").lower() == "keep-alive"
+            )
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # Where the body ends is unknown, so the connection ends too
+                error = {"error": "Invalid Content-Length"}
+                await _respond(writer, 400, error, False)
+                break
+            if length > MAX_BODY_BYTES:
+                await _respond(writer, 413, {"error": "Request too large"}, False)
+                break
+            body = await reader.readexactly(length) if length else b""
+            status, response = await _handle_request(pool, method, path, body)
+            await _respond(writer, status, response, keep_alive)
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_http_server(
+    pool: AsyncPreprocessor, host: str, port: int
+) -> asyncio.AbstractServer:
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(pool, reader, writer), host, port
+    )
+
+
+async def serve_http(pool: AsyncPreprocessor, host: str, port: int) -> None:
+    server = await start_http_server(pool, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def _parse_line(line: str) -> Union[str, dict]:
+    # The text of a request line, or the error to answer it with
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return {"error": "Invalid JSON: {}".format(e)}
+    if isinstance(request, dict):
+        request = request.get("text")
+    if not isinstance(request, str):
+        return {"error": 'Expected a JSON string or {"text": str}'}
+    return request
+
+
+async def _stdin_requests() -> AsyncIterator[Union[str, dict]]:
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            return
+        if line.strip():
+            yield _parse_line(line)
+
+
+async def serve_stdio(pool: AsyncPreprocessor) -> None:
+    # Answers in input order, at most max_pending lines ahead of the output
+    answers: asyncio.Queue = asyncio.Queue(pool.max_pending)
+
+    async def submit_all() -> None:
+        try:
+            async for request in _stdin_requests():
+                if isinstance(request, dict):
+                    answer = asyncio.get_running_loop().create_future()
+                    answer.set_result(request)
+                else:
+                    answer = asyncio.ensure_future(pool(request))
+                await answers.put(answer)
+        except Exception as e:
+            await answers.put(e)
+        else:
+            await answers.put(None)
+
+    submitter = asyncio.ensure_future(submit_all())
+    try:
+        while True:
+            answer = await answers.get()
+            if answer is None:
+                break
+            if isinstance(answer, Exception):
+                raise answer
+            try:
+                result = await answer
+            except Exception as e:
+                result = {"error": "Preprocessing failed: {!r}".format(e)}
+            sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        submitter.cancel()
+
+
+async def serve(pool: AsyncPreprocessor, address: Optional[str] = None) -> None:
+    """Serve over stdin/stdout when address is "-" or None, else over HTTP."""
+    async with pool:
+        if address is None or address == "-":
+            await serve_stdio(pool)
+        else:
+            await serve_http(pool, *parse_address(address))
@@ -0,0 +1,45 @@
+"""
+Stopword removal with the stopword set built once.
+"""
+from typing import FrozenSet, Iterable, List
+
+from th_preprocessor.data import THAI_STOPWORDS
+
+
+class StopwordFilter:
+    """
+    Remove stopwords from token lists.
+
+    custom_stopwords are added to THAI_STOPWORDS, or replace them when
+    include_legacy_stopwords is False. Without custom_stopwords,
+    THAI_STOPWORDS are used.
+
+    >>> StopwordFilter(["ครับ"]).filter(["กิน", "ข้าว", "แล้ว", "ครับ"])
+    ['กิน', 'ข้าว']
+    """
+
+    def __init__(
+        self,
+        custom_stopwords: Iterable[str] = (),
+        include_legacy_stopwords: bool = True,
+    ):
+        custom_stopwords = frozenset(custom_stopwords)
+        if not custom_stopwords:
+            self.stopwords: FrozenSet[str] = THAI_STOPWORDS
+        elif include_legacy_stopwords:
+            self.stopwords = THAI_STOPWORDS | custom_stopwords
+        else:
+            self.stopwords = custom_stopwords
+
+    def filter(self, tokens: Iterable[str]) -> List[str]:
+        stopwords = self.stopwords
+        return [token for token in tokens if token not in stopwords]
+
+    def filter_many(self, batch: Iterable[Iterable[str]]) -> List[List[str]]:
+        stopwords = self.stopwords
+        return [
+            [token for token in tokens if token not in stopwords] for tokens in batch
+        ]
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.stopwords
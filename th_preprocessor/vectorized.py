@@ -0,0 +1,209 @@
+"""
+Preprocess a whole column at once: a pandas Series, a pyarrow string array
+or chunked array, or a plain list of texts.
+
+    from th_preprocessor.vectorized import preprocess_column
+
+    df["clean"] = preprocess_column(df["text"])
+
+The result is the same as df["text"].map(preprocess), but:
+
+- every distinct text is preprocessed once and its result is put back in
+  every row it came from, without going through Python objects per row;
+- the stages run one after the other over all the distinct texts. The
+  stages that only map characters (lower, normalize_text_pairs, ...) run
+  once over the whole column, and a stage with an anchor (see
+  STAGE_ANCHORS) only runs on the texts where one scan over the column
+  found its anchor.
+
+The result has the type, length, index and name of the column; nulls stay
+null. pandas and pyarrow are only imported when given a column of theirs.
+"""
+import bisect
+import itertools
+import operator
+import sys
+from typing import Any, Callable, List, Optional, Sequence
+
+from th_preprocessor.preprocess import (
+    _DEFAULT_PREPROCESSOR,
+    STAGE_ANCHORS,
+    Preprocessor,
+    _stage_function,
+    preprocess,
+)
+
+# Stages where stage(a + SEPARATOR + b) == stage(a) + SEPARATOR + stage(b),
+# so that they run once over all texts joined by SEPARATOR
+JOINED_STAGES = frozenset(
+    [
+        "lower",
+        "normalize_text_pairs",
+        "normalize_accented_chars",
+        "normalize_special_chars",
+    ]
+)
+
+# A noncharacter: no stage matches, replaces, decomposes or case-maps it, and
+# real texts do not have it. A column that does is processed text by text.
+SEPARATOR = "\uFDD0"
+
+
+def _run_joined(step: Callable[[str], str], texts: List[str]) -> List[str]:
+    joined = SEPARATOR.join(texts)
+    if joined.count(SEPARATOR) == len(texts) - 1:
+        results = step(joined).split(SEPARATOR)
+        if len(results) == len(texts):
+            return results
+    return [step(text) for text in texts]
+
+
+def _anchored_rows(
+    anchor: Callable[[str, int], Any], texts: List[str]
+) -> Optional[List[int]]:
+    # The rows with a match of anchor, from one scan over all texts, or None
+    # when a text has SEPARATOR in it
+    joined = SEPARATOR.join(texts)
+    if joined.count(SEPARATOR) != len(texts) - 1:
+        return None
+    # ends[i] is where SEPARATOR (or the end) is after texts[i] in joined
+    ends = list(
+        map(operator.add, itertools.accumulate(map(len, texts)), range(len(texts)))
+    )
+    rows = []
+    position = 0
+    while True:
+        found = anchor(joined, position)
+        if found is None:
+            return rows
+        row = bisect.bisect_right(ends, found.start())
+        rows.append(row)
+        position = ends[row] + 1
+
+
+def _run_anchored(
+    anchor: Callable[[str, int], Any], step: Callable[[str], str], texts: List[str]
+) -> List[str]:
+    rows = _anchored_rows(anchor, texts)
+    if rows is None:
+        return [step(text) if anchor(text, 0) else text for text in texts]
+    texts = list(texts)
+    for row in rows:
+        texts[row] = step(texts[row])
+    return texts
+
+
+def preprocess_texts(
+    texts: Sequence[str], preprocessor: Callable[[str], str] = preprocess
+) -> List[str]:
+    """
+    [preprocessor(text) for text in texts], stage by stage over all texts
+    when preprocessor is preprocess() or a Preprocessor (e.g. a Pipeline).
+    texts should be distinct; preprocess_column() takes care of that.
+    """
+    if preprocessor is preprocess:
+        preprocessor = _DEFAULT_PREPROCESSOR
+    if not isinstance(preprocessor, Preprocessor):
+        return [preprocessor(text) for text in texts]
+    # Empty texts stay empty, as with Preprocessor
+    rows = [i for i, text in enumerate(texts) if text]
+    results = [texts[i] for i in rows]
+    if not results:
+        return [""] * len(texts)
+    for name in preprocessor.stages:
+        step = _stage_function(name, preprocessor.options.get(name, {}))
+        if name in JOINED_STAGES:
+            results = _run_joined(step, results)
+        elif name in STAGE_ANCHORS:
+            results = _run_anchored(STAGE_ANCHORS[name].search, step, results)
+        else:
+            results = [step(text) for text in results]
+    if len(rows) == len(texts):
+        return results
+    output = [""] * len(texts)
+    for i, result in zip(rows, results):
+        output[i] = result
+    return output
+
+
+def _preprocess_categorical(series, preprocessor: Callable[[str], str]):
+    import numpy as np
+    import pandas as pd
+
+    # Only the categories are preprocessed; categories that end up the same
+    # are merged
+    results = preprocess_texts(series.cat.categories.tolist(), preprocessor)
+    merged, categories = pd.factorize(pd.Index(results, dtype=object))
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, merged[codes], -1)
+    values = pd.Categorical.from_codes(
+        codes, categories=categories, ordered=series.cat.ordered
+    )
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _preprocess_series(series, preprocessor: Callable[[str], str]):
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _preprocess_categorical(series, preprocessor)
+    codes, distinct = pd.factorize(series)
+    results = np.empty(len(distinct), dtype=object)
+    results[:] = preprocess_texts(distinct.tolist(), preprocessor)
+    values = np.empty(len(series), dtype=object)
+    present = codes >= 0
+    values[present] = results[codes[present]]
+    if not present.all():
+        missing = ~present
+        values[missing] = series.to_numpy(dtype=object)[missing]
+    return pd.Series(values, index=series.index, name=series.name, dtype=series.dtype)
+
+
+def _preprocess_arrow(array, preprocessor: Callable[[str], str]):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # unique() and index_in() take neither dictionary nor view arrays:
+    # preprocess the strings and cast the result back
+    plain_type = array.type
+    if pa.types.is_dictionary(plain_type):
+        plain_type = plain_type.value_type
+    is_string_view = getattr(pa.types, "is_string_view", None)  # pyarrow < 16
+    if is_string_view is not None and is_string_view(plain_type):
+        plain_type = pa.string()
+    if plain_type != array.type:
+        result = _preprocess_arrow(array.cast(plain_type), preprocessor)
+        return result.cast(array.type)
+    distinct = pc.unique(array).drop_null()
+    # Null rows get a null index and so stay null
+    indices = pc.index_in(array, value_set=distinct)
+    results = pa.array(
+        preprocess_texts(distinct.to_pylist(), preprocessor), type=array.type
+    )
+    return pc.take(results, indices)
+
+
+def _is_instance(value: Any, module: str, names: Sequence[str]) -> bool:
+    # Without importing module when it is not in use
+    if module not in sys.modules:
+        return False
+    types = tuple(getattr(sys.modules[module], name) for name in names)
+    return isinstance(value, types)
+
+
+def preprocess_column(column, preprocessor: Callable[[str], str] = preprocess):
+    """
+    preprocessor (preprocess() by default, a Preprocessor, a Pipeline, or any
+    function of a text) applied to every text of column: a pandas Series, a
+    pyarrow Array or ChunkedArray of strings, or an iterable of texts (which
+    gives a list). Nulls (None, NaN, pd.NA) are kept as they are.
+    """
+    if _is_instance(column, "pandas", ["Series"]):
+        return _preprocess_series(column, preprocessor)
+    if _is_instance(column, "pyarrow", ["Array", "ChunkedArray"]):
+        return _preprocess_arrow(column, preprocessor)
+    texts = list(column)
+    distinct = list(dict.fromkeys(text for text in texts if text is not None))
+    results = dict(zip(distinct, preprocess_texts(distinct, preprocessor)))
+    return [None if text is None else results[text] for text in texts]